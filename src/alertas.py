@@ -0,0 +1,296 @@
+import sqlite3
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# Campos das linhas entregues pelo coletor (id, preco_usd, variacao_24h, market_cap, ultima_atualizacao)
+CAMPOS_ALERTA = {"preco_usd": 1, "variacao_24h": 2, "market_cap": 3}
+OPERADORES = ("<", ">")
+
+def criar_tabelas_alertas(conn: sqlite3.Connection):
+    # `satisfeita` guarda o último estado da condição (NULL: ainda não avaliada);
+    # só a passagem de falsa para verdadeira dispara o alerta
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS alertas (
+            id INTEGER PRIMARY KEY,
+            id_moeda TEXT NOT NULL,
+            campo TEXT NOT NULL,
+            operador TEXT NOT NULL,
+            limite REAL NOT NULL,
+            satisfeita INTEGER,
+            criado_em TEXT
+        )
+    ''')
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_alertas_moeda ON alertas(id_moeda)")
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS disparos_alertas (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            id_alerta INTEGER NOT NULL,
+            id_moeda TEXT NOT NULL,
+            valor REAL,
+            disparado_em TEXT
+        )
+    ''')
+    # Versão das regras: o motor do coletor recarrega quando outro processo as altera
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS metadados_alertas (
+            chave TEXT PRIMARY KEY,
+            valor TEXT
+        ) WITHOUT ROWID
+    ''')
+
+class _Limiares:
+    """Regras de um (moeda, campo, operador) ordenadas pelo limite.
+    
+    As regras satisfeitas por um valor formam um sufixo (`<`) ou prefixo (`>`)
+    da lista, então as que mudaram de estado entre dois valores são a fatia
+    entre as duas posições de bisect.
+    """
+    
+    __slots__ = ("operador", "limites", "ids")
+    
+    def __init__(self, operador: str):
+        self.operador = operador
+        self.limites: List[float] = []
+        self.ids: List[int] = []
+    
+    def inserir(self, limite: float, id_alerta: int):
+        posicao = bisect_right(self.limites, limite)
+        self.limites.insert(posicao, limite)
+        self.ids.insert(posicao, id_alerta)
+    
+    def _corte(self, valor: Optional[float]) -> int:
+        # Nada é satisfeito por um valor ausente
+        if self.operador == "<":
+            return len(self.limites) if valor is None else bisect_right(self.limites, valor)
+        return 0 if valor is None else bisect_left(self.limites, valor)
+    
+    def alteradas(self, anterior: Optional[float], atual: Optional[float]) -> Tuple[List[int], List[int]]:
+        """Ids que passaram a ser satisfeitos e ids que deixaram de ser, de `anterior` para `atual`."""
+        antes, depois = self._corte(anterior), self._corte(atual)
+        if antes == depois:
+            return [], []
+        if (depois < antes) == (self.operador == "<"):
+            return self.ids[min(antes, depois):max(antes, depois)], []
+        return [], self.ids[min(antes, depois):max(antes, depois)]
+
+def condicao_satisfeita(operador: str, valor: Optional[float], limite: float) -> bool:
+    if valor is None:
+        return False
+    return valor < limite if operador == "<" else valor > limite
+
+class MotorAlertas:
+    """Avalia as regras de alerta a cada lote gravado pelo coletor.
+    
+    Regras ficam indexadas por moeda e, dentro dela, por campo e operador em
+    `_Limiares`; um lote consulta só as moedas que mudaram e, em cada uma, só
+    as regras cujo limite está entre o valor anterior e o novo. Regras novas
+    são avaliadas diretamente na primeira vez que a moeda aparece num lote.
+    """
+    
+    def __init__(self, db_path: str = "data/criptomoedas.db"):
+        self.db_path = db_path
+        self.conn = sqlite3.connect(db_path)
+        criar_tabelas_alertas(self.conn)
+        self.conn.commit()
+        self.notificadores: List[Callable[[dict], None]] = []
+        # False: regras ainda não carregadas
+        self._versao = False
+        self._regras: Dict[int, tuple] = {}
+        self._indice: Dict[str, Dict[Tuple[str, str], _Limiares]] = {}
+        self._pendentes: Dict[str, List[int]] = {}
+        # Último valor visto de cada campo, só para moedas com regras
+        self._ultimos: Dict[str, tuple] = {}
+        self._recarregar_se_mudou()
+    
+    def registrar_notificador(self, callback: Callable[[dict], None]):
+        self.notificadores.append(callback)
+    
+    def versao(self) -> Optional[str]:
+        linha = self.conn.execute("SELECT valor FROM metadados_alertas WHERE chave = 'versao'").fetchone()
+        return linha[0] if linha else None
+    
+    def _incrementar_versao(self):
+        self.conn.execute('''
+            INSERT INTO metadados_alertas (chave, valor) VALUES ('versao', '1')
+            ON CONFLICT(chave) DO UPDATE SET valor = CAST(valor AS INTEGER) + 1
+        ''')
+    
+    def adicionar(self, id_moeda: str, campo: str, operador: str, limite: float) -> int:
+        if campo not in CAMPOS_ALERTA:
+            raise ValueError(f"Campo inválido: {campo} (use {', '.join(CAMPOS_ALERTA)})")
+        if operador not in OPERADORES:
+            raise ValueError(f"Operador inválido: {operador} (use < ou >)")
+        cursor = self.conn.execute(
+            "INSERT INTO alertas (id_moeda, campo, operador, limite, criado_em) VALUES (?, ?, ?, ?, ?)",
+            (id_moeda, campo, operador, float(limite), datetime.utcnow().isoformat())
+        )
+        self._incrementar_versao()
+        self.conn.commit()
+        return cursor.lastrowid
+    
+    def remover(self, id_alerta: int) -> bool:
+        removidas = self.conn.execute("DELETE FROM alertas WHERE id = ?", (id_alerta,)).rowcount
+        if removidas:
+            self._incrementar_versao()
+        self.conn.commit()
+        return bool(removidas)
+    
+    def listar(self) -> List[dict]:
+        return [
+            {"id": linha[0], "id_moeda": linha[1], "campo": linha[2], "operador": linha[3],
+             "limite": linha[4], "satisfeita": None if linha[5] is None else bool(linha[5])}
+            for linha in self.conn.execute(
+                "SELECT id, id_moeda, campo, operador, limite, satisfeita FROM alertas ORDER BY id_moeda, id"
+            )
+        ]
+    
+    def disparos(self, limite: int = 50) -> List[dict]:
+        return [
+            {"seq": linha[0], "id_alerta": linha[1], "id_moeda": linha[2], "valor": linha[3], "disparado_em": linha[4]}
+            for linha in self.conn.execute(
+                "SELECT seq, id_alerta, id_moeda, valor, disparado_em FROM disparos_alertas ORDER BY seq DESC LIMIT ?",
+                (limite,)
+            )
+        ]
+    
+    def _recarregar_se_mudou(self):
+        versao = self.versao()
+        if versao == self._versao:
+            return
+        
+        self._regras = {}
+        self._indice = {}
+        self._pendentes = {}
+        for id_alerta, id_moeda, campo, operador, limite, satisfeita in self.conn.execute(
+            "SELECT id, id_moeda, campo, operador, limite, satisfeita FROM alertas ORDER BY id"
+        ):
+            self._regras[id_alerta] = (id_moeda, campo, operador, limite)
+            if satisfeita is None:
+                self._pendentes.setdefault(id_moeda, []).append(id_alerta)
+            else:
+                self._indexar(id_alerta)
+        
+        # Valores de partida das moedas com regras avaliadas que ainda não passaram por um lote
+        sem_valor = [id_moeda for id_moeda in self._indice if id_moeda not in self._ultimos]
+        if sem_valor:
+            try:
+                for inicio in range(0, len(sem_valor), 500):
+                    parte = sem_valor[inicio:inicio + 500]
+                    for linha in self.conn.execute(
+                        f"SELECT id, preco_usd, variacao_24h, market_cap FROM moedas WHERE id IN ({', '.join('?' * len(parte))})",
+                        parte
+                    ):
+                        self._ultimos[linha[0]] = linha
+            except sqlite3.Error:
+                # Coletor ainda não criou `moedas` neste banco
+                pass
+        self._versao = versao
+    
+    def _indexar(self, id_alerta: int):
+        id_moeda, campo, operador, limite = self._regras[id_alerta]
+        por_campo = self._indice.setdefault(id_moeda, {})
+        limiares = por_campo.get((campo, operador))
+        if limiares is None:
+            limiares = por_campo[(campo, operador)] = _Limiares(operador)
+        limiares.inserir(limite, id_alerta)
+    
+    def avaliar(self, linhas: Iterable[tuple]) -> List[dict]:
+        """Ouvinte do coletor: avalia as linhas de um lote e devolve os alertas disparados."""
+        self._recarregar_se_mudou()
+        
+        disparados: List[Tuple[int, str, Optional[float]]] = []
+        estados: List[Tuple[int, int]] = []
+        for linha in linhas:
+            id_moeda = linha[0]
+            por_campo = self._indice.get(id_moeda)
+            pendentes = self._pendentes.pop(id_moeda, None)
+            if por_campo is None and pendentes is None:
+                continue
+            
+            anterior = self._ultimos.get(id_moeda)
+            for (campo, _), limiares in (por_campo or {}).items():
+                posicao = CAMPOS_ALERTA[campo]
+                valor = linha[posicao]
+                # Sem valor anterior conhecido, tudo o que o valor atual satisfaz é novidade
+                entraram, sairam = limiares.alteradas(anterior[posicao] if anterior else None, valor)
+                disparados.extend((id_alerta, id_moeda, valor) for id_alerta in entraram)
+                estados.extend((1, id_alerta) for id_alerta in entraram)
+                estados.extend((0, id_alerta) for id_alerta in sairam)
+            
+            for id_alerta in pendentes or ():
+                _, campo, operador, limite = self._regras[id_alerta]
+                valor = linha[CAMPOS_ALERTA[campo]]
+                satisfeita = condicao_satisfeita(operador, valor, limite)
+                if satisfeita:
+                    disparados.append((id_alerta, id_moeda, valor))
+                estados.append((int(satisfeita), id_alerta))
+                self._indexar(id_alerta)
+            
+            self._ultimos[id_moeda] = tuple(linha[:4])
+        
+        if not estados:
+            return []
+        
+        agora = datetime.utcnow().isoformat()
+        self.conn.executemany("UPDATE alertas SET satisfeita = ? WHERE id = ?", estados)
+        self.conn.executemany(
+            "INSERT INTO disparos_alertas (id_alerta, id_moeda, valor, disparado_em) VALUES (?, ?, ?, ?)",
+            [disparo + (agora,) for disparo in disparados]
+        )
+        self.conn.commit()
+        
+        resultado = []
+        for id_alerta, id_moeda, valor in disparados:
+            _, campo, operador, limite = self._regras[id_alerta]
+            disparo = {"id": id_alerta, "id_moeda": id_moeda, "campo": campo, "operador": operador,
+                       "limite": limite, "valor": valor, "disparado_em": agora}
+            resultado.append(disparo)
+            for notificador in self.notificadores:
+                try:
+                    notificador(disparo)
+                except Exception as e:
+                    print(f"Erro ao notificar alerta #{id_alerta}: {e}")
+        return resultado
+    
+    def fechar(self):
+        self.conn.close()
+
+def imprimir_disparo(disparo: dict):
+    print(f"Alerta #{disparo['id']}: {disparo['id_moeda']} {disparo['campo']} {disparo['operador']} "
+          f"{disparo['limite']:g} (atual: {disparo['valor']:g})")
+
+def main():
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Gerencia os alertas de preço avaliados pelo coletor")
+    parser.add_argument("--db", default="data/criptomoedas.db")
+    parser.add_argument("--adicionar", nargs=4, metavar=("MOEDA", "CAMPO", "OPERADOR", "LIMITE"),
+                        help=f"Novo alerta, ex.: solana preco_usd '<' 100 (campos: {', '.join(CAMPOS_ALERTA)})")
+    parser.add_argument("--remover", type=int, metavar="ID", help="Remove o alerta com este id")
+    parser.add_argument("--disparos", type=int, metavar="N", help="Mostra os N disparos mais recentes")
+    args = parser.parse_args()
+    
+    motor = MotorAlertas(args.db)
+    try:
+        if args.adicionar:
+            id_moeda, campo, operador, limite = args.adicionar
+            try:
+                print(f"Alerta #{motor.adicionar(id_moeda, campo, operador, float(limite))} criado.")
+            except ValueError as e:
+                parser.error(str(e))
+        elif args.remover is not None:
+            print("Alerta removido." if motor.remover(args.remover) else "Alerta não encontrado.")
+        elif args.disparos:
+            for disparo in motor.disparos(args.disparos):
+                print(f"{disparo['disparado_em']}  #{disparo['id_alerta']} {disparo['id_moeda']} ({disparo['valor']:g})")
+        else:
+            for alerta in motor.listar():
+                estado = {None: "pendente", True: "satisfeita", False: "armada"}[alerta["satisfeita"]]
+                print(f"#{alerta['id']} {alerta['id_moeda']} {alerta['campo']} {alerta['operador']} "
+                      f"{alerta['limite']:g} [{estado}]")
+    finally:
+        motor.fechar()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+import json
+from pathlib import Path
+from typing import Dict, Tuple
+
+# Apelido -> ids das moedas. Resolvido na construção do índice: o apelido vira
+# uma chave com as postings dessas moedas, sem expansão na hora da consulta.
+ALIASES: Dict[str, Tuple[str, ...]] = {
+    # Tickers alternativos
+    "xbt": ("bitcoin",),
+    "bcash": ("bitcoin-cash",),
+    "wbtc": ("wrapped-bitcoin",),
+    # Apelidos comuns
+    "ether": ("ethereum",),
+    "doge": ("dogecoin",),
+    "ripple": ("ripple",),
+    "binance coin": ("binancecoin",),
+    "toncoin": ("the-open-network",),
+    "wif": ("dogwifcoin",),
+    "trump": ("official-trump",),
+    "worldcoin": ("worldcoin-wld",),
+    # Nomes antigos e migrações de token
+    "matic": ("polygon-ecosystem-token", "matic-network"),
+    "polygon": ("polygon-ecosystem-token", "matic-network"),
+    "fantom": ("sonic-3", "fantom"),
+    "ftm": ("sonic-3", "fantom"),
+    "eos": ("vaulta", "eos"),
+    "maker": ("sky",),
+    "mkr": ("sky",),
+    "elrond": ("elrond-erd-2",),
+    "multiversx": ("elrond-erd-2",),
+    "fetch": ("fetch-ai",),
+    "agix": ("fetch-ai",),
+    "ocean": ("fetch-ai",),
+    "rndr": ("render-token",),
+    "crypto com": ("crypto-com-chain",),
+    # Variantes wrapped/bridged/staked
+    "wrapped eth": ("weth",),
+    "wrapped ether": ("weth",),
+    "wrapped btc": ("wrapped-bitcoin", "coinbase-wrapped-btc"),
+    "wrapped bitcoin": ("wrapped-bitcoin", "coinbase-wrapped-btc"),
+    "wrapped bnb": ("wbnb",),
+    "wrapped sol": ("wrapped-solana",),
+    "staked eth": ("staked-ether", "wrapped-steth"),
+    "lido eth": ("staked-ether", "wrapped-steth"),
+}
+
+def carregar_aliases(arquivo: str = "data/aliases.json") -> Dict[str, Tuple[str, ...]]:
+    """Apelidos embutidos mais os do arquivo JSON opcional ({"apelido": ["id", ...]})."""
+    aliases = dict(ALIASES)
+    caminho = Path(arquivo)
+    if not caminho.is_file():
+        return aliases
+    
+    try:
+        with open(caminho, encoding="utf-8") as f:
+            extras = json.load(f)
+        for apelido, ids in extras.items():
+            ids = (ids,) if isinstance(ids, str) else tuple(ids)
+            aliases[apelido] = tuple(dict.fromkeys(aliases.get(apelido, ()) + ids))
+    except (OSError, ValueError, AttributeError, TypeError) as e:
+        print(f"Erro ao carregar apelidos de {arquivo}: {e}")
+    
+    return aliases
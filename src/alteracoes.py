@@ -0,0 +1,76 @@
+import asyncio
+import sqlite3
+from typing import Callable, Dict, List, Optional, Set
+
+CAMPOS_ALTERACAO = ("preco_usd", "variacao_24h", "market_cap", "ultima_atualizacao")
+
+class FeedAlteracoes:
+    """Entrega as alterações de `moedas` gravadas pelo coletor a quem assinou cada id.
+    
+    Uma única tarefa por processo acompanha `alteracoes_moedas` pelo `seq`,
+    independentemente de quantas sessões estejam abertas.
+    """
+    
+    def __init__(self, db_path: str = "data/criptomoedas.db", intervalo: float = 2.0):
+        self.db_path = db_path
+        self.intervalo = intervalo
+        self._assinantes: Dict[str, Set[Callable[[dict], None]]] = {}
+        self._ultimo_seq: Optional[int] = None
+        self._tarefa: Optional[asyncio.Task] = None
+    
+    def assinar(self, id_moeda: str, callback: Callable[[dict], None]) -> Callable[[], None]:
+        self._assinantes.setdefault(id_moeda, set()).add(callback)
+        
+        if self._tarefa is None or self._tarefa.done():
+            # A tarefa anterior parou quando saiu o último assinante: o que foi
+            # gravado nesse intervalo não é entregue, a leitura recomeça do MAX(seq) atual
+            self._ultimo_seq = None
+            self._tarefa = asyncio.get_running_loop().create_task(self._acompanhar())
+        
+        def cancelar():
+            callbacks = self._assinantes.get(id_moeda)
+            if callbacks is not None:
+                callbacks.discard(callback)
+                if not callbacks:
+                    del self._assinantes[id_moeda]
+        
+        return cancelar
+    
+    def _ler_alteracoes(self) -> List[tuple]:
+        conn = sqlite3.connect(self.db_path)
+        try:
+            if self._ultimo_seq is None:
+                # Só interessa o que acontecer daqui em diante
+                self._ultimo_seq = conn.execute("SELECT COALESCE(MAX(seq), 0) FROM alteracoes_moedas").fetchone()[0]
+                return []
+            return conn.execute(
+                f"SELECT seq, id, {', '.join(CAMPOS_ALTERACAO)} FROM alteracoes_moedas WHERE seq > ? ORDER BY seq",
+                (self._ultimo_seq,)
+            ).fetchall()
+        finally:
+            conn.close()
+    
+    def publicar(self, alteracoes: List[tuple]):
+        for linha in alteracoes:
+            self._ultimo_seq = max(self._ultimo_seq or 0, linha[0])
+            callbacks = self._assinantes.get(linha[1])
+            if not callbacks:
+                continue
+            delta = dict(zip(CAMPOS_ALTERACAO, linha[2:]))
+            for callback in list(callbacks):
+                try:
+                    callback(delta)
+                except Exception as e:
+                    print(f"Erro ao entregar alteração de {linha[1]}: {e}")
+    
+    async def _acompanhar(self):
+        loop = asyncio.get_running_loop()
+        
+        while self._assinantes:
+            try:
+                alteracoes = await loop.run_in_executor(None, self._ler_alteracoes)
+                self.publicar(alteracoes)
+            except sqlite3.Error:
+                # Banco ainda sem a tabela de alterações (coletor nunca rodou): tenta de novo depois
+                pass
+            await asyncio.sleep(self.intervalo)
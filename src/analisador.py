@@ -0,0 +1,109 @@
+import re
+import unicodedata
+from typing import FrozenSet, Iterable, List, Optional, Tuple
+
+STOPWORDS_PADRAO = frozenset({
+    'de', 'da', 'do', 'das', 'dos', 'a', 'o', 'as', 'os', 'e', 'em', 'para',
+    'com', 'por', 'um', 'uma', 'uns', 'umas', 'na', 'no', 'nas', 'nos'
+})
+
+# Sinais sem decomposição NFKD que aparecem em nomes/símbolos reais
+SIMBOLOS_EQUIVALENTES = {
+    "₮": "T",
+    "₿": "B",
+    "€": "EUR",
+    "ℏ": "h",
+}
+
+# Conectores que formam uma palavra composta ("shiba-inu", "usdc.e", "MAGIC•INTERNET•MONEY")
+CONECTORES = "-.'’•_+"
+
+class Analisador:
+    """Pipeline de normalização usado tanto na construção do índice quanto na consulta.
+    
+    Etapas: sinais equivalentes, NFKD sem acentos, palavras compostas por
+    conectores, divisão camelCase/letra-dígito, casefold, stopwords e,
+    opcionalmente, n-gramas de borda (prefixos) para busca por prefixo.
+    """
+    
+    def __init__(self, stopwords: Iterable[str] = STOPWORDS_PADRAO, separar_camel: bool = True,
+                 separar_digitos: bool = True, tamanho_minimo_parte: int = 2,
+                 ngramas_borda: Optional[Tuple[int, int]] = None):
+        self.stopwords: FrozenSet[str] = frozenset(stopwords)
+        self.separar_camel = separar_camel
+        self.separar_digitos = separar_digitos
+        self.tamanho_minimo_parte = tamanho_minimo_parte
+        self.ngramas_borda = ngramas_borda
+        
+        # Tudo compilado uma única vez por analisador
+        self._tabela_simbolos = str.maketrans(SIMBOLOS_EQUIVALENTES)
+        conectores = re.escape(CONECTORES)
+        self._palavra = re.compile(rf"[^\W_]+(?:[{conectores}]+[^\W_]+)*")
+        self._alfanumerico = re.compile(r"[^\W_]+")
+        fronteiras = []
+        if separar_camel:
+            fronteiras += [r"(?<=[a-z])(?=[A-Z])", r"(?<=[A-Z])(?=[A-Z][a-z])"]
+        if separar_digitos:
+            fronteiras += [r"(?<=[^\W\d_])(?=\d)", r"(?<=\d)(?=[^\W\d_])"]
+        self._fronteira = re.compile("|".join(fronteiras)) if fronteiras else None
+    
+    def dobrar(self, texto: str) -> str:
+        """Remove acentos e troca sinais por letras, preservando maiúsculas."""
+        if texto.isascii():
+            return texto
+        texto = texto.translate(self._tabela_simbolos)
+        decomposto = unicodedata.normalize("NFKD", texto)
+        return "".join(c for c in decomposto if not unicodedata.combining(c))
+    
+    def normalizar(self, texto: str) -> str:
+        """Forma canônica de um texto inteiro, sem quebrar em tokens (ex.: símbolo "usdc.e")."""
+        if not texto:
+            return ""
+        return self.dobrar(texto).casefold().strip().strip("$").strip()
+    
+    def _partes(self, palavra: str) -> List[str]:
+        # Caminho rápido: só letras, sem troca de caixa no meio ("bitcoin", "Bitcoin", "ETH")
+        if palavra.isalpha() and (palavra.islower() or palavra.isupper() or palavra[1:].islower()):
+            return [palavra]
+        
+        partes = []
+        for pedaco in self._alfanumerico.findall(palavra):
+            partes.extend(self._fronteira.split(pedaco) if self._fronteira else [pedaco])
+        return partes
+    
+    def tokens(self, texto: str, consulta: bool = False) -> List[str]:
+        """Tokens de um texto; na consulta só a forma unida de cada palavra, sem n-gramas."""
+        if not texto:
+            return []
+        
+        tokens = []
+        for palavra in self._palavra.findall(self.dobrar(texto)):
+            partes = self._partes(palavra)
+            unida = "".join(partes).casefold()
+            if unida not in self.stopwords:
+                tokens.append(unida)
+            
+            if consulta or len(partes) < 2:
+                continue
+            for parte in partes:
+                parte = parte.casefold()
+                if len(parte) >= self.tamanho_minimo_parte and parte not in self.stopwords:
+                    tokens.append(parte)
+        
+        if not tokens:
+            # Nomes só com emoji/símbolos não têm palavras: o texto inteiro vira o token
+            inteiro = "".join(self.normalizar(texto).split())
+            if inteiro:
+                tokens.append(inteiro)
+        
+        if self.ngramas_borda and not consulta:
+            minimo, maximo = self.ngramas_borda
+            tokens.extend(
+                token[:tamanho]
+                for token in list(tokens)
+                for tamanho in range(minimo, min(maximo, len(token) - 1) + 1)
+            )
+        
+        return list(dict.fromkeys(tokens))
+
+ANALISADOR_PADRAO = Analisador()
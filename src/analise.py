@@ -0,0 +1,237 @@
+import os
+import re
+import sqlite3
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from snapshots import abrir_snapshot, caminho_ultimo_snapshot
+
+CAMPOS_ANALISE = ("preco_usd", "variacao_24h", "market_cap")
+
+FAIXAS_MARKET_CAP = (0, 1e6, 1e7, 1e8, 1e9, 1e10, 1e11, np.inf)
+
+# Não há setor no CoinGecko /coins/markets: classificação aproximada por palavras no nome/símbolo
+SETORES_PALAVRAS = {
+    "stablecoin": ("usd", "eur", "dai", "stable"),
+    "wrapped/bridged": ("wrapped", "bridged", "staked", "wormhole"),
+    "meme": ("doge", "inu", "pepe", "shib", "bonk", "meme", "cat", "frog", "wif"),
+    "ai": ("ai", "gpt", "agent", "neural"),
+    "defi": ("swap", "dex", "finance", "lend", "yield"),
+}
+
+class AnalisadorMercado:
+    """Estatísticas vetorizadas sobre o snapshot de `moedas`, recalculadas só quando o banco muda."""
+    
+    def __init__(self, db_path: str = "data/criptomoedas.db", diretorio_snapshots: Optional[str] = None):
+        self.db_path = db_path
+        # Com um diretório de snapshots, as colunas vêm do último snapshot mapeado em memória
+        self.diretorio_snapshots = diretorio_snapshots
+        self._geracao = None
+        self._colunas: Dict[str, np.ndarray] = {}
+        self._cache: Dict[tuple, object] = {}
+        self._lock = threading.Lock()
+    
+    def geracao_dados(self) -> Tuple[int, int]:
+        if self.diretorio_snapshots:
+            snapshot = caminho_ultimo_snapshot(self.diretorio_snapshots)
+            if snapshot is not None:
+                estado = os.stat(snapshot)
+                return estado.st_mtime_ns, estado.st_size
+        # Todo commit no SQLite (modo rollback journal) altera mtime/tamanho do arquivo
+        estado = os.stat(self.db_path)
+        return estado.st_mtime_ns, estado.st_size
+    
+    def _carregar(self):
+        tabela = abrir_snapshot(self.diretorio_snapshots) if self.diretorio_snapshots else None
+        if tabela is not None:
+            self._colunas = {
+                coluna: np.array(tabela.column(coluna).to_pylist(), dtype=object)
+                for coluna in ("id", "nome", "simbolo")
+            }
+            for coluna in CAMPOS_ANALISE:
+                # Nulos viram NaN; sem nulos a conversão não copia o buffer
+                self._colunas[coluna] = tabela.column(coluna).to_numpy()
+            return
+        
+        conn = sqlite3.connect(self.db_path)
+        try:
+            linhas = conn.execute(
+                "SELECT id, nome, simbolo, preco_usd, variacao_24h, market_cap FROM moedas"
+            ).fetchall()
+        finally:
+            conn.close()
+        
+        colunas = list(zip(*linhas)) if linhas else [()] * 6
+        self._colunas = {
+            "id": np.array(colunas[0], dtype=object),
+            "nome": np.array(colunas[1], dtype=object),
+            "simbolo": np.array(colunas[2], dtype=object),
+            # None vira NaN, ignorado pelas funções nan* do NumPy
+            "preco_usd": np.array(colunas[3], dtype=float),
+            "variacao_24h": np.array(colunas[4], dtype=float),
+            "market_cap": np.array(colunas[5], dtype=float),
+        }
+    
+    def _calcular(self, chave: tuple, funcao):
+        with self._lock:
+            geracao = self.geracao_dados()
+            if geracao != self._geracao:
+                self._carregar()
+                self._cache.clear()
+                self._geracao = geracao
+            
+            if chave not in self._cache:
+                self._cache[chave] = funcao()
+            return self._cache[chave]
+    
+    def _linhas(self, indices: np.ndarray) -> List[dict]:
+        c = self._colunas
+        return [
+            {
+                "id": c["id"][i],
+                "nome": c["nome"][i],
+                "simbolo": c["simbolo"][i],
+                "preco_usd": _numero(c["preco_usd"][i]),
+                "variacao_24h": _numero(c["variacao_24h"][i]),
+                "market_cap": _numero(c["market_cap"][i]),
+            }
+            for i in indices
+        ]
+    
+    def maiores_variacoes(self, k: int = 10, alta: bool = True,
+                          market_cap_minimo: float = 0.0) -> List[dict]:
+        if k < 1:
+            raise ValueError(f"k deve ser positivo: {k}")
+        
+        def calcular():
+            variacao = self._colunas["variacao_24h"]
+            validos = np.flatnonzero(~np.isnan(variacao) & (np.nan_to_num(self._colunas["market_cap"]) >= market_cap_minimo))
+            if validos.size == 0:
+                return []
+            
+            valores = variacao[validos] if alta else -variacao[validos]
+            quantidade = min(k, validos.size)
+            # argpartition é O(n); só os k escolhidos são ordenados
+            candidatos = np.argpartition(-valores, quantidade - 1)[:quantidade]
+            candidatos = candidatos[np.argsort(-valores[candidatos])]
+            return self._linhas(validos[candidatos])
+        
+        return self._calcular(("maiores_variacoes", k, alta, market_cap_minimo), calcular)
+    
+    def faixas_market_cap(self, limites: Sequence[float] = FAIXAS_MARKET_CAP) -> List[dict]:
+        def calcular():
+            market_cap = self._colunas["market_cap"]
+            market_cap = market_cap[~np.isnan(market_cap)]
+            contagens, _ = np.histogram(market_cap, bins=limites)
+            faixa = np.digitize(market_cap, limites[1:-1])
+            somas = np.bincount(faixa, weights=market_cap, minlength=len(limites) - 1)
+            return [
+                {
+                    "de": float(limites[i]),
+                    "ate": None if np.isinf(limites[i + 1]) else float(limites[i + 1]),
+                    "moedas": int(contagens[i]),
+                    "market_cap_total": float(somas[i]),
+                }
+                for i in range(len(limites) - 1)
+            ]
+        
+        return self._calcular(("faixas_market_cap", tuple(limites)), calcular)
+    
+    def percentis(self, campo: str = "variacao_24h",
+                  quantis: Sequence[float] = (1, 5, 25, 50, 75, 95, 99)) -> Dict[str, Optional[float]]:
+        if campo not in CAMPOS_ANALISE:
+            raise ValueError(f"Campo inválido: {campo}")
+        
+        def calcular():
+            valores = self._colunas[campo]
+            if np.isnan(valores).all():
+                return {f"p{q:g}": None for q in quantis}
+            resultado = np.nanpercentile(valores, quantis)
+            return {f"p{q:g}": float(v) for q, v in zip(quantis, resultado)}
+        
+        return self._calcular(("percentis", campo, tuple(quantis)), calcular)
+    
+    def setores(self) -> List[dict]:
+        def calcular():
+            # Espaço antes de cada palavra: a busca " palavra" só casa no início de uma palavra
+            texto = np.char.lower(np.array(
+                [" " + re.sub(r"[^0-9a-zA-Z]+", " ", f"{nome or ''} {simbolo or ''}")
+                 for nome, simbolo in zip(self._colunas["nome"], self._colunas["simbolo"])],
+                dtype=str
+            ))
+            market_cap = np.nan_to_num(self._colunas["market_cap"])
+            variacao = self._colunas["variacao_24h"]
+            
+            resultado = []
+            for setor, palavras in SETORES_PALAVRAS.items():
+                mascara = np.zeros(texto.shape, dtype=bool)
+                for palavra in palavras:
+                    mascara |= np.char.find(texto, " " + palavra) >= 0
+                resultado.append({
+                    "setor": setor,
+                    "moedas": int(mascara.sum()),
+                    "market_cap_total": float(market_cap[mascara].sum()),
+                    "variacao_mediana": _numero(np.nanmedian(variacao[mascara])) if mascara.any() else None,
+                })
+            return sorted(resultado, key=lambda item: item["market_cap_total"], reverse=True)
+        
+        return self._calcular(("setores",), calcular)
+    
+    def resumo(self) -> dict:
+        def calcular():
+            variacao = self._colunas["variacao_24h"]
+            market_cap = self._colunas["market_cap"]
+            return {
+                "moedas": int(variacao.size),
+                "market_cap_total": float(np.nansum(market_cap)),
+                "variacao_mediana": _numero(np.nanmedian(variacao)) if variacao.size else None,
+                "em_alta": int(np.sum(variacao > 0)),
+                "em_baixa": int(np.sum(variacao < 0)),
+            }
+        
+        return self._calcular(("resumo",), calcular)
+
+def _numero(valor) -> Optional[float]:
+    return None if valor is None or np.isnan(valor) else float(valor)
+
+def main():
+    import argparse
+    import json
+    
+    parser = argparse.ArgumentParser(description="Estatísticas de mercado sobre data/criptomoedas.db")
+    parser.add_argument("--db", default="data/criptomoedas.db")
+    parser.add_argument("--snapshots", metavar="DIR", help="Lê do último snapshot colunar em DIR (ex.: data/snapshots)")
+    subparsers = parser.add_subparsers(dest="comando", required=True)
+    
+    subparsers.add_parser("resumo", help="Visão geral do mercado")
+    variacoes = subparsers.add_parser("variacoes", help="Maiores altas/baixas em 24h")
+    variacoes.add_argument("-k", type=int, default=10)
+    variacoes.add_argument("--baixa", action="store_true", help="Maiores quedas em vez de maiores altas")
+    variacoes.add_argument("--market-cap-minimo", type=float, default=0.0)
+    subparsers.add_parser("faixas", help="Distribuição por faixa de market cap")
+    percentis = subparsers.add_parser("percentis", help="Percentis de um campo numérico")
+    percentis.add_argument("--campo", choices=CAMPOS_ANALISE, default="variacao_24h")
+    subparsers.add_parser("setores", help="Somas por setor (classificação aproximada)")
+    
+    args = parser.parse_args()
+    if args.comando == "variacoes" and args.k < 1:
+        parser.error("-k deve ser positivo")
+    analisador = AnalisadorMercado(args.db, args.snapshots)
+    
+    if args.comando == "resumo":
+        resultado = analisador.resumo()
+    elif args.comando == "variacoes":
+        resultado = analisador.maiores_variacoes(args.k, not args.baixa, args.market_cap_minimo)
+    elif args.comando == "faixas":
+        resultado = analisador.faixas_market_cap()
+    elif args.comando == "percentis":
+        resultado = analisador.percentis(args.campo)
+    else:
+        resultado = analisador.setores()
+    
+    print(json.dumps(resultado, indent=2, ensure_ascii=False))
+
+if __name__ == "__main__":
+    main()
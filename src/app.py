@@ -1,21 +1,57 @@
 from reactpy import component, html, hooks, run
 from reactpy.backend.fastapi import configure
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException
+import asyncio
+import os
 import sqlite3
-import pickle
-from typing import List, Tuple, Set
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple, Set, TYPE_CHECKING
+from alteracoes import FeedAlteracoes
+from analisador import ANALISADOR_PADRAO
+from analise import CAMPOS_ANALISE, AnalisadorMercado
+from filtro_bloom import FiltroSubstrings
+from filtros import (Filtro, clausula_filtros, clausula_ordenacao, clausula_texto, interpretar_filtros,
+                     interpretar_ordenacao)
+from indiceinvertido import carregar_postings, memoria_indice
+from planejador import Planejador, estatisticas_banco
+from rastreamento import Rastreador, etapa
+from sentimento import PontuacoesSentimento, rotulo_sentimento
+
+if TYPE_CHECKING:
+    # NumPy/SciPy só quando o modelo é usado pela primeira vez
+    from similaridade import ModeloSimilaridade
 
 class CryptoSearchEngine:
-    def __init__(self, db_path: str = "data/criptomoedas.db", index_path: str = "data/indice_invertido.pkl"):
+    def __init__(self, db_path: str = "data/criptomoedas.db", index_path: str = "data/indice_invertido.pkl",
+                 symbols_path: str = "data/simbolos.pkl", substring_filter_path: str = "data/filtro_substrings.pkl",
+                 tracer: Optional[Rastreador] = None, similarity_path: str = "data/similaridade.pkl"):
         self.db_path = db_path
         self.index_path = index_path
-        self.inverted_index = {}
-        self.index_loaded = self._load_inverted_index()
+        self.symbols_path = symbols_path
+        self.substring_filter_path = substring_filter_path
+        self.similarity_path = similarity_path
+        self._inverted_index = {}
+        self._index_loaded = None
+        self._symbol_table = None
+        self._substring_filter = False
+        self._similarity_model = False
+        self._planner = None
+        self.tracer = tracer or Rastreador.do_ambiente()
+    
+    @property
+    def inverted_index(self) -> dict:
+        if self._index_loaded is None:
+            self._index_loaded = self._load_inverted_index()
+        return self._inverted_index
+    
+    @property
+    def index_loaded(self) -> bool:
+        if self._index_loaded is None:
+            self._index_loaded = self._load_inverted_index()
+        return self._index_loaded
         
     def _load_inverted_index(self) -> bool:
         try:
-            with open(self.index_path, "rb") as file:
-                self.inverted_index = pickle.load(file)
+            self._inverted_index = carregar_postings(self.index_path)
             return True
         except FileNotFoundError:
             print(f"Arquivo de índice não encontrado: {self.index_path}")
@@ -25,66 +61,200 @@ class CryptoSearchEngine:
             print(f"Error loading inverted index: {e}")
             return False
     
+    @property
+    def symbol_table(self) -> dict:
+        if self._symbol_table is None:
+            import pickle
+            
+            try:
+                with open(self.symbols_path, "rb") as file:
+                    self._symbol_table = pickle.load(file)
+            except Exception:
+                self._symbol_table = {}
+        return self._symbol_table
+    
+    @property
+    def substring_filter(self) -> Optional[FiltroSubstrings]:
+        # False = ainda não carregado; None = arquivo ausente (sem rejeição rápida)
+        if self._substring_filter is False:
+            import pickle
+            
+            try:
+                with open(self.substring_filter_path, "rb") as file:
+                    self._substring_filter = pickle.load(file)
+            except Exception:
+                self._substring_filter = None
+        return self._substring_filter
+    
+    @property
+    def similarity_model(self) -> Optional["ModeloSimilaridade"]:
+        # False = ainda não carregado; None = modelo ausente ou scipy não instalado
+        if self._similarity_model is False:
+            from similaridade import carregar_modelo
+            
+            self._similarity_model = carregar_modelo(self.similarity_path)
+        return self._similarity_model
+    
+    def similar_coins(self, crypto_id: str, k: int = 5) -> List[dict]:
+        """Vizinhos por n-gramas de nome/símbolo/id; as maiores moedas vêm do cache do modelo."""
+        model = self.similarity_model
+        return model.similares(crypto_id, k) if model is not None else []
+    
+    @property
+    def planner(self) -> Planejador:
+        # Estatísticas do índice e do banco lidas uma vez; o plano de cada consulta sai delas
+        if self._planner is None:
+            total_documents, database_indexes = estatisticas_banco(self.db_path)
+            self._planner = Planejador(
+                self.inverted_index if self.index_loaded else {}, self.substring_filter,
+                self.symbol_table, total_documents, database_indexes
+            )
+        return self._planner
+    
+    def index_memory(self) -> Dict[str, int]:
+        """RAM estimada do que está carregado: índice por estrutura, tabela de símbolos e filtro de Bloom."""
+        import sys
+        
+        memory = memoria_indice(self._inverted_index) if self._index_loaded else {}
+        memory.pop("total", None)
+        if self._symbol_table:
+            memory["symbol_table"] = sys.getsizeof(self._symbol_table) + sum(
+                sys.getsizeof(key) + sys.getsizeof(entry) + sys.getsizeof(entry[0])
+                for key, entry in self._symbol_table.items()
+            )
+        if self._substring_filter:
+            memory["substring_filter"] = sys.getsizeof(self._substring_filter.filtro.bits)
+        memory["total"] = sum(memory.values())
+        return memory
+    
+    def resolve_symbol(self, symbol: str) -> Optional[dict]:
+        """Resolução exata de ticker em O(1): moeda canônica primeiro, com metadados de ambiguidade."""
+        key = ANALISADOR_PADRAO.normalizar(symbol)
+        entry = self.symbol_table.get(key)
+        if entry is None:
+            return None
+        
+        ids, canonical_share = entry
+        return {
+            "symbol": key,
+            "canonical": ids[0],
+            "ids": list(ids),
+            "candidates": len(ids),
+            "ambiguous": len(ids) > 1,
+            "canonical_market_cap_share": canonical_share,
+        }
+    
     def _search_ids_by_term(self, term: str) -> Set[str]:
         if not self.inverted_index:
             return set()
         
-        normalized_term = term.lower().strip()
-        found_ids = set()
-        
-        if normalized_term in self.inverted_index:
-            found_ids.update(self.inverted_index[normalized_term])
-        
-        if not found_ids:
-            for indexed_term, ids in self.inverted_index.items():
-                if normalized_term in indexed_term:
-                    found_ids.update(ids)
-        
-        return found_ids
+        # Mesma semântica para todos os caminhos (interpretar_termo): exato só com
+        # chaves exatas; prefixo e infixo casam partes de palavras indexadas.
+        # Postings são bitmaps de docids e só o resultado final vira ids de moeda.
+        with etapa("term_lookup"):
+            found_ids = self.inverted_index.consultar([term], self.substring_filter)[term]
+        return self.inverted_index.ids(found_ids) if found_ids else set()
     
-    def search_by_id(self, term: str) -> List[Tuple]:
+    def _search_by_column(self, column: str, term: str, limit: int, offset: int,
+                          filters: Optional[List[Filtro]], sort: Optional[Tuple[str, bool]]) -> List[Tuple]:
+        text_sql, text_params = clausula_texto(column, term)
+        filter_sql, filter_params = clausula_filtros(filters)
+        conn = sqlite3.connect(self.db_path)
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            query = "SELECT * FROM moedas WHERE LOWER(id) LIKE ? ORDER BY market_cap DESC LIMIT 50"
-            cursor.execute(query, (f"%{term.lower()}%",))
-            results = cursor.fetchall()
+            query = f"""
+                SELECT * FROM moedas WHERE {text_sql} {"AND " + filter_sql if filter_sql else ""}
+                {clausula_ordenacao(sort)} LIMIT ? OFFSET ?
+            """
+            with etapa("sql"):
+                return conn.execute(query, (*text_params, *filter_params, limit, offset)).fetchall()
+        finally:
             conn.close()
-            return results
+    
+    def search_by_id(self, term: str, limit: int = 50, offset: int = 0,
+                     filters: Optional[List[Filtro]] = None, sort: Optional[Tuple[str, bool]] = None) -> List[Tuple]:
+        try:
+            return self._search_by_column("id", term, limit, offset, filters, sort)
         except Exception as e:
             print(f"Error in ID search: {e}")
             return []
     
-    def search_by_name(self, term: str) -> List[Tuple]:
+    def search_by_name(self, term: str, limit: int = 50, offset: int = 0,
+                       filters: Optional[List[Filtro]] = None, sort: Optional[Tuple[str, bool]] = None) -> List[Tuple]:
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            query = "SELECT * FROM moedas WHERE LOWER(nome) LIKE ? ORDER BY market_cap DESC LIMIT 50"
-            cursor.execute(query, (f"%{term.lower()}%",))
-            results = cursor.fetchall()
-            conn.close()
-            return results
+            return self._search_by_column("nome", term, limit, offset, filters, sort)
         except Exception as e:
             print(f"Error in name search: {e}")
             return []
     
-    def search_by_symbol(self, term: str) -> List[Tuple]:
+    def _search_resolved_symbol(self, resolution: dict, limit: int, offset: int,
+                                filters: Optional[List[Filtro]], sort: Optional[Tuple[str, bool]]) -> List[Tuple]:
+        ids = resolution["ids"]
+        placeholders = ','.join(['?' for _ in ids])
+        filter_sql, filter_params = clausula_filtros(filters)
+        query = f"SELECT * FROM moedas WHERE id IN ({placeholders}) {'AND ' + filter_sql if filter_sql else ''}"
+        
+        conn = sqlite3.connect(self.db_path)
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            query = "SELECT * FROM moedas WHERE LOWER(simbolo) LIKE ? ORDER BY market_cap DESC LIMIT 50"
-            cursor.execute(query, (f"%{term.lower()}%",))
-            results = cursor.fetchall()
+            with etapa("sql"):
+                if sort:
+                    return conn.execute(f"{query} {clausula_ordenacao(sort)} LIMIT ? OFFSET ?",
+                                        [*ids, *filter_params, limit, offset]).fetchall()
+                results = conn.execute(query, [*ids, *filter_params]).fetchall()
+        finally:
             conn.close()
-            return results
+        
+        # Ordem da tabela de símbolos: canônica primeiro
+        rank = {crypto_id: position for position, crypto_id in enumerate(ids)}
+        results.sort(key=lambda row: rank[row[0]])
+        return results[offset:offset + limit]
+    
+    def search_by_symbol(self, term: str, limit: int = 50, offset: int = 0,
+                         filters: Optional[List[Filtro]] = None, sort: Optional[Tuple[str, bool]] = None) -> List[Tuple]:
+        try:
+            resolution = self.resolve_symbol(term)
+            if resolution:
+                return self._search_resolved_symbol(resolution, limit, offset, filters, sort)
+            return self._search_by_column("simbolo", term, limit, offset, filters, sort)
         except Exception as e:
             print(f"Error in symbol search: {e}")
             return []
     
-    def search_with_inverted_index(self, term: str) -> List[Tuple]:
-        if not self.index_loaded:
-            print("Inverted index not loaded, using name search as fallback")
-            return self.search_by_name(term)
+    def _search_scan(self, term: str, limit: int, offset: int,
+                     filters: Optional[List[Filtro]], sort: Optional[Tuple[str, bool]]) -> List[Tuple]:
+        # Varredura completa: cada token precisa aparecer no id, no nome ou no símbolo
+        tokens = ANALISADOR_PADRAO.tokens(term, consulta=True) or [term.strip().lower()]
+        token_sql = " AND ".join("(id LIKE ? OR lower(nome) LIKE ? OR lower(simbolo) LIKE ?)" for _ in tokens)
+        token_params = [f"%{token}%" for token in tokens for _ in range(3)]
+        filter_sql, filter_params = clausula_filtros(filters)
+        conn = sqlite3.connect(self.db_path)
+        try:
+            query = f"""
+                SELECT * FROM moedas WHERE {token_sql} {"AND " + filter_sql if filter_sql else ""}
+                {clausula_ordenacao(sort)} LIMIT ? OFFSET ?
+            """
+            with etapa("sql"):
+                return conn.execute(query, (*token_params, *filter_params, limit, offset)).fetchall()
+        finally:
+            conn.close()
+    
+    def search_with_inverted_index(self, term: str, limit: int = 50, offset: int = 0,
+                                   filters: Optional[List[Filtro]] = None,
+                                   sort: Optional[Tuple[str, bool]] = None) -> List[Tuple]:
+        # Busca inteligente: o planejador escolhe o plano mais barato entre os de mesmo resultado
+        with etapa("plan"):
+            strategy = self.planner.planejar(term)["estrategia"]
+        return self._run_strategy(strategy, term, limit, offset, filters, sort)
+    
+    def _run_strategy(self, strategy: str, term: str, limit: int = 50, offset: int = 0,
+                      filters: Optional[List[Filtro]] = None, sort: Optional[Tuple[str, bool]] = None) -> List[Tuple]:
+        if strategy == "vazio":
+            return []
+        if strategy == "varredura":
+            try:
+                return self._search_scan(term, limit, offset, filters, sort)
+            except Exception as e:
+                print(f"Error in scan search: {e}")
+                return []
         
         found_ids = self._search_ids_by_term(term)
         if not found_ids:
@@ -94,16 +264,173 @@ class CryptoSearchEngine:
             conn = sqlite3.connect(self.db_path)
             cursor = conn.cursor()
             placeholders = ','.join(['?' for _ in found_ids])
-            query = f"SELECT * FROM moedas WHERE id IN ({placeholders}) ORDER BY market_cap DESC"
-            cursor.execute(query, list(found_ids))
-            results = cursor.fetchall()
+            filter_sql, filter_params = clausula_filtros(filters)
+            query = f"""
+                SELECT * FROM moedas WHERE id IN ({placeholders}) {"AND " + filter_sql if filter_sql else ""}
+                {clausula_ordenacao(sort)} LIMIT ? OFFSET ?
+            """
+            with etapa("sql"):
+                cursor.execute(query, [*found_ids, *filter_params, limit, offset])
+                results = cursor.fetchall()
             conn.close()
             return results
         except Exception as e:
             print(f"Error in inverted index search: {e}")
             return []
+    
+    def screen(self, filters: List[Filtro], sort: Optional[Tuple[str, bool]] = None,
+               limit: int = 50, offset: int = 0) -> List[Tuple]:
+        try:
+            conn = sqlite3.connect(self.db_path)
+            filter_sql, filter_params = clausula_filtros(filters)
+            query = f"""
+                SELECT * FROM moedas {"WHERE " + filter_sql if filter_sql else ""}
+                {clausula_ordenacao(sort)} LIMIT ? OFFSET ?
+            """
+            with etapa("sql"):
+                results = conn.execute(query, (*filter_params, limit, offset)).fetchall()
+            conn.close()
+            return results
+        except Exception as e:
+            print(f"Error in screen: {e}")
+            return []
+    
+    def search(self, search_type: str, term: str, limit: int = 50, offset: int = 0,
+               filters: Optional[List[Filtro]] = None, sort: Optional[Tuple[str, bool]] = None) -> List[Tuple]:
+        # Roda na thread do executor: o rastro (se amostrado) vive no contexto desta thread
+        with self.tracer.consulta("search", search_type=search_type, term=term, limit=limit, offset=offset):
+            return self._search(search_type, term, limit, offset, filters, sort)
+    
+    def _search(self, search_type: str, term: str, limit: int, offset: int,
+                filters: Optional[List[Filtro]], sort: Optional[Tuple[str, bool]]) -> List[Tuple]:
+        if not term.strip():
+            return self.screen(filters or [], sort, limit, offset)
+        elif search_type == "id":
+            return self.search_by_id(term, limit, offset, filters, sort)
+        elif search_type == "name":
+            return self.search_by_name(term, limit, offset, filters, sort)
+        elif search_type == "symbol":
+            return self.search_by_symbol(term, limit, offset, filters, sort)
+        else:  # inverted_index
+            return self.search_with_inverted_index(term, limit, offset, filters, sort)
+
+class SearchCoalescer:
+    """Single-flight: consultas idênticas simultâneas, de qualquer sessão, compartilham uma execução."""
+    
+    def __init__(self):
+        self._in_flight: Dict[Hashable, asyncio.Future] = {}
+    
+    async def run(self, key: Hashable, function: Callable[..., Any], *args) -> Any:
+        future = self._in_flight.get(key)
+        if future is None:
+            future = asyncio.get_running_loop().run_in_executor(None, function, *args)
+            self._in_flight[key] = future
+            future.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        # shield: se uma sessão desistir (debounce cancelado), as demais continuam esperando
+        return await asyncio.shield(future)
+
+# Caminhos configuráveis para rodar o app sobre outro banco (ex.: dados sintéticos do teste de carga)
+search_engine = CryptoSearchEngine(
+    os.environ.get("CRYPTOFINDER_DB", "data/criptomoedas.db"),
+    os.environ.get("CRYPTOFINDER_INDEX", "data/indice_invertido.pkl"),
+    os.environ.get("CRYPTOFINDER_SYMBOLS", "data/simbolos.pkl"),
+    os.environ.get("CRYPTOFINDER_SUBSTRING_FILTER", "data/filtro_substrings.pkl"),
+    similarity_path=os.environ.get("CRYPTOFINDER_SIMILARITY", "data/similaridade.pkl"),
+)
+search_coalescer = SearchCoalescer()
+price_feed = FeedAlteracoes(search_engine.db_path)
+market_analytics = AnalisadorMercado(search_engine.db_path)
+sentiment_scores = PontuacoesSentimento(search_engine.db_path)
+
+RESULTS_PAGE_SIZE = 20
+# Janela de cards montados: ao passar disso, as páginas mais antigas saem (e
+# seus cards cancelam a assinatura de preços ao desmontar)
+RESULTS_WINDOW_PAGES = 5
+RESULTS_WINDOW_SIZE = RESULTS_PAGE_SIZE * RESULTS_WINDOW_PAGES
+LIVE_SEARCH_DEBOUNCE_SECONDS = 0.3
 
-search_engine = CryptoSearchEngine()
+SORT_OPTIONS = [
+    ("market_cap desc", "Market cap"),
+    ("change desc", "Top gainers (24h)"),
+    ("change asc", "Top losers (24h)"),
+    ("price desc", "Highest price"),
+    ("price asc", "Lowest price"),
+]
+
+# Estilos compartilhados por todos os cards, enviados uma única vez em vez de
+# repetidos como dicts inline em cada elemento de cada resultado.
+RESULTS_STYLESHEET = """
+    .cf-results { max-height: 600px; overflow-y: auto; }
+    .cf-results-header {
+        padding: 1.5rem 2.5rem; background: #f8fafc; border-bottom: 1px solid #e2e8f0;
+        display: flex; justify-content: space-between; align-items: center;
+    }
+    .cf-results-title { margin: 0; color: #1e293b; font-size: 1.2rem; font-weight: 600; font-family: 'Inter', sans-serif; }
+    .cf-results-subtitle { color: #64748b; font-size: 0.9rem; font-family: 'Inter', sans-serif; }
+    .cf-card { padding: 2rem 2.5rem; border-bottom: 1px solid #f1f5f9; transition: all 0.2s ease; cursor: pointer; }
+    .cf-card-grid { display: grid; grid-template-columns: 1fr auto; gap: 2rem; align-items: center; }
+    .cf-card-head { display: flex; align-items: center; gap: 1rem; margin-bottom: 0.8rem; }
+    .cf-avatar {
+        width: 40px; height: 40px; background: linear-gradient(45deg, #667eea, #764ba2); border-radius: 12px;
+        display: flex; align-items: center; justify-content: center; color: white; font-weight: bold; font-size: 1.2rem;
+    }
+    .cf-card-name { margin: 0 0 0.2rem 0; font-size: 1.3rem; font-weight: 600; color: #1e293b; font-family: 'Inter', sans-serif; }
+    .cf-card-meta { display: flex; gap: 1rem; align-items: center; }
+    .cf-badge {
+        background: #e2e8f0; color: #475569; padding: 0.3rem 0.8rem; border-radius: 8px;
+        font-size: 0.8rem; font-weight: 600; font-family: 'Inter', sans-serif;
+    }
+    .cf-card-id { color: #64748b; font-size: 0.9rem; font-family: 'Inter', sans-serif; }
+    .cf-stats { display: grid; grid-template-columns: repeat(auto-fit, minmax(200px, 1fr)); gap: 1rem; margin-top: 1rem; }
+    .cf-stat-label { color: #64748b; font-size: 0.8rem; text-transform: uppercase; letter-spacing: 0.05em; font-weight: 500; }
+    .cf-stat-value { color: #1e293b; font-weight: 600; font-size: 1rem; margin-top: 0.2rem; }
+    .cf-stat-value-small { color: #1e293b; font-weight: 500; font-size: 0.9rem; margin-top: 0.2rem; }
+    .cf-price-block { text-align: right; }
+    .cf-price { font-size: 2rem; font-weight: 700; color: #1e293b; margin-bottom: 0.5rem; font-family: 'Inter', sans-serif; }
+    .cf-change {
+        font-size: 1.1rem; font-weight: 600; color: #64748b;
+        display: flex; align-items: center; justify-content: flex-end; gap: 0.5rem;
+    }
+    .cf-change-up { color: #10b981; }
+    .cf-change-down { color: #ef4444; }
+    .cf-sentiment-positive { color: #10b981; }
+    .cf-sentiment-negative { color: #ef4444; }
+    .cf-similar-toggle {
+        background: none; border: 1px solid #e2e8f0; border-radius: 8px; padding: 0.3rem 0.8rem;
+        color: #667eea; font-size: 0.8rem; font-weight: 600; cursor: pointer; font-family: 'Inter', sans-serif;
+    }
+    .cf-similar { margin-top: 1rem; padding: 1rem 1.2rem; background: #f8fafc; border-radius: 12px; }
+    .cf-similar-item { display: flex; gap: 1rem; color: #1e293b; font-size: 0.9rem; padding: 0.2rem 0; font-family: 'Inter', sans-serif; }
+    .cf-similar-score { color: #64748b; min-width: 3rem; }
+    .cf-load-more {
+        display: block; width: calc(100% - 5rem); margin: 1.5rem 2.5rem; padding: 0.9rem;
+        background: #f8fafc; color: #667eea; border: 1px solid #e2e8f0; border-radius: 12px;
+        cursor: pointer; font-weight: 600; font-family: 'Inter', sans-serif;
+    }
+    .cf-load-more:disabled { cursor: not-allowed; opacity: 0.6; }
+    .cf-loading, .cf-empty { padding: 4rem; text-align: center; }
+    .cf-spinner {
+        display: inline-block; width: 40px; height: 40px; border: 4px solid #f3f3f3;
+        border-top: 4px solid #667eea; border-radius: 50%; animation: cf-spin 1s linear infinite;
+    }
+    @keyframes cf-spin { 0% { transform: rotate(0deg); } 100% { transform: rotate(360deg); } }
+    .cf-loading-text { margin-top: 1.5rem; color: #64748b; font-size: 1.1rem; font-family: 'Inter', sans-serif; }
+    .cf-empty-icon { font-size: 4rem; margin-bottom: 1.5rem; opacity: 0.5; }
+    .cf-empty-title { color: #1e293b; font-size: 1.5rem; font-weight: 600; margin-bottom: 1rem; font-family: 'Inter', sans-serif; }
+    .cf-empty-text {
+        color: #64748b; font-size: 1.1rem; font-family: 'Inter', sans-serif;
+        max-width: 500px; margin: 0 auto 1.5rem auto; line-height: 1.6;
+    }
+    .cf-suggestions {
+        background: #f8fafc; border: 1px solid #e2e8f0; border-radius: 12px;
+        padding: 1.5rem; max-width: 400px; margin: 0 auto;
+    }
+    .cf-suggestions-title { color: #1e293b; font-size: 1rem; font-weight: 600; margin-bottom: 0.8rem; font-family: 'Inter', sans-serif; }
+    .cf-suggestions-list {
+        color: #64748b; font-size: 0.9rem; margin: 0; padding-left: 1.2rem;
+        font-family: 'Inter', sans-serif; line-height: 1.6;
+    }
+"""
 
 @component
 def Header(set_show_about=None):
@@ -217,8 +544,8 @@ def SearchTypeButton(value, label, is_active, on_click):
 def get_placeholder(search_type):
     placeholders = {
         "inverted_index": "Search anything... (Bitcoin, BTC, ethereum)",
-        "id": "Enter cryptocurrency ID (bitcoin, ethereum)",
-        "name": "Enter cryptocurrency name (Bitcoin, Ethereum)",
+        "id": "Enter cryptocurrency ID (bitcoin, \"ethereum\" for exact, bit* for prefix)",
+        "name": "Enter cryptocurrency name (Bitcoin, \"Ethereum\" for exact, Bit* for prefix)",
         "symbol": "Enter symbol (BTC, ETH, ADA)"
     }
     return placeholders.get(search_type, "Search cryptocurrencies...")
@@ -277,41 +604,109 @@ def SearchInterface():
     search_term, set_search_term = hooks.use_state("")
     search_type, set_search_type = hooks.use_state("inverted_index")
     results, set_results = hooks.use_state([])
+    has_more, set_has_more = hooks.use_state(False)
+    # Posição do primeiro card montado na lista completa de resultados
+    window_offset, set_window_offset = hooks.use_state(0)
+    loading_more, set_loading_more = hooks.use_state(False)
     loading, set_loading = hooks.use_state(False)
     show_about, set_show_about = hooks.use_state(False)
     search_performed, set_search_performed = hooks.use_state(False)
+    live_search, set_live_search = hooks.use_state(False)
+    filter_text, set_filter_text = hooks.use_state("")
+    sort_option, set_sort_option = hooks.use_state("market_cap desc")
+    filter_error, set_filter_error = hooks.use_state("")
+    
+    async def fetch_page(limit, offset=0):
+        try:
+            filters = interpretar_filtros(filter_text)
+            sort = interpretar_ordenacao(sort_option)
+            set_filter_error("")
+        except ValueError as e:
+            set_filter_error(str(e))
+            return []
+        
+        key = (search_type, search_term.strip().lower(), tuple(filters), sort, limit, offset)
+        return await search_coalescer.run(
+            key, search_engine.search, search_type, search_term, limit, offset, filters, sort
+        )
     
-    def handle_search():
-        if not search_term.strip():
+    async def run_search(show_loading=True):
+        if show_loading:
+            set_loading(True)
+        set_search_performed(True)
+        
+        try:
+            # Uma linha a mais indica se existe próxima página
+            search_results = await fetch_page(RESULTS_PAGE_SIZE + 1)
+            set_results(search_results[:RESULTS_PAGE_SIZE])
+            set_window_offset(0)
+            set_has_more(len(search_results) > RESULTS_PAGE_SIZE)
+        except Exception as e:
+            print(f"Search error: {e}")
+            set_results([])
+            set_has_more(False)
+        finally:
+            if show_loading:
+                set_loading(False)
+    
+    async def handle_search(_event=None):
+        if not search_term.strip() and not filter_text.strip():
             set_results([])
             set_search_performed(False)
             return
         
-        set_loading(True)
-        set_search_performed(True)
+        await run_search()
+    
+    async def handle_key_down(event):
+        if event["key"] == "Enter":
+            await handle_search()
+    
+    @hooks.use_effect(dependencies=[search_term, search_type, live_search, filter_text, sort_option])
+    async def live_search_effect():
+        # Cada tecla cancela a tarefa anterior durante o sleep: só busca quando o usuário pausa
+        if not live_search or not (search_term.strip() or filter_text.strip()):
+            return
+        await asyncio.sleep(LIVE_SEARCH_DEBOUNCE_SECONDS)
+        await run_search(show_loading=False)
+    
+    async def handle_load_more(_event=None):
+        set_loading_more(True)
         
         try:
-            if search_type == "id":
-                search_results = search_engine.search_by_id(search_term)
-            elif search_type == "name":
-                search_results = search_engine.search_by_name(search_term)
-            elif search_type == "symbol":
-                search_results = search_engine.search_by_symbol(search_term)
-            else:  # inverted_index
-                search_results = search_engine.search_with_inverted_index(search_term)
-            
-            set_results(search_results)
+            next_page = await fetch_page(RESULTS_PAGE_SIZE + 1, window_offset + len(results))
+            window = results + next_page[:RESULTS_PAGE_SIZE]
+            dropped = max(0, len(window) - RESULTS_WINDOW_SIZE)
+            set_results(window[dropped:])
+            set_window_offset(window_offset + dropped)
+            set_has_more(len(next_page) > RESULTS_PAGE_SIZE)
+        except Exception as e:
+            print(f"Search error: {e}")
+            set_has_more(False)
+        finally:
+            set_loading_more(False)
+    
+    async def handle_load_previous(_event=None):
+        set_loading_more(True)
+        
+        try:
+            start = max(0, window_offset - RESULTS_PAGE_SIZE)
+            previous_page = await fetch_page(window_offset - start, start)
+            window = previous_page + results
+            set_results(window[:RESULTS_WINDOW_SIZE])
+            set_window_offset(start)
+            if len(window) > RESULTS_WINDOW_SIZE:
+                set_has_more(True)
         except Exception as e:
             print(f"Search error: {e}")
-            set_results([])
         finally:
-            set_loading(False)
+            set_loading_more(False)
     
     def handle_input_change(event):
         value = event["target"]["value"]
         set_search_term(value)
         if not value.strip():
             set_results([])
+            set_has_more(False)
             set_search_performed(False)
     
     if show_about:
@@ -441,7 +836,7 @@ def SearchInterface():
                             "placeholder": get_placeholder(search_type),
                             "value": search_term,
                             "on_input": handle_input_change,
-                            "on_key_down": lambda event: handle_search() if event["key"] == "Enter" else None,
+                            "on_key_down": handle_key_down,
                             "style": {
                                 "width": "calc(100% - 1px)",  
                                 "padding": "1.2rem 1.5rem 1.2rem 3.5rem",
@@ -470,7 +865,7 @@ def SearchInterface():
                         ),
                         html.button(
                             {
-                                "on_click": lambda _: handle_search(),
+                                "on_click": handle_search,
                                 "disabled": loading,
                                 "style": {
                                     "position": "absolute",
@@ -492,10 +887,89 @@ def SearchInterface():
                             },
                             "⏳" if loading else "Search"
                         )
+                    ),
+                    
+                    # Numeric Filters
+                    html.div(
+                        {
+                            "style": {
+                                "display": "flex",
+                                "gap": "1rem",
+                                "max-width": "600px",
+                                "margin": "1rem auto 0 auto"
+                            }
+                        },
+                        html.input({
+                            "type": "text",
+                            "placeholder": "Filters: price < 0.01, change > 20",
+                            "value": filter_text,
+                            "on_input": lambda event: set_filter_text(event["target"]["value"]),
+                            "on_key_down": handle_key_down,
+                            "style": {
+                                "flex": "1",
+                                "padding": "0.7rem 1rem",
+                                "font-size": "0.95rem",
+                                "border": "2px solid " + ("#ef4444" if filter_error else "#e2e8f0"),
+                                "border-radius": "12px",
+                                "outline": "none",
+                                "font-family": "'Inter', sans-serif"
+                            }
+                        }),
+                        html.select(
+                            {
+                                "value": sort_option,
+                                "on_change": lambda event: set_sort_option(event["target"]["value"]),
+                                "style": {
+                                    "padding": "0.7rem 1rem",
+                                    "font-size": "0.95rem",
+                                    "border": "2px solid #e2e8f0",
+                                    "border-radius": "12px",
+                                    "background": "white",
+                                    "font-family": "'Inter', sans-serif"
+                                }
+                            },
+                            *[html.option({"value": value}, label) for value, label in SORT_OPTIONS]
+                        )
+                    ),
+                    html.p(
+                        {
+                            "style": {
+                                "color": "#ef4444",
+                                "font-size": "0.85rem",
+                                "text-align": "center",
+                                "margin": "0.5rem 0 0 0",
+                                "font-family": "'Inter', sans-serif"
+                            }
+                        },
+                        filter_error
+                    ) if filter_error else "",
+                    
+                    # Live Search Toggle
+                    html.label(
+                        {
+                            "style": {
+                                "display": "flex",
+                                "justify-content": "center",
+                                "align-items": "center",
+                                "gap": "0.5rem",
+                                "margin-top": "1rem",
+                                "color": "#64748b",
+                                "font-size": "0.9rem",
+                                "font-family": "'Inter', sans-serif",
+                                "cursor": "pointer"
+                            }
+                        },
+                        html.input({
+                            "type": "checkbox",
+                            "checked": live_search,
+                            "on_change": lambda event: set_live_search(bool(event["target"]["checked"]))
+                        }),
+                        "Search as you type"
                     )
                 ),
                 
-                ResultsSection(results, loading, search_type, search_performed, search_term)
+                ResultsSection(results, loading, search_type, search_performed, search_term,
+                               has_more, loading_more, handle_load_more, window_offset, handle_load_previous)
             ),
             
             html.div(
@@ -528,125 +1002,29 @@ def SearchInterface():
     )
 
 @component
-def ResultsSection(results, loading, search_type, search_performed, search_term):
+def ResultsSection(results, loading, search_type, search_performed, search_term,
+                   has_more=False, loading_more=False, on_load_more=None, window_offset=0, on_load_previous=None):
     if loading:
         return html.div(
-            {
-                "style": {
-                    "padding": "4rem",
-                    "text-align": "center"
-                }
-            },
-            html.div(
-                {
-                    "style": {
-                        "display": "inline-block",
-                        "width": "40px",
-                        "height": "40px",
-                        "border": "4px solid #f3f3f3",
-                        "border-top": "4px solid #667eea",
-                        "border-radius": "50%",
-                        "animation": "spin 1s linear infinite"
-                    }
-                }
-            ),
-            html.p(
-                {
-                    "style": {
-                        "margin-top": "1.5rem",
-                        "color": "#64748b",
-                        "font-size": "1.1rem",
-                        "font-family": "'Inter', sans-serif"
-                    }
-                },
-                f"Searching with {get_search_type_label(search_type)}..."
-            ),
-            html.style("""
-                @keyframes spin {
-                    0% { transform: rotate(0deg); }
-                    100% { transform: rotate(360deg); }
-                }
-            """)
+            {"class_name": "cf-loading"},
+            html.div({"class_name": "cf-spinner"}),
+            html.p({"class_name": "cf-loading-text"}, f"Searching with {get_search_type_label(search_type)}...")
         )
     
     if search_performed and not results and not loading:
         return html.div(
-            {
-                "style": {
-                    "padding": "4rem",
-                    "text-align": "center"
-                }
-            },
-            html.div(
-                {
-                    "style": {
-                        "font-size": "4rem",
-                        "margin-bottom": "1.5rem",
-                        "opacity": "0.5"
-                    }
-                },
-                "🔍"
-            ),
-            html.h3(
-                {
-                    "style": {
-                        "color": "#1e293b",
-                        "font-size": "1.5rem",
-                        "font-weight": "600",
-                        "margin-bottom": "1rem",
-                        "font-family": "'Inter', sans-serif"
-                    }
-                },
-                "No Results Found"
-            ),
+            {"class_name": "cf-empty"},
+            html.div({"class_name": "cf-empty-icon"}, "🔍"),
+            html.h3({"class_name": "cf-empty-title"}, "No Results Found"),
             html.p(
-                {
-                    "style": {
-                        "color": "#64748b",
-                        "font-size": "1.1rem",
-                        "margin-bottom": "1.5rem",
-                        "font-family": "'Inter', sans-serif",
-                        "max-width": "500px",
-                        "margin": "0 auto 1.5rem auto",
-                        "line-height": "1.6"
-                    }
-                },
+                {"class_name": "cf-empty-text"},
                 f"We couldn't find any cryptocurrencies matching \"{search_term}\" using {get_search_type_label(search_type).lower()}."
             ),
             html.div(
-                {
-                    "style": {
-                        "background": "#f8fafc",
-                        "border": "1px solid #e2e8f0",
-                        "border-radius": "12px",
-                        "padding": "1.5rem",
-                        "max-width": "400px",
-                        "margin": "0 auto"
-                    }
-                },
-                html.h4(
-                    {
-                        "style": {
-                            "color": "#1e293b",
-                            "font-size": "1rem",
-                            "font-weight": "600",
-                            "margin-bottom": "0.8rem",
-                            "font-family": "'Inter', sans-serif"
-                        }
-                    },
-                    "Try these suggestions:"
-                ),
+                {"class_name": "cf-suggestions"},
+                html.h4({"class_name": "cf-suggestions-title"}, "Try these suggestions:"),
                 html.ul(
-                    {
-                        "style": {
-                            "color": "#64748b",
-                            "font-size": "0.9rem",
-                            "margin": "0",
-                            "padding-left": "1.2rem",
-                            "font-family": "'Inter', sans-serif",
-                            "line-height": "1.6"
-                        }
-                    },
+                    {"class_name": "cf-suggestions-list"},
                     html.li("Check your spelling"),
                     html.li("Try different search terms"),
                     html.li("Use a different search type"),
@@ -658,52 +1036,57 @@ def ResultsSection(results, loading, search_type, search_performed, search_term)
     if not results:
         return html.div()
     
+    seen = window_offset + len(results)
+    count_label = f"{seen}{'+' if has_more else ''} result{'s' if seen != 1 or has_more else ''} found"
+    if window_offset:
+        count_label = f"Showing {window_offset + 1}–{seen} of {seen}{'+' if has_more else ''} results"
+    
     return html.div(
-        {
-            "style": {
-                "max-height": "600px",
-                "overflow-y": "auto"
-            }
-        },
+        {"class_name": "cf-results"},
         html.div(
+            {"class_name": "cf-results-header"},
+            html.h3({"class_name": "cf-results-title"}, count_label),
+            html.span({"class_name": "cf-results-subtitle"}, f"Using {get_search_type_label(search_type)}")
+        ),
+        html.button(
             {
-                "style": {
-                    "padding": "1.5rem 2.5rem",
-                    "background": "#f8fafc",
-                    "border-bottom": "1px solid #e2e8f0",
-                    "display": "flex",
-                    "justify-content": "space-between",
-                    "align-items": "center"
-                }
+                "class_name": "cf-load-more",
+                "disabled": loading_more,
+                **({"on_click": on_load_previous} if on_load_previous else {})
             },
-            html.h3(
-                {
-                    "style": {
-                        "margin": "0",
-                        "color": "#1e293b",
-                        "font-size": "1.2rem",
-                        "font-weight": "600",
-                        "font-family": "'Inter', sans-serif"
-                    }
-                },
-                f"{len(results)} result{'s' if len(results) != 1 else ''} found"
-            ),
-            html.span(
-                {
-                    "style": {
-                        "color": "#64748b",
-                        "font-size": "0.9rem",
-                        "font-family": "'Inter', sans-serif"
-                    }
-                },
-                f"Using {get_search_type_label(search_type)}"
-            )
-        ),
-        *[CryptoCard(crypto) for crypto in results[:50]]
+            "Loading..." if loading_more else "Previous results"
+        ) if window_offset else "",
+        *[CryptoCard(crypto, key=crypto[0]) for crypto in results],
+        html.button(
+            {
+                "class_name": "cf-load-more",
+                "disabled": loading_more,
+                **({"on_click": on_load_more} if on_load_more else {})
+            },
+            "Loading..." if loading_more else "Load more"
+        ) if has_more else ""
     )
 
 @component
 def CryptoCard(crypto):
+    live_update, set_live_update = hooks.use_state(None)
+    show_similar, set_show_similar = hooks.use_state(False)
+    
+    @hooks.use_effect(dependencies=[crypto[0]])
+    def subscribe_to_price_updates():
+        # Recebe só as alterações desta moeda; o retorno cancela a assinatura ao desmontar
+        return price_feed.assinar(crypto[0], set_live_update)
+    
+    if live_update:
+        crypto = (
+            *crypto[:3],
+            live_update["preco_usd"],
+            live_update["variacao_24h"],
+            live_update["market_cap"],
+            live_update["ultima_atualizacao"],
+            *crypto[7:]
+        )
+    
     nome = crypto[1] or "N/A"
     simbolo = (crypto[2] or "").upper()
     crypto_id = crypto[0] or "N/A"
@@ -711,196 +1094,80 @@ def CryptoCard(crypto):
     variacao = format_change(crypto[4])
     market_cap = format_market_cap(crypto[5])
     ultima_atualizacao = format_date(crypto[6])
+    # Pontuação pré-calculada pelo sentimento.py; aqui só uma consulta ao dict em memória
+    sentimento = sentiment_scores.pontuacao(crypto[0])
+    rotulo = rotulo_sentimento(sentimento)
+    
+    # Só calculado quando aberto: moedas fora do cache custam um produto esparso cada
+    similar = search_engine.similar_coins(crypto[0]) if show_similar else []
     
-    change_color = "#10b981" if crypto[4] and crypto[4] > 0 else "#ef4444" if crypto[4] and crypto[4] < 0 else "#64748b"
+    change_class = "cf-change cf-change-up" if crypto[4] and crypto[4] > 0 else "cf-change cf-change-down" if crypto[4] and crypto[4] < 0 else "cf-change"
     
     return html.div(
-        {
-            "style": {
-                "padding": "2rem 2.5rem",
-                "border-bottom": "1px solid #f1f5f9",
-                "transition": "all 0.2s ease",
-                "cursor": "pointer"
-            }
-        },
+        {"class_name": "cf-card"},
         html.div(
-            {
-                "style": {
-                    "display": "grid",
-                    "grid-template-columns": "1fr auto",
-                    "gap": "2rem",
-                    "align-items": "center"
-                }
-            },
+            {"class_name": "cf-card-grid"},
             
             html.div(
                 html.div(
-                    {
-                        "style": {
-                            "display": "flex",
-                            "align-items": "center",
-                            "gap": "1rem",
-                            "margin-bottom": "0.8rem"
-                        }
-                    },
+                    {"class_name": "cf-card-head"},
+                    html.div({"class_name": "cf-avatar"}, simbolo[:2] if simbolo else "?"),
                     html.div(
-                        {
-                            "style": {
-                                "width": "40px",
-                                "height": "40px",
-                                "background": "linear-gradient(45deg, #667eea, #764ba2)",
-                                "border-radius": "12px",
-                                "display": "flex",
-                                "align-items": "center",
-                                "justify-content": "center",
-                                "color": "white",
-                                "font-weight": "bold",
-                                "font-size": "1.2rem"
-                            }
-                        },
-                        simbolo[:2] if simbolo else "?"
-                    ),
-                    html.div(
-                        html.h4(
-                            {
-                                "style": {
-                                    "margin": "0 0 0.2rem 0",
-                                    "font-size": "1.3rem",
-                                    "font-weight": "600",
-                                    "color": "#1e293b",
-                                    "font-family": "'Inter', sans-serif"
-                                }
-                            },
-                            nome
-                        ),
+                        html.h4({"class_name": "cf-card-name"}, nome),
                         html.div(
-                            {
-                                "style": {
-                                    "display": "flex",
-                                    "gap": "1rem",
-                                    "align-items": "center"
-                                }
-                            },
-                            html.span(
+                            {"class_name": "cf-card-meta"},
+                            html.span({"class_name": "cf-badge"}, simbolo),
+                            html.span({"class_name": "cf-card-id"}, f"ID: {crypto_id}"),
+                            html.button(
                                 {
-                                    "style": {
-                                        "background": "#e2e8f0",
-                                        "color": "#475569",
-                                        "padding": "0.3rem 0.8rem",
-                                        "border-radius": "8px",
-                                        "font-size": "0.8rem",
-                                        "font-weight": "600",
-                                        "font-family": "'Inter', sans-serif"
-                                    }
+                                    "class_name": "cf-similar-toggle",
+                                    "on_click": lambda _: set_show_similar(not show_similar),
                                 },
-                                simbolo
-                            ),
-                            html.span(
-                                {
-                                    "style": {
-                                        "color": "#64748b",
-                                        "font-size": "0.9rem",
-                                        "font-family": "'Inter', sans-serif"
-                                    }
-                                },
-                                f"ID: {crypto_id}"
+                                "Hide look-alikes" if show_similar else "Look-alikes"
                             )
                         )
                     )
                 ),
                 
                 html.div(
-                    {
-                        "style": {
-                            "display": "grid",
-                            "grid-template-columns": "repeat(auto-fit, minmax(200px, 1fr))",
-                            "gap": "1rem",
-                            "margin-top": "1rem"
-                        }
-                    },
+                    {"class_name": "cf-stats"},
                     html.div(
-                        html.span(
-                            {
-                                "style": {
-                                    "color": "#64748b",
-                                    "font-size": "0.8rem",
-                                    "text-transform": "uppercase",
-                                    "letter-spacing": "0.05em",
-                                    "font-weight": "500"
-                                }
-                            },
-                            "Market Cap"
-                        ),
-                        html.div(
-                            {
-                                "style": {
-                                    "color": "#1e293b",
-                                    "font-weight": "600",
-                                    "font-size": "1rem",
-                                    "margin-top": "0.2rem"
-                                }
-                            },
-                            market_cap
-                        )
+                        html.span({"class_name": "cf-stat-label"}, "Market Cap"),
+                        html.div({"class_name": "cf-stat-value"}, market_cap)
                     ),
                     html.div(
-                        html.span(
-                            {
-                                "style": {
-                                    "color": "#64748b",
-                                    "font-size": "0.8rem",
-                                    "text-transform": "uppercase",
-                                    "letter-spacing": "0.05em",
-                                    "font-weight": "500"
-                                }
-                            },
-                            "Last Updated"
-                        ),
+                        html.span({"class_name": "cf-stat-label"}, "Last Updated"),
+                        html.div({"class_name": "cf-stat-value-small"}, ultima_atualizacao)
+                    ),
+                    html.div(
+                        html.span({"class_name": "cf-stat-label"}, "Sentiment"),
                         html.div(
-                            {
-                                "style": {
-                                    "color": "#1e293b",
-                                    "font-weight": "500",
-                                    "font-size": "0.9rem",
-                                    "margin-top": "0.2rem"
-                                }
-                            },
-                            ultima_atualizacao
+                            {"class_name": f"cf-stat-value-small cf-sentiment-{rotulo}"},
+                            f"{sentimento / 100:+.2f} ({rotulo})" if sentimento is not None else "N/A"
                         )
                     )
-                )
+                ),
+                
+                html.div(
+                    {"class_name": "cf-similar"},
+                    html.span({"class_name": "cf-stat-label"}, "Similar coins"),
+                    *[
+                        html.div(
+                            {"key": coin["id"], "class_name": "cf-similar-item"},
+                            html.span({"class_name": "cf-similar-score"}, f"{coin['similaridade']:.0%}"),
+                            html.span(f"{coin['nome']} ({coin['simbolo'].upper()})"),
+                            html.span({"class_name": "cf-card-id"}, coin["id"])
+                        )
+                        for coin in similar
+                    ] or [html.div({"class_name": "cf-similar-item"}, "No similar coins available")]
+                ) if show_similar else ""
             ),
             
             html.div(
-                {
-                    "style": {
-                        "text-align": "right"
-                    }
-                },
-                html.div(
-                    {
-                        "style": {
-                            "font-size": "2rem",
-                            "font-weight": "700",
-                            "color": "#1e293b",
-                            "margin-bottom": "0.5rem",
-                            "font-family": "'Inter', sans-serif"
-                        }
-                    },
-                    preco
-                ),
+                {"class_name": "cf-price-block"},
+                html.div({"class_name": "cf-price"}, preco),
                 html.div(
-                    {
-                        "style": {
-                            "font-size": "1.1rem",
-                            "font-weight": "600",
-                            "color": change_color,
-                            "display": "flex",
-                            "align-items": "center",
-                            "justify-content": "flex-end",
-                            "gap": "0.5rem"
-                        }
-                    },
+                    {"class_name": change_class},
                     html.span("📈" if crypto[4] and crypto[4] > 0 else "📉" if crypto[4] and crypto[4] < 0 else "➡️"),
                     variacao
                 )
@@ -1058,10 +1325,65 @@ def App():
                 overflow-x: hidden !important;
             }
         """),
+        html.style(RESULTS_STYLESHEET),
         SearchInterface()
     )
 
 app = FastAPI()
+
+@app.get("/api/symbols/{symbol}")
+def symbol_lookup(symbol: str):
+    resolution = search_engine.resolve_symbol(symbol)
+    if resolution is None:
+        raise HTTPException(status_code=404, detail=f"Unknown symbol: {symbol}")
+    return resolution
+
+@app.get("/api/coins/{coin_id}/similar")
+def similar_coins(coin_id: str, k: int = 5):
+    if search_engine.similarity_model is None:
+        raise HTTPException(status_code=503, detail="Similarity model unavailable (run indiceinvertido.py with scipy installed)")
+    return search_engine.similar_coins(coin_id, max(1, min(k, 50)))
+
+@app.get("/api/index/stats")
+def index_stats():
+    # Não força a carga: reporta o que o processo já tem em memória
+    return {
+        "loaded": bool(search_engine._index_loaded),
+        "terms": len(search_engine._inverted_index),
+        "memory_bytes": search_engine.index_memory(),
+    }
+
+# Só com CRYPTOFINDER_DEBUG: sem autenticação, qualquer cliente poderia encher o disco de perfis
+if search_engine.tracer.depuracao:
+    @app.post("/api/debug/profile-next")
+    def profile_next(count: int = 1):
+        # O perfil sai em data/perfis/<trace_id>.prof; o trace_id aparece no log "rastreamento"
+        return {"pending_profiles": search_engine.tracer.perfilar_proxima(max(1, min(count, 100)))}
+
+@app.get("/api/analytics/summary")
+def analytics_summary():
+    return market_analytics.resumo()
+
+@app.get("/api/analytics/movers")
+def analytics_movers(k: int = 10, direction: str = "up", min_market_cap: float = 0.0):
+    if direction not in ("up", "down"):
+        raise HTTPException(status_code=400, detail="direction must be 'up' or 'down'")
+    return market_analytics.maiores_variacoes(max(1, min(k, 500)), direction == "up", min_market_cap)
+
+@app.get("/api/analytics/market-cap-buckets")
+def analytics_market_cap_buckets():
+    return market_analytics.faixas_market_cap()
+
+@app.get("/api/analytics/percentiles")
+def analytics_percentiles(field: str = "variacao_24h"):
+    if field not in CAMPOS_ANALISE:
+        raise HTTPException(status_code=400, detail=f"field must be one of {', '.join(CAMPOS_ANALISE)}")
+    return market_analytics.percentis(field)
+
+@app.get("/api/analytics/sectors")
+def analytics_sectors():
+    return market_analytics.setores()
+
 configure(app, App)
 
 if __name__ == "__main__":
@@ -0,0 +1,217 @@
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import List
+
+SRC_DIR = Path(__file__).resolve().parent
+AMBIENTE = {**os.environ, "PYTHONPATH": str(SRC_DIR)}
+
+CENARIOS_IMPORTACAO = {
+    "buscar": "import buscar",
+    "buscar+motor": "import buscar; buscar.CryptocurrencySearchEngine()",
+    "buscar+consulta": (
+        "import buscar; m = buscar.CryptocurrencySearchEngine(); "
+        "m.search_by_field('nome', 'bitcoin')"
+    ),
+    "indiceinvertido": "import indiceinvertido",
+}
+
+# A CLI de busca não pode carregar estes módulos no import: só quando a funcionalidade é usada
+MODULOS_PESADOS = ("numpy", "scipy", "pandas", "pyarrow", "requests", "cProfile", "reactpy", "fastapi")
+# Orçamento do import (cumulativo, -X importtime) por módulo de entrada; hoje buscar fica perto de 40 ms
+LIMITES_IMPORTACAO_MS = {"buscar": 80.0, "indiceinvertido": 80.0}
+
+def _tempo_processo(codigo: str) -> float:
+    inicio = time.perf_counter()
+    subprocess.run([sys.executable, "-c", codigo], cwd=SRC_DIR.parent, check=True, env=AMBIENTE)
+    return time.perf_counter() - inicio
+
+def _tempos_importacao(codigo: str) -> dict:
+    processo = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", codigo],
+        cwd=SRC_DIR.parent, capture_output=True, text=True, env=AMBIENTE
+    )
+    tempos = {}
+    for linha in processo.stderr.splitlines():
+        if not linha.startswith("import time:") or "cumulative" in linha:
+            continue
+        _, cumulativo, nome = linha.split(":", 1)[1].split("|")
+        tempos[nome.strip()] = int(cumulativo)
+    return tempos
+
+def _maiores_importacoes(modulo: str, limite: int = 8):
+    # Ignora o que o interpretador já importa sozinho (site, .pth, etc.)
+    ja_importados = _tempos_importacao("pass")
+    tempos = _tempos_importacao(f"import {modulo}")
+    proprios = [(tempo, nome) for nome, tempo in tempos.items() if nome not in ja_importados]
+    return sorted(proprios, reverse=True)[:limite]
+
+def verificar_importacao(repeticoes: int = 3) -> List[str]:
+    """Problemas de inicialização: módulo pesado importado no topo ou import acima do orçamento."""
+    problemas = []
+    for modulo, limite_ms in LIMITES_IMPORTACAO_MS.items():
+        processo = subprocess.run(
+            [sys.executable, "-c", f"import sys, {modulo}; print(' '.join(sys.modules))"],
+            cwd=SRC_DIR.parent, capture_output=True, text=True, check=True, env=AMBIENTE
+        )
+        carregados = set(processo.stdout.split())
+        for pesado in MODULOS_PESADOS:
+            if pesado in carregados:
+                problemas.append(f"'import {modulo}' carrega {pesado}")
+        
+        # O menor de algumas execuções: ruído do sistema só aumenta o tempo
+        tempo_ms = min(_tempos_importacao(f"import {modulo}").get(modulo, 0) for _ in range(repeticoes)) / 1000
+        if tempo_ms > limite_ms:
+            problemas.append(f"'import {modulo}' levou {tempo_ms:.1f} ms (limite {limite_ms:.0f} ms)")
+    return problemas
+
+def benchmark_importacao(repeticoes: int = 10):
+    print(f"Tempo de inicialização ({repeticoes} execuções por cenário)")
+    print("-" * 60)
+    base = [_tempo_processo("pass") for _ in range(repeticoes)]
+    print(f"{'python vazio':<20} mediana {statistics.median(base) * 1000:8.1f} ms")
+
+    for nome, codigo in CENARIOS_IMPORTACAO.items():
+        tempos = [_tempo_processo(codigo) for _ in range(repeticoes)]
+        mediana = statistics.median(tempos) * 1000
+        print(f"{nome:<20} mediana {mediana:8.1f} ms   mínimo {min(tempos) * 1000:8.1f} ms")
+
+    for modulo in ("buscar", "indiceinvertido"):
+        print(f"\nImportações mais caras de '{modulo}' (cumulativo, µs):")
+        for cumulativo, nome in _maiores_importacoes(modulo):
+            print(f"  {cumulativo:>8}  {nome}")
+    
+    problemas = verificar_importacao()
+    print("\nVerificação: " + ("ok" if not problemas else "; ".join(problemas)))
+
+def benchmark_construcao(processos: List[int], db_path: str = "data/criptomoedas.db"):
+    from contextlib import redirect_stdout
+    from io import StringIO
+    from indiceinvertido import ConstrutorIndiceInvertido
+    
+    construtor = ConstrutorIndiceInvertido(db_path)
+    with redirect_stdout(StringIO()):
+        inicio = time.perf_counter()
+        construtor.construir_indice()
+        sequencial = time.perf_counter() - inicio
+    print(f"{'sequencial':<20} {sequencial * 1000:8.1f} ms")
+    
+    for quantidade in processos:
+        with redirect_stdout(StringIO()):
+            inicio = time.perf_counter()
+            construtor.construir_indice_paralelo(quantidade)
+            decorrido = time.perf_counter() - inicio
+        print(f"{f'{quantidade} processo(s)':<20} {decorrido * 1000:8.1f} ms   speedup {sequencial / decorrido:5.2f}x")
+
+def benchmark_tokenizacao(repeticoes: int = 5, db_path: str = "data/criptomoedas.db"):
+    import re
+    import sqlite3
+    from analisador import Analisador
+    
+    conn = sqlite3.connect(db_path)
+    textos = [texto for linha in conn.execute("SELECT id, nome, simbolo FROM moedas") for texto in linha if texto]
+    conn.close()
+    
+    # Referência: a limpeza só-ASCII usada antes do analisador compartilhado
+    padrao_ascii = re.compile(r'[^a-zA-Z0-9\s]')
+    cenarios = {
+        "regex ASCII (antigo)": lambda texto: padrao_ascii.sub(' ', texto.lower()).split(),
+        "analisador": Analisador().tokens,
+        "analisador+ngramas": Analisador(ngramas_borda=(2, 15)).tokens,
+        "analisador consulta": lambda texto, analisador=Analisador(): analisador.tokens(texto, consulta=True),
+    }
+    
+    print(f"Tokenização de {len(textos)} textos (melhor de {repeticoes} execuções)")
+    for nome, tokenizar in cenarios.items():
+        melhor = float("inf")
+        for _ in range(repeticoes):
+            inicio = time.perf_counter()
+            quantidade = sum(len(tokenizar(texto)) for texto in textos)
+            melhor = min(melhor, time.perf_counter() - inicio)
+        print(f"{nome:<22} {quantidade / melhor:>12,.0f} tokens/s   {len(textos) / melhor:>10,.0f} textos/s")
+
+def verificar_planos(db_path: str = "data/criptomoedas.db", index_path: str = "data/indice_invertido.pkl",
+                     amostra: int = 50) -> List[str]:
+    """Executa todas as alternativas de cada plano e devolve as consultas em que os ids divergem."""
+    import sqlite3
+    from buscar import CryptocurrencySearchEngine
+    
+    conn = sqlite3.connect(db_path)
+    linhas = conn.execute(
+        "SELECT nome, simbolo FROM moedas WHERE simbolo IS NOT NULL ORDER BY market_cap DESC LIMIT ?", (amostra,)
+    ).fetchall()
+    conn.close()
+    
+    # Infixo, prefixo e exato, partes de palavra, apelidos e termos que o filtro de Bloom descarta
+    termos = ["bit", "eth", "wrapped eth", "xbt", "usdc.e", "zzqx", "=zzqx", "qzv*"]
+    for nome, simbolo in linhas:
+        palavra = nome.split()[0].lower()
+        termos += [simbolo, f"={simbolo}", f'"{nome}"', f"{palavra[:4]}*", palavra[1:4], nome]
+    termos = list(dict.fromkeys(termos))
+    
+    motor = CryptocurrencySearchEngine(db_path=db_path, index_path=index_path)
+    divergencias = []
+    for campo in (None, "id", "nome", "simbolo"):
+        for termo in termos:
+            plano = motor.planner.planejar(termo, campo)
+            resultados = {
+                estrategia: {linha[0] for linha in motor._run_strategy(estrategia, campo or "nome", termo)}
+                for estrategia in plano["alternativas"]
+            }
+            if len({frozenset(ids) for ids in resultados.values()}) > 1:
+                contagens = ", ".join(f"{estrategia}={len(ids)}" for estrategia, ids in resultados.items())
+                divergencias.append(f"{termo!r} (campo={campo or '*'}): {contagens}")
+    print(f"{len(termos)} termos x 4 campos verificados.")
+    return divergencias
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks do CryptoFinder")
+    subparsers = parser.add_subparsers(dest="comando", required=True)
+
+    importacao = subparsers.add_parser("importacao", help="Tempo de importação e inicialização da CLI")
+    importacao.add_argument("--repeticoes", type=int, default=10)
+    importacao.add_argument("--verificar", action="store_true",
+                            help="Só verifica módulos pesados e orçamento de import; sai com código 1 se houver regressão")
+
+    construcao = subparsers.add_parser("construcao", help="Construção do índice sequencial vs. paralela")
+    construcao.add_argument("--processos", type=int, nargs="+", default=[1, 2, 4, os.cpu_count() or 1])
+    construcao.add_argument("--db", default="data/criptomoedas.db")
+    
+    tokenizacao = subparsers.add_parser("tokenizacao", help="Vazão do analisador de texto em tokens/s")
+    tokenizacao.add_argument("--repeticoes", type=int, default=5)
+    tokenizacao.add_argument("--db", default="data/criptomoedas.db")
+    
+    planos = subparsers.add_parser("planos", help="Verifica se as alternativas de cada plano devolvem os mesmos ids")
+    planos.add_argument("--db", default="data/criptomoedas.db")
+    planos.add_argument("--indice", default="data/indice_invertido.pkl")
+    planos.add_argument("--amostra", type=int, default=50, help="Moedas de maior market cap usadas para gerar termos")
+    
+    args = parser.parse_args()
+
+    if args.comando == "importacao" and args.verificar:
+        problemas = verificar_importacao()
+        for problema in problemas:
+            print(f"REGRESSÃO: {problema}")
+        if problemas:
+            sys.exit(1)
+        print("Importação ok: nenhum módulo pesado, dentro do orçamento.")
+    elif args.comando == "importacao":
+        benchmark_importacao(args.repeticoes)
+    elif args.comando == "construcao":
+        benchmark_construcao(args.processos, args.db)
+    elif args.comando == "tokenizacao":
+        benchmark_tokenizacao(args.repeticoes, args.db)
+    elif args.comando == "planos":
+        divergencias = verificar_planos(args.db, args.indice, args.amostra)
+        for divergencia in divergencias:
+            print(f"DIVERGÊNCIA: {divergencia}")
+        if divergencias:
+            sys.exit(1)
+        print("Planos ok: todas as alternativas devolvem os mesmos ids.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+import sys
+from array import array
+from bisect import bisect_left
+from itertools import chain
+from typing import Dict, Iterable, Iterator, Optional, Union
+
+# Cada container guarda os 16 bits baixos dos docids que dividem os 16 bits altos.
+# Até LIMITE_ARRAY valores: array('H') ordenado (2 bytes por docid); acima disso,
+# bitset de 65536 bits num int do Python (8 KiB fixos, &, | e ~ rodam em C).
+# Interseção e diferença de bitsets continuam bitsets: resultados são transitórios
+# e voltar a array custaria percorrer os bits antes de saber se serão usados.
+LIMITE_ARRAY = 4096
+BITS_CONTAINER = 1 << 16
+BYTES_BITSET = BITS_CONTAINER // 8
+MASCARA_BITSET = (1 << BITS_CONTAINER) - 1
+
+Container = Union[array, int]
+
+def _para_bitset(valores: Iterable[int]) -> int:
+    dados = bytearray(BYTES_BITSET)
+    for valor in valores:
+        dados[valor >> 3] |= 1 << (valor & 7)
+    return int.from_bytes(dados, "little")
+
+def _valores_bitset(bits: int) -> Iterator[int]:
+    # Palavras de 64 bits (ordem nativa): zeros pulados inteiros, bits ligados isolados com x & -x
+    palavras = memoryview(bits.to_bytes(BYTES_BITSET, sys.byteorder)).cast("Q")
+    for posicao, palavra in enumerate(palavras):
+        if palavra:
+            base = posicao << 6
+            while palavra:
+                menor = palavra & -palavra
+                yield base + menor.bit_length() - 1
+                palavra ^= menor
+
+def _container(valores) -> Container:
+    """Container para um conjunto de valores de 16 bits: array se esparso, bitset se denso."""
+    if len(valores) > LIMITE_ARRAY:
+        return _para_bitset(valores)
+    return array("H", sorted(valores))
+
+def _cardinalidade(container: Container) -> int:
+    return container.bit_count() if isinstance(container, int) else len(container)
+
+def _contem(container: Container, valor: int) -> bool:
+    if isinstance(container, int):
+        return bool(container >> valor & 1)
+    posicao = bisect_left(container, valor)
+    return posicao < len(container) and container[posicao] == valor
+
+def _uniao(a: Container, b: Container) -> Container:
+    if isinstance(a, int):
+        return a | (b if isinstance(b, int) else _para_bitset(b))
+    if isinstance(b, int):
+        return b | _para_bitset(a)
+    return _container(set(a).union(b))
+
+def _intersecao(a: Container, b: Container) -> Container:
+    if isinstance(a, int) and isinstance(b, int):
+        return a & b
+    if isinstance(a, int):
+        a, b = b, a
+    if isinstance(b, int):
+        dados = b.to_bytes(BYTES_BITSET, "little")
+        return array("H", (valor for valor in a if dados[valor >> 3] >> (valor & 7) & 1))
+    menor, maior = (a, b) if len(a) <= len(b) else (b, a)
+    maior = set(maior)
+    return array("H", (valor for valor in menor if valor in maior))
+
+def _diferenca(a: Container, b: Container) -> Container:
+    if isinstance(a, int):
+        return a & ~(b if isinstance(b, int) else _para_bitset(b)) & MASCARA_BITSET
+    if isinstance(b, int):
+        dados = b.to_bytes(BYTES_BITSET, "little")
+        return array("H", (valor for valor in a if not dados[valor >> 3] >> (valor & 7) & 1))
+    b = set(b)
+    return array("H", (valor for valor in a if valor not in b))
+
+class BitmapRoaring:
+    """Conjunto imutável de inteiros não negativos em containers roaring (array ou bitset por bloco de 2^16).
+    
+    União, interseção e diferença operam container a container, só nos blocos
+    em comum; os containers nunca são alterados depois de criados, então
+    resultados podem compartilhá-los com os operandos.
+    """
+    
+    __slots__ = ("_containers",)
+    
+    def __init__(self, containers: Optional[Dict[int, Container]] = None):
+        self._containers: Dict[int, Container] = containers or {}
+    
+    @classmethod
+    def de_inteiros(cls, valores: Iterable[int]) -> "BitmapRoaring":
+        blocos: Dict[int, set] = {}
+        for valor in valores:
+            blocos.setdefault(valor >> 16, set()).add(valor & 0xFFFF)
+        return cls({chave: _container(baixos) for chave, baixos in blocos.items()})
+    
+    @classmethod
+    def uniao(cls, bitmaps: Iterable[Union["BitmapRoaring", array]]) -> "BitmapRoaring":
+        """União de muitos bitmaps (ou formas compactas) de uma vez: cada bloco é combinado uma única vez."""
+        blocos: Dict[int, list] = {}
+        for bitmap in bitmaps:
+            if isinstance(bitmap, array):
+                blocos.setdefault(0, []).append(bitmap)
+                continue
+            for chave, container in bitmap._containers.items():
+                blocos.setdefault(chave, []).append(container)
+        
+        containers = {}
+        for chave, partes in blocos.items():
+            if len(partes) == 1:
+                containers[chave] = partes[0]
+                continue
+            bits = 0
+            arrays = []
+            for parte in partes:
+                if isinstance(parte, int):
+                    bits |= parte
+                else:
+                    arrays.append(parte)
+            valores = set().union(*arrays)
+            if bits:
+                containers[chave] = bits | _para_bitset(valores) if valores else bits
+            elif valores:
+                containers[chave] = _container(valores)
+        return cls(containers)
+    
+    def __len__(self) -> int:
+        return sum(_cardinalidade(container) for container in self._containers.values())
+    
+    def __bool__(self) -> bool:
+        # Containers vazios nunca são guardados
+        return bool(self._containers)
+    
+    @classmethod
+    def de_compacto(cls, postings: Union["BitmapRoaring", array]) -> "BitmapRoaring":
+        """Inverso de `compacto`: aceita o bitmap ou o array solto do bloco 0."""
+        if isinstance(postings, BitmapRoaring):
+            return postings
+        return cls({0: postings} if len(postings) else {})
+    
+    def compacto(self) -> Union["BitmapRoaring", array]:
+        """Forma de armazenamento: só o array quando tudo cabe esparso no bloco 0 (o caso de quase todo termo)."""
+        container = self._containers.get(0)
+        if len(self._containers) == 1 and isinstance(container, array):
+            return container
+        return self
+    
+    def __iter__(self) -> Iterator[int]:
+        # Ordem crescente; arrays e deslocamentos percorridos em C
+        partes = []
+        for chave in sorted(self._containers):
+            container = self._containers[chave]
+            baixos = _valores_bitset(container) if isinstance(container, int) else container
+            partes.append(map((chave << 16).__or__, baixos) if chave else baixos)
+        return chain.from_iterable(partes)
+    
+    def __contains__(self, valor: int) -> bool:
+        container = self._containers.get(valor >> 16)
+        return container is not None and _contem(container, valor & 0xFFFF)
+    
+    def __or__(self, outro: "BitmapRoaring") -> "BitmapRoaring":
+        containers = dict(self._containers)
+        for chave, container in outro._containers.items():
+            atual = containers.get(chave)
+            containers[chave] = container if atual is None else _uniao(atual, container)
+        return BitmapRoaring(containers)
+    
+    def __and__(self, outro: "BitmapRoaring") -> "BitmapRoaring":
+        containers = {}
+        for chave in self._containers.keys() & outro._containers.keys():
+            container = _intersecao(self._containers[chave], outro._containers[chave])
+            if _cardinalidade(container):
+                containers[chave] = container
+        return BitmapRoaring(containers)
+    
+    def __sub__(self, outro: "BitmapRoaring") -> "BitmapRoaring":
+        containers = {}
+        for chave, container in self._containers.items():
+            if chave in outro._containers:
+                container = _diferenca(container, outro._containers[chave])
+            if _cardinalidade(container):
+                containers[chave] = container
+        return BitmapRoaring(containers)
+    
+    def __eq__(self, outro) -> bool:
+        if not isinstance(outro, BitmapRoaring):
+            return NotImplemented
+        return list(self) == list(outro)
+    
+    def __repr__(self) -> str:
+        return f"BitmapRoaring({len(self)} ids, {len(self._containers)} containers)"
+    
+    def memoria(self) -> int:
+        """Bytes ocupados pelo bitmap e seus containers."""
+        return sys.getsizeof(self._containers) + sum(
+            sys.getsizeof(container) for container in self._containers.values()
+        )
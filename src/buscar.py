@@ -1,27 +1,140 @@
+import argparse
+import csv
+import json
+import logging
 import sqlite3
-import pickle
-from typing import List, Tuple, Set, Optional
+import sys
+from typing import Dict, Iterable, Iterator, List, Tuple, Set, Optional, TextIO, TYPE_CHECKING
 from pathlib import Path
+from analisador import ANALISADOR_PADRAO
+from filtro_bloom import FiltroSubstrings
+from filtros import (Filtro, clausula_filtros, clausula_ordenacao, clausula_texto, interpretar_filtros,
+                     interpretar_ordenacao, interpretar_termo)
+from indiceinvertido import carregar_postings
+from planejador import Planejador, estatisticas_banco
+from rastreamento import Rastreador, etapa
+from sentimento import rotulo_sentimento
+
+if TYPE_CHECKING:
+    # NumPy/SciPy só quando o modelo é usado pela primeira vez
+    from similaridade import ModeloSimilaridade
+
+BATCH_FIELDS = ("id", "nome", "simbolo")
+RESULT_COLUMNS = ("id", "nome", "simbolo", "preco_usd", "variacao_24h", "market_cap", "ultima_atualizacao")
 
 class CryptocurrencySearchEngine:
     
-    def __init__(self, db_path: str = "data/criptomoedas.db", index_path: str = "data/indice_invertido.pkl"):
+    def __init__(self, db_path: str = "data/criptomoedas.db", index_path: str = "data/indice_invertido.pkl",
+                 symbols_path: str = "data/simbolos.pkl", substring_filter_path: str = "data/filtro_substrings.pkl",
+                 tracer: Optional[Rastreador] = None, similarity_path: str = "data/similaridade.pkl"):
         self.db_path = db_path
         self.index_path = index_path
+        self.symbols_path = symbols_path
+        self.substring_filter_path = substring_filter_path
+        self.similarity_path = similarity_path
         self.connection = None
-        self.inverted_index = {}
-        self.index_loaded = self._load_inverted_index()
+        self._inverted_index = {}
+        self._index_loaded = None
+        self._symbol_table = None
+        self._substring_filter = False
+        self._similarity_model = False
+        self._planner = None
+        # Desligado por padrão; CRYPTOFINDER_TRACE_SAMPLE / CRYPTOFINDER_SLOW_QUERY_MS ligam sem mudar código
+        self.tracer = tracer or Rastreador.do_ambiente()
+    
+    @property
+    def inverted_index(self) -> dict:
+        # O índice só é lido do disco na primeira consulta que precisar dele
+        if self._index_loaded is None:
+            self._index_loaded = self._load_inverted_index()
+        return self._inverted_index
+    
+    @property
+    def index_loaded(self) -> bool:
+        if self._index_loaded is None:
+            self._index_loaded = self._load_inverted_index()
+        return self._index_loaded
+    
+    def index_available(self) -> bool:
+        return Path(self.index_path).is_file()
+    
+    @property
+    def symbol_table(self) -> dict:
+        # Gerada junto com o índice (indiceinvertido.py); sem ela, símbolos caem na busca comum
+        if self._symbol_table is None:
+            import pickle
+            
+            try:
+                with open(self.symbols_path, "rb") as file:
+                    self._symbol_table = pickle.load(file)
+            except Exception:
+                self._symbol_table = {}
+        return self._symbol_table
+    
+    @property
+    def substring_filter(self) -> Optional[FiltroSubstrings]:
+        # False = ainda não carregado; None = arquivo ausente (sem rejeição rápida)
+        if self._substring_filter is False:
+            import pickle
+            
+            try:
+                with open(self.substring_filter_path, "rb") as file:
+                    self._substring_filter = pickle.load(file)
+            except Exception:
+                self._substring_filter = None
+        return self._substring_filter
+    
+    @property
+    def similarity_model(self) -> Optional["ModeloSimilaridade"]:
+        # False = ainda não carregado; None = modelo ausente ou scipy não instalado
+        if self._similarity_model is False:
+            from similaridade import carregar_modelo
+            
+            self._similarity_model = carregar_modelo(self.similarity_path)
+        return self._similarity_model
+    
+    def similar_coins(self, crypto_id: str, k: int = 5) -> List[dict]:
+        """Moedas com nome/símbolo/id parecidos (imitações, versões bridged); vazio sem o modelo."""
+        model = self.similarity_model
+        return model.similares(crypto_id, k) if model is not None else []
+    
+    @property
+    def planner(self) -> Planejador:
+        # Estatísticas do índice e do banco lidas uma vez; o plano de cada consulta sai delas
+        if self._planner is None:
+            total_documents, database_indexes = estatisticas_banco(self.db_path)
+            self._planner = Planejador(
+                self.inverted_index if self.index_loaded else {}, self.substring_filter,
+                self.symbol_table, total_documents, database_indexes
+            )
+        return self._planner
+    
+    def resolve_symbol(self, symbol: str) -> Optional[dict]:
+        """Resolução exata de ticker em O(1): moeda canônica primeiro, com metadados de ambiguidade."""
+        key = ANALISADOR_PADRAO.normalizar(symbol)
+        entry = self.symbol_table.get(key)
+        if entry is None:
+            return None
+        
+        ids, canonical_share = entry
+        return {
+            "symbol": key,
+            "canonical": ids[0],
+            "ids": list(ids),
+            "candidates": len(ids),
+            "ambiguous": len(ids) > 1,
+            "canonical_market_cap_share": canonical_share,
+        }
         
     def _load_inverted_index(self) -> bool:
         try:
-            with open(self.index_path, "rb") as file:
-                self.inverted_index = pickle.load(file)
+            self._inverted_index = carregar_postings(self.index_path)
             return True
         except FileNotFoundError:
-            print("Warning: Inverted index not found. Using traditional search.")
+            print("Warning: Inverted index not found. Using traditional search.", file=sys.stderr)
             return False
         except Exception as error:
-            print(f"Error loading inverted index: {error}")
+            print(f"Error loading inverted index: {error}", file=sys.stderr)
             return False
     
     def _connect_database(self) -> bool:
@@ -40,19 +153,15 @@ class CryptocurrencySearchEngine:
         if not self.inverted_index:
             return set()
         
-        normalized_term = term.lower().strip()
-        found_ids = set()
-        
-        if normalized_term in self.inverted_index:
-            found_ids.update(self.inverted_index[normalized_term])
-        
-        for indexed_term, ids in self.inverted_index.items():
-            if normalized_term in indexed_term:
-                found_ids.update(ids)
-        
-        return found_ids
+        # Mesma semântica para todos os caminhos (interpretar_termo): exato só com
+        # chaves exatas; prefixo e infixo casam partes de palavras indexadas.
+        # Postings são bitmaps de docids e só o resultado final vira ids de moeda.
+        with etapa("term_lookup"):
+            found_ids = self.inverted_index.consultar([term], self.substring_filter)[term]
+        return self.inverted_index.ids(found_ids) if found_ids else set()
     
-    def _search_with_index(self, term: str) -> List[Tuple]:
+    def _search_with_index(self, term: str, filters: Optional[List[Filtro]] = None,
+                           sort: Optional[Tuple[str, bool]] = None) -> List[Tuple]:
         """Busca usando índice invertido."""
         found_ids = self._search_ids_by_term(term)
         
@@ -64,39 +173,212 @@ class CryptocurrencySearchEngine:
         
         cursor = self.connection.cursor()
         placeholders = ','.join(['?' for _ in found_ids])
+        filter_sql, filter_params = clausula_filtros(filters)
         query = f"""
             SELECT * FROM moedas 
-            WHERE id IN ({placeholders}) 
-            ORDER BY market_cap DESC NULLS LAST
+            WHERE id IN ({placeholders}) {"AND " + filter_sql if filter_sql else ""}
+            {clausula_ordenacao(sort)}
         """
         
         try:
-            cursor.execute(query, list(found_ids))
-            return cursor.fetchall()
+            with etapa("sql"):
+                cursor.execute(query, [*found_ids, *filter_params])
+                return cursor.fetchall()
         except sqlite3.Error as error:
             print(f"Database query error: {error}")
             return []
     
-    def _search_traditional(self, field: str, term: str) -> List[Tuple]:
+    def _search_traditional(self, field: str, term: str, filters: Optional[List[Filtro]] = None,
+                            sort: Optional[Tuple[str, bool]] = None) -> List[Tuple]:
         if not self.connection and not self._connect_database():
             return []
         
         cursor = self.connection.cursor()
-        query = f"SELECT * FROM moedas WHERE LOWER({field}) LIKE ? ORDER BY market_cap DESC"
+        text_sql, text_params = clausula_texto(field, term)
+        filter_sql, filter_params = clausula_filtros(filters)
+        query = f"""
+            SELECT * FROM moedas WHERE {text_sql} {"AND " + filter_sql if filter_sql else ""}
+            {clausula_ordenacao(sort)}
+        """
         
         try:
-            cursor.execute(query, (f"%{term.lower()}%",))
-            return cursor.fetchall()
+            with etapa("sql"):
+                cursor.execute(query, (*text_params, *filter_params))
+                return cursor.fetchall()
         except sqlite3.Error:
             return []
     
-    def search_by_field(self, field: str, term: str) -> List[Tuple]:
-        # Se temos índice invertido, usar para busca otimizada
-        if self.index_loaded:
-            return self._search_with_index(term)
+    def screen(self, filters: List[Filtro], sort: Optional[Tuple[str, bool]] = None,
+               limit: Optional[int] = None) -> List[Tuple]:
+        """Filtra o catálogo inteiro só por faixas numéricas, usando os índices secundários."""
+        if not self.connection and not self._connect_database():
+            return []
+        
+        cursor = self.connection.cursor()
+        filter_sql, filter_params = clausula_filtros(filters)
+        query = f"""
+            SELECT * FROM moedas {"WHERE " + filter_sql if filter_sql else ""}
+            {clausula_ordenacao(sort)}
+            LIMIT ?
+        """
+        
+        try:
+            with etapa("sql"):
+                cursor.execute(query, (*filter_params, -1 if limit is None else limit))
+                return cursor.fetchall()
+        except sqlite3.Error as error:
+            print(f"Database query error: {error}")
+            return []
+    
+    def _search_resolved_symbol(self, resolution: dict, filters: Optional[List[Filtro]] = None,
+                                sort: Optional[Tuple[str, bool]] = None) -> List[Tuple]:
+        if not self.connection and not self._connect_database():
+            return []
+        
+        ids = resolution["ids"]
+        placeholders = ','.join(['?' for _ in ids])
+        filter_sql, filter_params = clausula_filtros(filters)
+        query = f"SELECT * FROM moedas WHERE id IN ({placeholders}) {'AND ' + filter_sql if filter_sql else ''}"
+        if sort:
+            query += f" {clausula_ordenacao(sort)}"
+        
+        try:
+            with etapa("sql"):
+                results = self.connection.execute(query, [*ids, *filter_params]).fetchall()
+        except sqlite3.Error as error:
+            print(f"Database query error: {error}")
+            return []
+        
+        if not sort:
+            # Ordem da tabela de símbolos: canônica primeiro
+            rank = {crypto_id: position for position, crypto_id in enumerate(ids)}
+            results.sort(key=lambda row: rank[row[0]])
+        return results
+    
+    def search_by_field(self, field: str, term: str, filters: Optional[List[Filtro]] = None,
+                        sort: Optional[Tuple[str, bool]] = None) -> List[Tuple]:
+        with self.tracer.consulta("search_by_field", field=field, term=term):
+            return self._search_by_field(field, term, filters, sort)
+    
+    def _search_by_field(self, field: str, term: str, filters: Optional[List[Filtro]],
+                         sort: Optional[Tuple[str, bool]]) -> List[Tuple]:
+        if not term.strip():
+            return self.screen(filters or [], sort)
+        
+        # O planejador escolhe pelo custo estimado entre estratégias com o mesmo resultado
+        with etapa("plan"):
+            strategy = self.planner.planejar(term, field)["estrategia"]
+        return self._run_strategy(strategy, field, term, filters, sort)
+    
+    def _run_strategy(self, strategy: str, field: str, term: str, filters: Optional[List[Filtro]] = None,
+                      sort: Optional[Tuple[str, bool]] = None) -> List[Tuple]:
+        if strategy == "vazio":
+            return []
+        if strategy == "simbolo":
+            resolution = self.resolve_symbol(interpretar_termo(term)[1])
+            return self._search_resolved_symbol(resolution, filters, sort) if resolution else []
+        if strategy in ("postings", "ngramas"):
+            return self._search_with_index(term, filters, sort)
+        # seek e varredura são o mesmo SQL por campo
+        return self._search_traditional(field, term, filters, sort)
+    
+    def _search_ids_by_terms(self, terms: List[str]) -> Dict[str, Set[str]]:
+        """Resolve vários termos de uma vez, com uma única varredura das chaves para todos."""
+        if not self.inverted_index or not terms:
+            return {term: set() for term in terms}
+        
+        found = self.inverted_index.consultar(terms, self.substring_filter)
+        return {term: self.inverted_index.ids(found_ids) if found_ids else set() for term, found_ids in found.items()}
+    
+    def search_batch(self, terms: Iterable[str], field: str = "nome", limit_per_term: Optional[int] = None,
+                     filters: Optional[List[Filtro]] = None,
+                     sort: Optional[Tuple[str, bool]] = None) -> Iterator[Tuple[str, Optional[Tuple]]]:
+        """Busca em lote: gera (termo, linha) na ordem de entrada; linha é None quando não há resultado."""
+        if field not in BATCH_FIELDS:
+            raise ValueError(f"Invalid search field: {field}")
+        
+        # Casamento pelo termo em minúsculas; a saída usa a primeira grafia digitada
+        original_terms: Dict[str, str] = {}
+        for term in terms:
+            if term and term.strip():
+                original_terms.setdefault(term.strip().lower(), term.strip())
+        unique_terms = list(original_terms)
+        if not unique_terms:
+            return
+        display_terms = list(original_terms.values())
+        
+        if not self.connection and not self._connect_database():
+            return
+        
+        cursor = self.connection.cursor()
+        cursor.execute("CREATE TEMP TABLE IF NOT EXISTS lote_termos (posicao INTEGER PRIMARY KEY, termo TEXT)")
+        cursor.execute("CREATE TEMP TABLE IF NOT EXISTS lote_ids (posicao INTEGER, id TEXT)")
+        cursor.execute("DELETE FROM lote_termos")
+        cursor.execute("DELETE FROM lote_ids")
+        
+        filter_sql, filter_params = clausula_filtros(filters, "m")
+        filter_join = f" AND {filter_sql}" if filter_sql else ""
+        
+        try:
+            cursor.executemany("INSERT INTO lote_termos (posicao, termo) VALUES (?, ?)", enumerate(unique_terms))
+            
+            if self.index_loaded:
+                found = self._search_ids_by_terms(unique_terms)
+                cursor.executemany(
+                    "INSERT INTO lote_ids (posicao, id) VALUES (?, ?)",
+                    ((position, crypto_id) for position, term in enumerate(unique_terms) for crypto_id in found[term])
+                )
+                join = f"LEFT JOIN lote_ids l ON l.posicao = t.posicao LEFT JOIN moedas m ON m.id = l.id{filter_join}"
+            else:
+                join = f"LEFT JOIN moedas m ON LOWER(m.{field}) LIKE '%' || t.termo || '%'{filter_join}"
+            
+            cursor.execute(f"""
+                SELECT t.posicao, t.termo, m.* FROM lote_termos t
+                {join}
+                {clausula_ordenacao(sort, "m", antes=("t.posicao",))}
+            """, filter_params)
+            
+            # Ids descartados pelos filtros voltam como linhas nulas: cada termo
+            # sem nenhum resultado é reportado uma única vez.
+            current_position, current_term, emitted = None, None, 0
+            for row in cursor:
+                position, term, crypto = row[0], display_terms[row[0]], row[2:]
+                if position != current_position:
+                    if current_position is not None and emitted == 0:
+                        yield current_term, None
+                    current_position, current_term, emitted = position, term, 0
+                if crypto[0] is None:
+                    continue
+                emitted += 1
+                if limit_per_term is None or emitted <= limit_per_term:
+                    yield term, crypto
+            if current_position is not None and emitted == 0:
+                yield current_term, None
+        except sqlite3.Error as error:
+            print(f"Database query error: {error}", file=sys.stderr)
+        finally:
+            cursor.execute("DELETE FROM lote_termos")
+            cursor.execute("DELETE FROM lote_ids")
+    
+    def write_batch_results(self, results: Iterable[Tuple[str, Optional[Tuple]]], output: TextIO,
+                            output_format: str = "csv") -> int:
+        count = 0
+        
+        if output_format == "csv":
+            writer = csv.writer(output)
+            writer.writerow(("query",) + RESULT_COLUMNS)
+            for term, crypto in results:
+                writer.writerow((term,) + (crypto if crypto else ("",) * len(RESULT_COLUMNS)))
+                count += 1
+        elif output_format == "jsonl":
+            for term, crypto in results:
+                record = {"query": term, **dict(zip(RESULT_COLUMNS, crypto or (None,) * len(RESULT_COLUMNS)))}
+                output.write(json.dumps(record, ensure_ascii=False) + "\n")
+                count += 1
         else:
-            # Fallback para busca tradicional
-            return self._search_traditional(field, term)
+            raise ValueError(f"Unsupported output format: {output_format}")
+        
+        return count
     
     def format_currency_value(self, value, value_type: str) -> str:
         if value is None:
@@ -119,6 +401,16 @@ class CryptocurrencySearchEngine:
         
         return str(value)
     
+    def sentiment_score(self, crypto_id: str) -> Optional[int]:
+        if not self.connection and not self._connect_database():
+            return None
+        try:
+            row = self.connection.execute("SELECT pontuacao FROM sentimento_moedas WHERE id = ?", (crypto_id,)).fetchone()
+        except sqlite3.Error:
+            # sentimento.py ainda não rodou neste banco
+            return None
+        return row[0] if row else None
+    
     def display_cryptocurrency_details(self, crypto_data: Tuple):
         separator = "=" * 60
         print(f"\n{separator}")
@@ -131,12 +423,24 @@ class CryptocurrencySearchEngine:
         print(f"24h Change: {self.format_currency_value(crypto_data[4], 'change')}")
         print(f"Market Cap: {self.format_currency_value(crypto_data[5], 'market_cap')}")
         print(f"Last Updated: {crypto_data[6] if crypto_data[6] else 'N/A'}")
+        sentiment = self.sentiment_score(crypto_data[0])
+        if sentiment is not None:
+            print(f"Sentiment: {sentiment / 100:+.2f} ({rotulo_sentimento(sentiment)})")
+        similar = self.similar_coins(crypto_data[0])
+        if similar:
+            print("Similar coins:")
+            for coin in similar:
+                print(f"  {coin['similaridade']:.0%}  {coin['nome']} ({coin['simbolo'].upper()}) [{coin['id']}]")
         print(separator)
     
     def display_search_results(self, results: List[Tuple], max_display: int = 15):
+        display_count = self.print_search_results(results, max_display)
+        return self._get_user_selection(results, display_count) if display_count else None
+    
+    def print_search_results(self, results: List[Tuple], max_display: int = 15) -> int:
         if not results:
             print("No cryptocurrencies found.")
-            return None
+            return 0
         
         print(f"\n{len(results)} result(s) found:")
         print("-" * 70)
@@ -150,7 +454,7 @@ class CryptocurrencySearchEngine:
         if len(results) > max_display:
             print(f"... and {len(results) - max_display} more result(s)")
         
-        return self._get_user_selection(results, display_count)
+        return display_count
     
     def _get_user_selection(self, results: List[Tuple], display_count: int) -> Optional[Tuple]:
         try:
@@ -178,7 +482,7 @@ class CryptocurrencySearchEngine:
         print("CRYPTOCURRENCY SEARCH ENGINE")
         print("=" * 50)
         
-        if self.index_loaded:
+        if self.index_available():
             print("Search optimization: Inverted index enabled")
         else:
             print("Search optimization: Traditional mode")
@@ -190,14 +494,19 @@ class CryptocurrencySearchEngine:
             print("1. Search by ID")
             print("2. Search by Name")
             print("3. Search by Symbol")
-            print("4. Exit")
+            print("4. Screen by price / 24h change / market cap")
+            print("5. Exit")
             
             try:
-                option = input("\nSelect option (1-4): ").strip()
+                option = input("\nSelect option (1-5): ").strip()
                 
-                if option == "4" or option.lower() == "exit":
+                if option == "5" or option.lower() == "exit":
                     break
                 
+                if option == "4":
+                    self._run_screen_prompt()
+                    continue
+                
                 field_map = {"1": "id", "2": "nome", "3": "simbolo"}
                 field = field_map.get(option)
                 
@@ -206,7 +515,7 @@ class CryptocurrencySearchEngine:
                     continue
                 
                 field_display = "symbol" if field == "simbolo" else field
-                term = input(f"Enter {field_display}: ").strip()
+                term = input(f"Enter {field_display} (\"exact\", prefix* or text): ").strip()
                 
                 if term.lower() == "exit":
                     break
@@ -215,10 +524,22 @@ class CryptocurrencySearchEngine:
                     continue
                 
                 print(f"\nSearching for '{term}' by {field_display}...")
-                results = self.search_by_field(field, term)
+                # O rastro cobre busca e impressão, mas não a espera pela escolha do usuário
+                with self.tracer.consulta("cli_search", field=field, term=term):
+                    results = self.search_by_field(field, term)
+                    
+                    resolution = self.resolve_symbol(interpretar_termo(term)[1]) if field == "simbolo" else None
+                    if resolution and resolution["ambiguous"]:
+                        share = resolution["canonical_market_cap_share"]
+                        share_text = f", {share:.0%} of their market cap" if share is not None else ""
+                        print(f"Symbol '{term.upper()}' is shared by {resolution['candidates']} coins; "
+                              f"canonical: {resolution['canonical']}{share_text}")
+                    
+                    with etapa("render"):
+                        display_count = self.print_search_results(results)
                 
                 # Display results and handle selection
-                selected_crypto = self.display_search_results(results)
+                selected_crypto = self._get_user_selection(results, display_count) if display_count else None
                 if selected_crypto:
                     self.display_cryptocurrency_details(selected_crypto)
                 
@@ -230,10 +551,79 @@ class CryptocurrencySearchEngine:
         
         self._close_connection()
         print("\nSearch session ended.")
+    
+    def _run_screen_prompt(self):
+        try:
+            filters = interpretar_filtros(input("Filters (e.g. price < 0.01, change > 20): "))
+            sort = interpretar_ordenacao(input("Sort by (e.g. change desc, Enter for market cap): "))
+        except ValueError as error:
+            print(error)
+            return
+        
+        results = self.screen(filters, sort)
+        selected_crypto = self.display_search_results(results)
+        if selected_crypto:
+            self.display_cryptocurrency_details(selected_crypto)
+
+def read_batch_terms(source: str) -> Iterator[str]:
+    if source == "-":
+        yield from (line.strip() for line in sys.stdin)
+        return
+    
+    with open(source, "r", encoding="utf-8") as file:
+        yield from (line.strip() for line in file)
 
 def main():
-    search_engine = CryptocurrencySearchEngine()
-    search_engine.run_search_interface()
+    parser = argparse.ArgumentParser(description="Cryptocurrency search engine")
+    parser.add_argument("--batch", metavar="FILE", help="Read one query per line from FILE ('-' for stdin)")
+    parser.add_argument("--field", choices=BATCH_FIELDS, default="nome", help="Field used when the index is unavailable")
+    parser.add_argument("--format", choices=("csv", "jsonl"), default="csv", dest="output_format")
+    parser.add_argument("--output", metavar="FILE", help="Write batch results to FILE instead of stdout")
+    parser.add_argument("--limit", type=int, help="Maximum results per query")
+    parser.add_argument("--filter", dest="filters", help="Numeric filters, e.g. 'price < 0.01, change > 20'")
+    parser.add_argument("--sort", help="Sort field and direction, e.g. 'change desc' (default: market cap)")
+    parser.add_argument("--explain", action="store_true", help="Log the plan and estimated cost of each query")
+    parser.add_argument("--trace-sample", type=float, default=0.0, metavar="RATE",
+                        help="Fraction of queries traced with per-stage timings (0-1)")
+    parser.add_argument("--slow-query-ms", type=float, metavar="MS",
+                        help="Append queries slower than MS to data/consultas_lentas.jsonl")
+    parser.add_argument("--profile", type=int, default=0, metavar="N",
+                        help="Capture a cProfile dump (data/perfis/<trace_id>.prof) of the next N queries")
+    args = parser.parse_args()
+    
+    if args.explain or args.trace_sample or args.profile:
+        logging.basicConfig(level=logging.INFO, format="%(name)s: %(message)s", stream=sys.stderr)
+    
+    try:
+        filters = interpretar_filtros(args.filters)
+        sort = interpretar_ordenacao(args.sort)
+    except ValueError as error:
+        parser.error(str(error))
+    
+    tracer = Rastreador.do_ambiente()
+    if args.trace_sample:
+        tracer.taxa_amostragem = args.trace_sample
+    if args.slow_query_ms is not None:
+        tracer.limite_lento_ms = args.slow_query_ms
+    if args.profile:
+        tracer.perfilar_proxima(args.profile)
+    search_engine = CryptocurrencySearchEngine(tracer=tracer)
+    
+    if not args.batch:
+        search_engine.run_search_interface()
+        return
+    
+    output = open(args.output, "w", encoding="utf-8", newline="") if args.output else sys.stdout
+    results = search_engine.search_batch(read_batch_terms(args.batch), args.field, args.limit, filters, sort)
+    try:
+        search_engine.write_batch_results(results, output, args.output_format)
+    except BrokenPipeError:
+        pass
+    finally:
+        results.close()
+        if output is not sys.stdout:
+            output.close()
+        search_engine._close_connection()
 
 if __name__ == "__main__":
     main()
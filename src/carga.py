@@ -0,0 +1,411 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import ExitStack, redirect_stdout
+from io import StringIO
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+SRC_DIR = Path(__file__).resolve().parent
+
+CAMINHO_STREAM = "/_reactpy/stream"
+ENDPOINTS_JSON = ("/api/analytics/summary", "/api/analytics/movers", "/api/index/stats", "/api/symbols/{simbolo}")
+# Marcadores no VDOM enviado pelo ResultsSection: estado "buscando" e resultado (ou lista vazia)
+MARCADOR_CARREGANDO = "Searching with"
+MARCADORES_RESULTADO = ("cf-results-title", "couldn't find")
+
+SILABAS = ("bit", "eth", "sol", "do", "ge", "ra", "ny", "zen", "lu", "na", "ka", "vo", "ter", "mi", "ox",
+           "pe", "ar", "bo", "qu", "in", "tra", "fi", "lo", "sha", "ri", "cro", "neo", "ve", "xa")
+SUFIXOS = ("", "", "Coin", "Token", "Finance", "Protocol", "Network", "Inu", "AI", "Swap", "Chain", "DAO")
+PREFIXOS = ("", "", "", "", "", "Wrapped ", "Bridged ", "Staked ", "Baby ")
+
+def gerar_dados_sinteticos(diretorio: str, quantidade: int, semente: int = 42) -> Dict[str, str]:
+    """Banco, índice, tabela de símbolos e filtro sintéticos; devolve as variáveis de ambiente do app."""
+    from indiceinvertido import ConstrutorIndiceInvertido
+    from requisicao import ColetorDadosCripto
+    
+    aleatorio = random.Random(semente)
+    pasta = Path(diretorio)
+    pasta.mkdir(parents=True, exist_ok=True)
+    db_path = str(pasta / "sintetico.db")
+    
+    coletor = ColetorDadosCripto(db_path, formato_snapshot=None)
+    if not coletor.inicializar_banco():
+        raise RuntimeError(f"Não foi possível criar {db_path}")
+    
+    linhas = []
+    ids_usados = set()
+    agora = time.strftime("%Y-%m-%dT%H:%M:%S.000Z", time.gmtime())
+    for _ in range(quantidade):
+        raiz = "".join(aleatorio.choice(SILABAS) for _ in range(aleatorio.randint(1, 3))).capitalize()
+        sufixo = aleatorio.choice(SUFIXOS)
+        nome = f"{aleatorio.choice(PREFIXOS)}{raiz}{' ' + sufixo if sufixo else ''}"
+        id_base = "-".join(nome.lower().split())
+        id_moeda = id_base
+        while id_moeda in ids_usados:
+            id_moeda = f"{id_base}-{aleatorio.randint(2, 999)}"
+        ids_usados.add(id_moeda)
+        # Tickers curtos repetem entre moedas, como no catálogo real
+        simbolo = (raiz[:aleatorio.randint(2, 5)] + (sufixo[:1] if sufixo else "")).lower()
+        market_cap = aleatorio.lognormvariate(14, 3)
+        linhas.append((
+            id_moeda, nome, simbolo, aleatorio.lognormvariate(-2, 4), aleatorio.gauss(0, 8), market_cap, agora
+        ))
+    
+    with coletor.conn:
+        coletor.conn.executemany('''
+            INSERT OR IGNORE INTO moedas (id, nome, simbolo, preco_usd, variacao_24h, market_cap, ultima_atualizacao)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', linhas)
+    coletor.conn.close()
+    
+    caminhos = {
+        "CRYPTOFINDER_DB": db_path,
+        "CRYPTOFINDER_INDEX": str(pasta / "indice_invertido.pkl"),
+        "CRYPTOFINDER_SYMBOLS": str(pasta / "simbolos.pkl"),
+        "CRYPTOFINDER_SUBSTRING_FILTER": str(pasta / "filtro_substrings.pkl"),
+    }
+    construtor = ConstrutorIndiceInvertido(db_path, aliases={})
+    with redirect_stdout(StringIO()):
+        construtor.construir_indice()
+        construtor.construir_tabela_simbolos()
+        construtor.salvar_indice(caminhos["CRYPTOFINDER_INDEX"])
+        construtor.salvar_tabela_simbolos(caminhos["CRYPTOFINDER_SYMBOLS"])
+        construtor.salvar_filtro_substrings(caminhos["CRYPTOFINDER_SUBSTRING_FILTER"])
+    return caminhos
+
+def termos_consulta(db_path: str, quantidade: int = 500, semente: int = 42) -> Tuple[List[str], List[str]]:
+    """Mistura de consultas realistas (nomes, palavras, símbolos, prefixos, ausentes) e símbolos existentes."""
+    import sqlite3
+    
+    aleatorio = random.Random(semente)
+    conn = sqlite3.connect(db_path)
+    try:
+        linhas = conn.execute("SELECT nome, simbolo FROM moedas ORDER BY random() LIMIT ?", (quantidade,)).fetchall()
+    finally:
+        conn.close()
+    
+    termos = []
+    for nome, simbolo in linhas:
+        palavras = nome.split()
+        termos.append(aleatorio.choice((
+            nome, aleatorio.choice(palavras), simbolo, palavras[0][:aleatorio.randint(2, 4)],
+            "".join(aleatorio.choice("qxzjkw") for _ in range(5)),
+        )))
+    return termos, sorted({simbolo for _, simbolo in linhas})
+
+def porta_livre() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def iniciar_servidor(ambiente_extra: Dict[str, str], porta: int, log, tempo_limite: float = 60.0) -> subprocess.Popen:
+    """Sobe `app:app` num único worker uvicorn e espera a API responder; stdout/stderr vão para `log`."""
+    import httpx
+    
+    ambiente = {**os.environ, "PYTHONPATH": str(SRC_DIR), **ambiente_extra}
+    processo = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app:app", "--host", "127.0.0.1", "--port", str(porta),
+         "--workers", "1", "--log-level", "warning"],
+        cwd=SRC_DIR.parent, env=ambiente, stdout=log, stderr=subprocess.STDOUT
+    )
+    limite = time.monotonic() + tempo_limite
+    while time.monotonic() < limite:
+        if processo.poll() is not None:
+            raise RuntimeError(f"O servidor terminou com código {processo.returncode}")
+        try:
+            if httpx.get(f"http://127.0.0.1:{porta}/api/index/stats", timeout=2).status_code == 200:
+                return processo
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    processo.terminate()
+    raise RuntimeError("O servidor não respondeu a tempo")
+
+def memoria_processo(pid: Optional[int]) -> Optional[int]:
+    """RSS em bytes (Linux, /proc); None quando indisponível."""
+    if pid is None:
+        return None
+    try:
+        with open(f"/proc/{pid}/status", encoding="ascii") as f:
+            for linha in f:
+                if linha.startswith("VmRSS:"):
+                    return int(linha.split()[1]) * 1024
+    except OSError:
+        return None
+    return None
+
+def percentil(valores: Sequence[float], fracao: float) -> float:
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(fracao * len(ordenados)))]
+
+def _resumo(latencias: List[float], erros: int, duracao: float) -> dict:
+    return {
+        "concluidas": len(latencias),
+        "erros": erros,
+        "vazao_por_s": len(latencias) / duracao if duracao > 0 else 0.0,
+        "p50_ms": percentil(latencias, 0.50) * 1000,
+        "p95_ms": percentil(latencias, 0.95) * 1000,
+        "p99_ms": percentil(latencias, 0.99) * 1000,
+        "max_ms": max(latencias, default=0.0) * 1000,
+    }
+
+def _alvos_busca(modelo: dict) -> Optional[Dict[str, str]]:
+    # Primeiro input de texto com on_input/on_key_down: a caixa de busca do SearchInterface
+    pilha = [modelo]
+    while pilha:
+        elemento = pilha.pop(0)
+        if not isinstance(elemento, dict):
+            continue
+        manipuladores = elemento.get("eventHandlers", {})
+        if elemento.get("tagName") == "input" and "on_input" in manipuladores and "on_key_down" in manipuladores:
+            return {evento: manipuladores[evento]["target"] for evento in ("on_input", "on_key_down")}
+        pilha.extend(elemento.get("children", []))
+    return None
+
+def _evento(alvo: str, dados: list) -> str:
+    return json.dumps({"type": "layout-event", "target": alvo, "data": dados})
+
+class SessaoReactPy:
+    """Um navegador simulado: abre o stream do layout e dispara buscas pela caixa de busca."""
+    
+    def __init__(self, url: str, tempo_limite: float = 30.0):
+        self.url = url
+        self.tempo_limite = tempo_limite
+        self.ws = None
+        self.alvos = None
+        self.termo_atual = ""
+    
+    async def conectar(self):
+        import websockets
+        
+        self.ws = await websockets.connect(self.url, max_size=None, open_timeout=self.tempo_limite)
+        inicial = json.loads(await asyncio.wait_for(self.ws.recv(), self.tempo_limite))
+        self.alvos = _alvos_busca(inicial["model"])
+        if self.alvos is None:
+            raise RuntimeError("Caixa de busca não encontrada no layout")
+    
+    async def buscar(self, termo: str) -> float:
+        """Segundos entre o Enter e o layout com os resultados."""
+        if termo != self.termo_atual:
+            await self.ws.send(_evento(self.alvos["on_input"], [{"target": {"value": termo}}]))
+            # O Enter usa o termo da renderização mais recente: espera o novo valor chegar
+            await asyncio.wait_for(self.ws.recv(), self.tempo_limite)
+            self.termo_atual = termo
+        
+        inicio = time.perf_counter()
+        await self.ws.send(_evento(self.alvos["on_key_down"], [{"key": "Enter"}]))
+        carregando = False
+        while True:
+            mensagem = await asyncio.wait_for(self.ws.recv(), self.tempo_limite)
+            if MARCADOR_CARREGANDO in mensagem:
+                carregando = True
+            elif carregando and any(marcador in mensagem for marcador in MARCADORES_RESULTADO):
+                return time.perf_counter() - inicio
+    
+    async def fechar(self):
+        if self.ws is not None:
+            await self.ws.close()
+
+async def carga_websocket(url: str, sessoes: int, consultas: int, termos: Sequence[str], pensar: float = 0.0,
+                          pid: Optional[int] = None, semente: int = 0) -> dict:
+    """Abre `sessoes` sessões simultâneas e faz `consultas` buscas em cada uma."""
+    memoria_base = memoria_processo(pid)
+    abertas = [SessaoReactPy(url) for _ in range(sessoes)]
+    conexoes = await asyncio.gather(*(sessao.conectar() for sessao in abertas), return_exceptions=True)
+    ativas = [sessao for sessao, erro in zip(abertas, conexoes) if not isinstance(erro, BaseException)]
+    # Medida com as sessões abertas e ociosas: custo de manter cada layout vivo no servidor
+    memoria_conectado = memoria_processo(pid)
+    
+    latencias: List[float] = []
+    erros = sessoes - len(ativas)
+    
+    async def executar(sessao: SessaoReactPy, indice: int):
+        nonlocal erros
+        aleatorio = random.Random(semente + indice)
+        for feitas in range(consultas):
+            try:
+                latencias.append(await sessao.buscar(aleatorio.choice(termos)))
+            except Exception:
+                # Sessão dessincronizada ou derrubada: as consultas restantes contam como erro
+                erros += consultas - feitas
+                return
+            if pensar:
+                await asyncio.sleep(aleatorio.expovariate(1 / pensar))
+    
+    inicio = time.perf_counter()
+    await asyncio.gather(*(executar(sessao, indice) for indice, sessao in enumerate(ativas)))
+    duracao = time.perf_counter() - inicio
+    await asyncio.gather(*(sessao.fechar() for sessao in ativas), return_exceptions=True)
+    
+    resumo = _resumo(latencias, erros, duracao)
+    resumo["sessoes"] = sessoes
+    resumo["sessoes_conectadas"] = len(ativas)
+    resumo["memoria_servidor_bytes"] = memoria_conectado
+    resumo["memoria_por_sessao_bytes"] = (
+        (memoria_conectado - memoria_base) / len(ativas)
+        if memoria_base is not None and memoria_conectado is not None and ativas else None
+    )
+    return resumo
+
+async def carga_json(base: str, clientes: int, requisicoes: int, simbolos: Sequence[str], semente: int = 0) -> dict:
+    """`clientes` conexões HTTP simultâneas, cada uma com `requisicoes` GETs nos endpoints JSON existentes."""
+    import httpx
+    
+    async with httpx.AsyncClient(base_url=base, timeout=30,
+                                 limits=httpx.Limits(max_connections=clientes)) as cliente:
+        # Só entram endpoints que existem nesta versão do app
+        endpoints = []
+        for endpoint in ENDPOINTS_JSON:
+            resposta = await cliente.get(endpoint.format(simbolo=simbolos[0] if simbolos else "btc"))
+            if resposta.status_code < 400:
+                endpoints.append(endpoint)
+        
+        latencias: List[float] = []
+        erros = 0
+        
+        async def trabalhador(indice: int):
+            nonlocal erros
+            aleatorio = random.Random(semente + indice)
+            for _ in range(requisicoes):
+                caminho = aleatorio.choice(endpoints).format(simbolo=aleatorio.choice(simbolos or ["btc"]))
+                inicio = time.perf_counter()
+                try:
+                    resposta = await cliente.get(caminho)
+                    if resposta.status_code >= 500:
+                        erros += 1
+                        continue
+                except httpx.HTTPError:
+                    erros += 1
+                    continue
+                latencias.append(time.perf_counter() - inicio)
+        
+        inicio = time.perf_counter()
+        await asyncio.gather(*(trabalhador(indice) for indice in range(clientes)))
+        duracao = time.perf_counter() - inicio
+    
+    resumo = _resumo(latencias, erros, duracao)
+    resumo["clientes"] = clientes
+    resumo["endpoints"] = endpoints
+    return resumo
+
+def ponto_saturacao(resultados: List[dict], chave: str, slo_p99_ms: float) -> Optional[int]:
+    """Primeira configuração com erros acima de 1%, p99 acima do SLO ou vazão que parou de crescer (<10%)."""
+    melhor_vazao = 0.0
+    for resultado in resultados:
+        total = resultado["concluidas"] + resultado["erros"]
+        if (resultado["erros"] > total * 0.01 or resultado["p99_ms"] > slo_p99_ms
+                or (melhor_vazao and resultado["vazao_por_s"] < melhor_vazao * 1.1)):
+            return resultado[chave]
+        melhor_vazao = max(melhor_vazao, resultado["vazao_por_s"])
+    return None
+
+def _formatar_bytes(valor: Optional[float]) -> str:
+    return "n/d" if valor is None else f"{valor / 2**20:.2f} MiB"
+
+def imprimir_relatorio(relatorio: dict):
+    slo = relatorio["slo_p99_ms"]
+    print(f"\nWebsocket ReactPy ({relatorio['consultas_por_sessao']} buscas por sessão, SLO p99 {slo:.0f} ms)")
+    print(f"{'sessões':>8} {'ok':>6} {'erros':>6} {'buscas/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+          f"{'RSS':>11} {'RSS/sessão':>11}")
+    for r in relatorio["websocket"]:
+        print(f"{r['sessoes']:>8} {r['concluidas']:>6} {r['erros']:>6} {r['vazao_por_s']:>9.1f} {r['p50_ms']:>8.1f} "
+              f"{r['p95_ms']:>8.1f} {r['p99_ms']:>8.1f} {_formatar_bytes(r['memoria_servidor_bytes']):>11} "
+              f"{_formatar_bytes(r['memoria_por_sessao_bytes']):>11}")
+    saturacao = relatorio["saturacao_websocket"]
+    print(f"Saturação: {f'a partir de {saturacao} sessões' if saturacao else 'não atingida nas configurações testadas'}")
+    
+    if relatorio["json"]:
+        print(f"\nEndpoints JSON ({', '.join(relatorio['json'][0]['endpoints'])})")
+        print(f"{'clientes':>8} {'ok':>6} {'erros':>6} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+        for r in relatorio["json"]:
+            print(f"{r['clientes']:>8} {r['concluidas']:>6} {r['erros']:>6} {r['vazao_por_s']:>9.1f} "
+                  f"{r['p50_ms']:>8.1f} {r['p95_ms']:>8.1f} {r['p99_ms']:>8.1f}")
+        saturacao = relatorio["saturacao_json"]
+        print(f"Saturação: {f'a partir de {saturacao} clientes' if saturacao else 'não atingida nas configurações testadas'}")
+
+def _houve_erros(relatorio: dict) -> bool:
+    return any(r["erros"] for r in relatorio["websocket"] + relatorio["json"])
+
+async def executar_cenarios(base: str, niveis: List[int], consultas: int, requisicoes_json: int, termos: List[str],
+                            simbolos: List[str], pensar: float, pid: Optional[int], slo_p99_ms: float,
+                            com_json: bool = True) -> dict:
+    url_stream = base.replace("http", "ws", 1) + CAMINHO_STREAM
+    # Aquecimento: carrega índice, tabela de símbolos e filtro antes de medir
+    await carga_websocket(url_stream, 1, 3, termos, pid=pid)
+    
+    relatorio = {"consultas_por_sessao": consultas, "slo_p99_ms": slo_p99_ms, "websocket": [], "json": []}
+    for sessoes in niveis:
+        relatorio["websocket"].append(await carga_websocket(url_stream, sessoes, consultas, termos, pensar, pid))
+    if com_json:
+        for clientes in niveis:
+            relatorio["json"].append(await carga_json(base, clientes, requisicoes_json, simbolos))
+    
+    relatorio["saturacao_websocket"] = ponto_saturacao(relatorio["websocket"], "sessoes", slo_p99_ms)
+    relatorio["saturacao_json"] = ponto_saturacao(relatorio["json"], "clientes", slo_p99_ms) if com_json else None
+    return relatorio
+
+def main():
+    parser = argparse.ArgumentParser(description="Teste de carga do app ReactPy (websocket) e dos endpoints JSON")
+    parser.add_argument("--sessoes", type=int, nargs="+", default=[1, 5, 10, 25, 50],
+                        help="Níveis de sessões (e clientes JSON) simultâneos")
+    parser.add_argument("--consultas", type=int, default=20, help="Buscas por sessão em cada nível")
+    parser.add_argument("--requisicoes-json", type=int, default=50, help="GETs por cliente JSON em cada nível")
+    parser.add_argument("--pensar", type=float, default=0.0, help="Pausa média (s) entre buscas de uma sessão")
+    parser.add_argument("--moedas", type=int, default=15000, help="Tamanho do banco sintético")
+    parser.add_argument("--diretorio", help="Onde gravar os dados sintéticos (padrão: diretório temporário)")
+    parser.add_argument("--url", help="App já rodando (ex.: http://127.0.0.1:8000); sem ele, um uvicorn é iniciado")
+    parser.add_argument("--pid", type=int, help="PID do servidor externo, para medir memória com --url")
+    parser.add_argument("--db", default="data/criptomoedas.db", help="Banco de onde tirar as consultas ao usar --url")
+    parser.add_argument("--slo-p99-ms", type=float, default=1000.0, help="p99 acima disso marca saturação")
+    parser.add_argument("--sem-json", action="store_true", help="Não testa os endpoints JSON")
+    parser.add_argument("--saida", help="Grava o relatório completo em JSON neste arquivo")
+    args = parser.parse_args()
+    
+    processo = None
+    log_servidor = None
+    with tempfile.TemporaryDirectory(prefix="cryptofinder-carga-") as temporario, ExitStack() as pilha:
+        if args.url:
+            base, pid, db_path = args.url.rstrip("/"), args.pid, args.db
+        else:
+            print(f"Gerando {args.moedas} moedas sintéticas...")
+            caminhos = gerar_dados_sinteticos(args.diretorio or temporario, args.moedas)
+            db_path = caminhos["CRYPTOFINDER_DB"]
+            porta = porta_livre()
+            # Tracebacks do servidor ficam fora do relatório; o caminho é impresso se houver erros
+            log_servidor = Path(args.diretorio or temporario) / "servidor.log"
+            processo = iniciar_servidor(caminhos, porta, pilha.enter_context(open(log_servidor, "w")))
+            base, pid = f"http://127.0.0.1:{porta}", processo.pid
+        
+        termos, simbolos = termos_consulta(db_path)
+        try:
+            relatorio = asyncio.run(executar_cenarios(
+                base, sorted(args.sessoes), args.consultas, args.requisicoes_json, termos, simbolos,
+                args.pensar, pid, args.slo_p99_ms, not args.sem_json
+            ))
+        finally:
+            if processo is not None:
+                processo.terminate()
+                processo.wait(timeout=10)
+        
+        imprimir_relatorio(relatorio)
+        if log_servidor is not None and _houve_erros(relatorio):
+            print(f"\nLog do servidor ({log_servidor}):")
+            print(log_servidor.read_text(encoding="utf-8", errors="replace")[-4000:])
+    
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as f:
+            json.dump(relatorio, f, ensure_ascii=False, indent=2)
+        print(f"\nRelatório salvo em: {args.saida}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+import hashlib
+import math
+from collections import Counter
+from typing import Dict, Iterable, Iterator, Mapping, Optional
+
+TAMANHO_NGRAMA = 3
+
+class FiltroBloom:
+    """Filtro de Bloom persistível (hash estável, não o hash() aleatorizado do Python)."""
+    
+    def __init__(self, capacidade: int, taxa_falsos_positivos: float = 0.01):
+        capacidade = max(1, capacidade)
+        self.tamanho_bits = max(8, int(-capacidade * math.log(taxa_falsos_positivos) / math.log(2) ** 2))
+        self.num_hashes = max(1, round(self.tamanho_bits / capacidade * math.log(2)))
+        self.bits = bytearray((self.tamanho_bits + 7) // 8)
+    
+    def _posicoes(self, item: str) -> Iterator[int]:
+        # Double hashing: k posições a partir de dois hashes de 64 bits
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.tamanho_bits
+    
+    def adicionar(self, item: str):
+        for posicao in self._posicoes(item):
+            self.bits[posicao >> 3] |= 1 << (posicao & 7)
+    
+    def __contains__(self, item: str) -> bool:
+        return all(self.bits[posicao >> 3] & (1 << (posicao & 7)) for posicao in self._posicoes(item))
+
+def ngramas_busca(termo: str, tamanho: int = TAMANHO_NGRAMA) -> Iterator[str]:
+    """N-gramas que um termo precisa ter em comum com alguma chave para ser substring dela."""
+    if len(termo) <= tamanho:
+        yield termo
+        return
+    for inicio in range(len(termo) - tamanho + 1):
+        yield termo[inicio:inicio + tamanho]
+
+def ngramas_chave(chave: str, tamanho: int = TAMANHO_NGRAMA) -> Iterator[str]:
+    # Toda substring de até `tamanho` caracteres: cobre termos curtos e os n-gramas dos longos
+    for comprimento in range(1, tamanho + 1):
+        for inicio in range(len(chave) - comprimento + 1):
+            yield chave[inicio:inicio + comprimento]
+
+class FiltroSubstrings:
+    """Rejeição rápida: se responde False, o termo não é substring de nenhuma chave do índice.
+    
+    Com `frequencias` (documentos por chave), guarda também quantos documentos
+    cada n-grama alcança, para o planejador estimar buscas por substring.
+    """
+    
+    # Filtros gravados antes das contagens não têm o atributo
+    documentos_ngramas: Optional[Dict[str, int]] = None
+    
+    def __init__(self, chaves: Iterable[str], taxa_falsos_positivos: float = 0.01,
+                 tamanho_ngrama: int = TAMANHO_NGRAMA, frequencias: Optional[Mapping[str, int]] = None):
+        self.tamanho_ngrama = tamanho_ngrama
+        contagem = Counter()
+        for chave in chaves:
+            frequencia = frequencias.get(chave, 0) if frequencias is not None else 0
+            for ngrama in set(ngramas_chave(chave, tamanho_ngrama)):
+                contagem[ngrama] += frequencia
+        self.filtro = FiltroBloom(len(contagem), taxa_falsos_positivos)
+        for ngrama in contagem:
+            self.filtro.adicionar(ngrama)
+        self.quantidade_ngramas = len(contagem)
+        if frequencias is not None:
+            self.documentos_ngramas = dict(contagem)
+    
+    def pode_conter(self, termo: str) -> bool:
+        # O custo depende só do tamanho do termo, não do número de chaves
+        return all(ngrama in self.filtro for ngrama in ngramas_busca(termo, self.tamanho_ngrama))
+    
+    def estimar_documentos(self, termo: str) -> Optional[int]:
+        """Limite superior de documentos com o termo como substring (n-grama mais raro); None sem contagens."""
+        if self.documentos_ngramas is None:
+            return None
+        return min(self.documentos_ngramas.get(ngrama, 0) for ngrama in ngramas_busca(termo, self.tamanho_ngrama))
@@ -0,0 +1,108 @@
+import re
+from typing import List, Optional, Sequence, Tuple
+
+CAMPOS_NUMERICOS = ("preco_usd", "variacao_24h", "market_cap")
+CAMPOS_TEXTO = ("id", "nome", "simbolo")
+
+APELIDOS_CAMPOS = {
+    "preco_usd": "preco_usd",
+    "preco": "preco_usd",
+    "price": "preco_usd",
+    "variacao_24h": "variacao_24h",
+    "variacao": "variacao_24h",
+    "change": "variacao_24h",
+    "market_cap": "market_cap",
+    "mcap": "market_cap",
+}
+
+OPERADORES = ("<=", ">=", "<", ">", "=")
+
+Filtro = Tuple[str, str, float]
+
+_PADRAO_FILTRO = re.compile(r"^\s*([a-z_0-9]+)\s*(<=|>=|<|>|=)\s*\$?\s*(-?[\d.,]+)\s*(%?)\s*$", re.IGNORECASE)
+
+def interpretar_filtros(expressao: str) -> List[Filtro]:
+    """Converte "price < 0.01, change > 20%" em [(campo, operador, valor), ...]."""
+    filtros = []
+    if not expressao or not expressao.strip():
+        return filtros
+    
+    for parte in re.split(r",|\band\b|\be\b", expressao, flags=re.IGNORECASE):
+        if not parte.strip():
+            continue
+        correspondencia = _PADRAO_FILTRO.match(parte)
+        if not correspondencia:
+            raise ValueError(f"Filtro inválido: {parte.strip()}")
+        nome, operador, valor, _ = correspondencia.groups()
+        campo = APELIDOS_CAMPOS.get(nome.lower())
+        if campo is None:
+            raise ValueError(f"Campo de filtro desconhecido: {nome}")
+        filtros.append((campo, operador, float(valor.replace(",", ""))))
+    
+    return filtros
+
+def interpretar_ordenacao(expressao: Optional[str]) -> Optional[Tuple[str, bool]]:
+    """Converte "change desc" / "price asc" em (campo, descendente)."""
+    if not expressao or not expressao.strip():
+        return None
+    
+    partes = expressao.lower().split()
+    campo = APELIDOS_CAMPOS.get(partes[0])
+    if campo is None:
+        raise ValueError(f"Campo de ordenação desconhecido: {partes[0]}")
+    descendente = len(partes) < 2 or partes[1] != "asc"
+    return campo, descendente
+
+def interpretar_termo(termo: str) -> Tuple[str, str]:
+    """'"bitcoin"' ou '=bitcoin' -> exato; 'bit*' -> prefixo; o resto -> infixo."""
+    termo = termo.strip()
+    if len(termo) >= 2 and termo[0] == termo[-1] == '"':
+        return "exato", termo[1:-1].strip().lower()
+    if termo.startswith("="):
+        return "exato", termo[1:].strip().lower()
+    if termo.endswith("*") and termo.rstrip("*").strip():
+        return "prefixo", termo.rstrip("*").strip().lower()
+    return "infixo", termo.lower()
+
+def clausula_texto(coluna: str, termo: str, tabela: str = "") -> Tuple[str, list]:
+    # Exato e prefixo viram busca no índice (PRIMARY KEY do id, índices lower() de nome/símbolo);
+    # só o infixo precisa de LIKE '%...%' com varredura
+    if coluna not in CAMPOS_TEXTO:
+        raise ValueError(f"Campo de busca inválido: {coluna}")
+    
+    prefixo_tabela = f"{tabela}." if tabela else ""
+    expressao = f"{prefixo_tabela}id" if coluna == "id" else f"lower({prefixo_tabela}{coluna})"
+    modo, valor = interpretar_termo(termo)
+    
+    if modo == "exato":
+        return f"{expressao} = ?", [valor]
+    if modo == "prefixo":
+        # Faixa [valor, valor com o último caractere incrementado)
+        limite = valor[:-1] + chr(ord(valor[-1]) + 1)
+        return f"{expressao} >= ? AND {expressao} < ?", [valor, limite]
+    return f"{expressao} LIKE ?", [f"%{valor}%"]
+
+def clausula_filtros(filtros: Optional[Sequence[Filtro]], tabela: str = "") -> Tuple[str, list]:
+    # Campos e operadores vêm de listas fixas; só os valores viram parâmetros
+    if not filtros:
+        return "", []
+    
+    prefixo = f"{tabela}." if tabela else ""
+    condicoes = []
+    parametros = []
+    for campo, operador, valor in filtros:
+        if campo not in CAMPOS_NUMERICOS or operador not in OPERADORES:
+            raise ValueError(f"Filtro inválido: {campo} {operador}")
+        condicoes.append(f"{prefixo}{campo} {operador} ?")
+        parametros.append(valor)
+    
+    return " AND ".join(condicoes), parametros
+
+def clausula_ordenacao(ordenacao: Optional[Tuple[str, bool]], tabela: str = "", antes: Sequence[str] = ()) -> str:
+    # `antes`: expressões que ordenam antes do campo escolhido (ex.: a posição do termo na busca em lote)
+    prefixo = f"{tabela}." if tabela else ""
+    campo, descendente = ordenacao or ("market_cap", True)
+    if campo not in CAMPOS_NUMERICOS:
+        raise ValueError(f"Campo de ordenação inválido: {campo}")
+    chaves = [*antes, f"{prefixo}{campo} {'DESC' if descendente else 'ASC'} NULLS LAST"]
+    return f"ORDER BY {', '.join(chaves)}"
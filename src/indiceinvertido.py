@@ -1,92 +1,513 @@
 import sqlite3
-import pandas as pd
-import pickle
-import re
-from typing import Dict, List, Set
+import heapq
+import os
+import sys
+import time
+from bisect import bisect_right
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
 from pathlib import Path
+from aliases import carregar_aliases
+from analisador import ANALISADOR_PADRAO, Analisador
+from bitmap_roaring import BitmapRoaring
+from filtro_bloom import FiltroSubstrings
+from filtros import interpretar_termo
+from snapshots import abrir_snapshot
+
+# Tokens de id/nome que indicam uma representação de outra moeda (não a canônica do símbolo)
+TOKENS_DERIVADOS = frozenset({"wrapped", "bridged", "bridge", "peg", "pegged", "staked", "restaked", "liquid"})
+
+# Faixas do histograma de tamanho das postings e limiar de termo "frequente demais"
+FAIXAS_POSTINGS = (1, 2, 5, 17, 65, 257)
+FRACAO_TERMO_FREQUENTE = 0.02
+
+# Versão 1: dict termo -> lista de ids de moeda (sem cabeçalho).
+# Versão 2: {"versao", "documentos", "postings"}: docids inteiros e postings em BitmapRoaring.
+VERSAO_INDICE = 2
+
+class IndicePostings(dict):
+    """Termo -> postings de docids; `documentos[docid]` é o id da moeda.
+    
+    Os valores ficam na forma compacta de BitmapRoaring (array solto quando cabem
+    no bloco 0), que já responde len() e iteração; `postings` devolve o bitmap
+    para a álgebra de conjuntos.
+    """
+    
+    def __init__(self, postings: Optional[Dict[str, object]] = None, documentos: Optional[List[str]] = None):
+        super().__init__(postings or {})
+        self.documentos = documentos or []
+        self._texto_chaves: Optional[Tuple[List[str], str, List[int]]] = None
+    
+    @classmethod
+    def de_listas(cls, indice: Dict[str, List[str]]) -> "IndicePostings":
+        """Converte o formato de construção (listas de ids de moeda); docids seguem a ordem alfabética dos ids."""
+        documentos = sorted({id_moeda for ids in indice.values() for id_moeda in ids})
+        docids = {id_moeda: docid for docid, id_moeda in enumerate(documentos)}
+        return cls(
+            {
+                termo: BitmapRoaring.de_inteiros(docids[id_moeda] for id_moeda in ids).compacto()
+                for termo, ids in indice.items()
+            },
+            documentos
+        )
+    
+    @classmethod
+    def de_arquivo(cls, dados) -> "IndicePostings":
+        # Índices antigos não têm cabeçalho: são convertidos na carga
+        if not isinstance(dados.get("versao"), int):
+            return cls.de_listas(dados)
+        if dados["versao"] > VERSAO_INDICE:
+            raise ValueError(f"Versão do índice não suportada: {dados['versao']} (máxima {VERSAO_INDICE})")
+        return cls(dados["postings"], dados["documentos"])
+    
+    def para_arquivo(self) -> dict:
+        return {"versao": VERSAO_INDICE, "documentos": self.documentos, "postings": dict(self)}
+    
+    def postings(self, termo: str) -> BitmapRoaring:
+        valor = self.get(termo)
+        return BitmapRoaring() if valor is None else BitmapRoaring.de_compacto(valor)
+    
+    def ids(self, docids: BitmapRoaring) -> Set[str]:
+        return set(map(self.documentos.__getitem__, docids))
+    
+    def _varrer_chaves(self, agulhas: Iterable[str], prefixo: bool = False) -> Dict[str, BitmapRoaring]:
+        """União das postings das chaves que contêm (ou começam com) cada agulha."""
+        agulhas = set(agulhas)
+        if not agulhas:
+            return {}
+        
+        # Uma única string com todas as chaves: str.find percorre em C,
+        # e bisect sobre os offsets devolve a chave de cada ocorrência.
+        if self._texto_chaves is None or len(self._texto_chaves[0]) != len(self):
+            chaves = list(self)
+            offsets = []
+            posicao = 0
+            for chave in chaves:
+                offsets.append(posicao)
+                posicao += len(chave) + 1
+            self._texto_chaves = (chaves, "\n".join(chaves), offsets)
+        chaves, texto, offsets = self._texto_chaves
+        
+        encontradas = {}
+        for agulha in agulhas:
+            casadas = set()
+            posicao = texto.find(agulha)
+            while posicao != -1:
+                numero = bisect_right(offsets, posicao) - 1
+                if not prefixo or offsets[numero] == posicao:
+                    casadas.add(numero)
+                posicao = texto.find(agulha, posicao + 1)
+            encontradas[agulha] = BitmapRoaring.uniao(self[chaves[numero]] for numero in casadas)
+        return encontradas
+    
+    def consultar(self, termos: Iterable[str], filtro_substrings: Optional[FiltroSubstrings] = None) -> Dict[str, BitmapRoaring]:
+        """Docids de cada termo com a semântica de interpretar_termo.
+        
+        Exato ('"x"' ou '=x') usa só chaves exatas; prefixo ('x*') casa chaves que
+        começam com cada token; infixo casa qualquer chave que contenha o token
+        (a própria chave exata inclusive). Os tokens se intersectam, e o termo
+        inteiro normalizado soma as chaves que o contêm ("usdc.e", apelidos).
+        """
+        planos = {}
+        agulhas = {"infixo": set(), "prefixo": set()}
+        for termo in termos:
+            modo, valor = interpretar_termo(termo)
+            inteiro = ANALISADOR_PADRAO.normalizar(valor)
+            tokens = ANALISADOR_PADRAO.tokens(valor, consulta=True)
+            planos[termo] = (modo, inteiro, tokens)
+            if modo == "exato":
+                continue
+            for agulha in {*tokens, inteiro} - {""}:
+                # Agulhas rejeitadas pelo filtro resolvem para vazio sem entrar na varredura
+                if filtro_substrings is None or filtro_substrings.pode_conter(agulha):
+                    agulhas[modo].add(agulha)
+        
+        encontradas = {
+            "infixo": self._varrer_chaves(agulhas["infixo"]),
+            "prefixo": self._varrer_chaves(agulhas["prefixo"], prefixo=True),
+        }
+        
+        def casar(modo: str, agulha: str) -> BitmapRoaring:
+            if modo == "exato":
+                return self.postings(agulha)
+            return encontradas[modo].get(agulha) or BitmapRoaring()
+        
+        resultado = {}
+        for termo, (modo, inteiro, tokens) in planos.items():
+            if modo == "exato" and inteiro in self:
+                resultado[termo] = self.postings(inteiro)
+                continue
+            
+            docids = None
+            for token in tokens:
+                docids = casar(modo, token) if docids is None else docids & casar(modo, token)
+                if not docids:
+                    break
+            docids = docids or BitmapRoaring()
+            if modo != "exato" and inteiro and tokens != [inteiro]:
+                docids = docids | casar(modo, inteiro)
+            resultado[termo] = docids
+        return resultado
+
+def carregar_postings(arquivo: str) -> IndicePostings:
+    """Lê um índice salvo em qualquer versão; erros de arquivo e de formato sobem para quem chamou."""
+    import pickle
+    
+    with open(arquivo, "rb") as f:
+        return IndicePostings.de_arquivo(pickle.load(f))
+
+def memoria_indice(indice: Dict[str, list]) -> Dict[str, int]:
+    """Bytes estimados de um índice carregado, por estrutura (ids compartilhados contados uma vez)."""
+    if isinstance(indice, IndicePostings):
+        memoria = {
+            "dicionario": sys.getsizeof(indice),
+            "chaves": sum(sys.getsizeof(termo) for termo in indice),
+            "bitmaps": sum(
+                postings.memoria() if isinstance(postings, BitmapRoaring) else sys.getsizeof(postings)
+                for postings in indice.values()
+            ),
+            "ids": sys.getsizeof(indice.documentos) + sum(sys.getsizeof(id_moeda) for id_moeda in indice.documentos),
+        }
+        memoria["total"] = sum(memoria.values())
+        return memoria
+    
+    ids_vistos = {}
+    for ids in indice.values():
+        for id_moeda in ids:
+            ids_vistos[id(id_moeda)] = id_moeda
+    
+    memoria = {
+        "dicionario": sys.getsizeof(indice),
+        "chaves": sum(sys.getsizeof(termo) for termo in indice),
+        "listas": sum(sys.getsizeof(ids) for ids in indice.values()),
+        "ids": sum(sys.getsizeof(id_moeda) for id_moeda in ids_vistos.values()),
+    }
+    memoria["total"] = sum(memoria.values())
+    return memoria
 
 class ConstrutorIndiceInvertido:
-    def __init__(self, db_path: str = "data/criptomoedas.db"):
+    def __init__(self, db_path: str = "data/criptomoedas.db", analisador: Optional[Analisador] = None,
+                 aliases: Optional[Dict[str, Tuple[str, ...]]] = None, usar_snapshot: bool = False):
         self.db_path = db_path
+        self.usar_snapshot = usar_snapshot
         self.indice = {}
-        
-        self.stopwords = {
-            'de', 'da', 'do', 'das', 'dos', 'a', 'o', 'as', 'os', 'e', 'em', 'para',
-            'com', 'por', 'um', 'uma', 'uns', 'umas', 'na', 'no', 'nas', 'nos'
-        }
+        # O mesmo analisador é usado pelos motores de busca na consulta
+        self.analisador = analisador or ANALISADOR_PADRAO
+        self.aliases = aliases
+        self.tabela_simbolos = {}
+        self.tempo_carga: Optional[float] = None
     
-    def carregar_dados(self) -> pd.DataFrame:
+    def carregar_dados(self) -> List[Tuple[str, str, str]]:
+        if self.usar_snapshot:
+            # Leitura colunar do último snapshot; sem pyarrow ou sem snapshot, volta ao SQLite
+            tabela = abrir_snapshot(colunas=["id", "nome", "simbolo"])
+            if tabela is not None:
+                return list(zip(*(tabela.column(coluna).to_pylist() for coluna in ("id", "nome", "simbolo"))))
+            print("Snapshot indisponível, lendo do banco.")
+        
         try:
             conn = sqlite3.connect(self.db_path)
-            df = pd.read_sql_query("SELECT id, nome, simbolo FROM moedas", conn)
+            linhas = conn.execute("SELECT id, nome, simbolo FROM moedas").fetchall()
             conn.close()
-            return df
+            return linhas
         except Exception as e:
             print(f"Erro ao carregar dados: {e}")
-            return pd.DataFrame()
+            return []
     
     def preprocessar_texto(self, texto: str) -> List[str]:
-        if not texto or pd.isna(texto):
-            return []
-        
-        texto_limpo = re.sub(r'[^a-zA-Z0-9\s]', ' ', texto.lower())
-        
-        tokens = texto_limpo.split()
+        return self.analisador.tokens(texto)
+    
+    def termos_documento(self, id_moeda: str, nome: str, simbolo: str) -> List[str]:
+        termos_nome = self.preprocessar_texto(nome)
+        termos_simbolo = self.preprocessar_texto(simbolo)
+        termos_id = self.preprocessar_texto(id_moeda)
         
-        tokens_filtrados = [
-            token for token in tokens 
-            if len(token) >= 1 and token not in self.stopwords and token.isalnum()
-        ]
+        if simbolo:
+            # Símbolo como digitado ("usdc.e", "eth+") para consultas exatas
+            termos_simbolo.append(self.analisador.normalizar(simbolo))
         
-        return tokens_filtrados
+        return termos_nome + termos_simbolo + termos_id
     
     def construir_indice(self) -> Dict[str, List[str]]:
-        df = self.carregar_dados()
+        linhas = self.carregar_dados()
         
-        if df.empty:
+        if not linhas:
             print("Nenhum dado encontrado.")
             return {}
         
         indice_temp = {}
         
-        print(f"Processando {len(df)} registros...")
+        print(f"Processando {len(linhas)} registros...")
         
-        for _, linha in df.iterrows():
-            termos_nome = self.preprocessar_texto(linha['nome'])
-            termos_simbolo = self.preprocessar_texto(linha['simbolo'])
-            termos_id = self.preprocessar_texto(linha['id'])
-            
-            if linha['simbolo'] and not pd.isna(linha['simbolo']):
-                termos_simbolo.append(linha['simbolo'].lower().strip())
-            
-            todos_termos = termos_nome + termos_simbolo + termos_id
-            
-            for termo in todos_termos:
+        for id_moeda, nome, simbolo in linhas:
+            for termo in self.termos_documento(id_moeda, nome, simbolo):
                 if termo not in indice_temp:
                     indice_temp[termo] = set()
-                indice_temp[termo].add(linha['id'])
+                indice_temp[termo].add(id_moeda)
         
         self.indice = {termo: list(ids) for termo, ids in indice_temp.items()}
+        self.aplicar_aliases()
         
         print(f"Índice criado com {len(self.indice)} termos únicos.")
         return self.indice
     
+    def _faixas_rowid(self, partes: int) -> List[Tuple[int, int]]:
+        conn = sqlite3.connect(self.db_path)
+        minimo, maximo = conn.execute("SELECT MIN(rowid), MAX(rowid) FROM moedas").fetchone()
+        conn.close()
+        
+        if minimo is None:
+            return []
+        
+        tamanho = max(1, -(-(maximo - minimo + 1) // partes))
+        return [(inicio, min(inicio + tamanho - 1, maximo)) for inicio in range(minimo, maximo + 1, tamanho)]
+    
+    def construir_indice_paralelo(self, processos: Optional[int] = None) -> Dict[str, List[str]]:
+        from concurrent.futures import ProcessPoolExecutor
+        from itertools import repeat
+        
+        processos = processos or os.cpu_count() or 1
+        
+        try:
+            # Mais fatias que processos para equilibrar a carga entre workers
+            faixas = self._faixas_rowid(processos * 4)
+        except sqlite3.Error as e:
+            print(f"Erro ao carregar dados: {e}")
+            return {}
+        
+        if not faixas:
+            print("Nenhum dado encontrado.")
+            return {}
+        
+        print(f"Processando {len(faixas)} faixas de rowid com {processos} processos...")
+        
+        with ProcessPoolExecutor(max_workers=processos) as executor:
+            parciais = list(executor.map(
+                _construir_indice_parcial,
+                repeat(self.db_path), repeat(self.analisador), [inicio for inicio, _ in faixas], [fim for _, fim in faixas]
+            ))
+        
+        documentos = {}
+        for _, docs_parcial in parciais:
+            documentos.update(docs_parcial)
+        
+        self.indice = {
+            termo: [documentos[docid] for docid in docids]
+            for termo, docids in _mesclar_parciais([postings for postings, _ in parciais])
+        }
+        self.aplicar_aliases()
+        
+        print(f"Índice criado com {len(self.indice)} termos únicos a partir de {len(documentos)} registros.")
+        return self.indice
+    
+    def aplicar_aliases(self) -> int:
+        """Funde as postings das moedas-alvo na chave de cada apelido; devolve quantos foram aplicados."""
+        aliases = self.aliases if self.aliases is not None else carregar_aliases()
+        alvos = {id_moeda for ids in aliases.values() for id_moeda in ids}
+        if not alvos:
+            return 0
+        
+        try:
+            conn = sqlite3.connect(self.db_path)
+            marcadores = ",".join("?" * len(alvos))
+            existentes = {
+                linha[0] for linha in conn.execute(f"SELECT id FROM moedas WHERE id IN ({marcadores})", list(alvos))
+            }
+            conn.close()
+        except sqlite3.Error as e:
+            print(f"Erro ao resolver apelidos: {e}")
+            return 0
+        
+        aplicados = 0
+        for apelido, ids in aliases.items():
+            ids = [id_moeda for id_moeda in ids if id_moeda in existentes]
+            if not ids:
+                continue
+            # Forma inteira ("wrapped eth") e forma unida como palavra composta ("wrappedeth"),
+            # as duas tentadas na consulta; unir antes evita que stopwords ("com") sumam
+            unida = "".join(self.analisador.tokens("-".join(apelido.split()), consulta=True))
+            chaves = {self.analisador.normalizar(apelido), unida}
+            for chave in chaves - {""}:
+                self.indice[chave] = list(dict.fromkeys(self.indice.get(chave, []) + ids))
+            aplicados += 1
+        
+        return aplicados
+    
+    def construir_tabela_simbolos(self) -> Dict[str, Tuple[Tuple[str, ...], Optional[float]]]:
+        """Símbolo -> (ids do canônico ao menos provável, fatia do market cap do canônico)."""
+        try:
+            conn = sqlite3.connect(self.db_path)
+            linhas = conn.execute("SELECT id, nome, simbolo, market_cap FROM moedas WHERE simbolo IS NOT NULL").fetchall()
+            conn.close()
+        except sqlite3.Error as e:
+            print(f"Erro ao carregar dados: {e}")
+            return {}
+        
+        candidatos = {}
+        for id_moeda, nome, simbolo, market_cap in linhas:
+            chave = self.analisador.normalizar(simbolo)
+            if chave:
+                candidatos.setdefault(chave, []).append((id_moeda, nome, market_cap or 0.0))
+        
+        self.tabela_simbolos = {}
+        for chave, moedas in candidatos.items():
+            moedas.sort(key=self._chave_canonica)
+            total = sum(market_cap for _, _, market_cap in moedas)
+            self.tabela_simbolos[chave] = (
+                tuple(id_moeda for id_moeda, _, _ in moedas),
+                moedas[0][2] / total if total else None,
+            )
+        
+        ambiguos = sum(1 for ids, _ in self.tabela_simbolos.values() if len(ids) > 1)
+        print(f"Tabela de símbolos com {len(self.tabela_simbolos)} símbolos ({ambiguos} compartilhados).")
+        return self.tabela_simbolos
+    
+    def _chave_canonica(self, moeda: Tuple[str, str, float]) -> Tuple[bool, float, bool, int]:
+        # Não há data de lançamento em `moedas`: derivados vão para o fim, depois
+        # market cap, depois o id que é o próprio nome ("bitcoin" para "Bitcoin").
+        id_moeda, nome, market_cap = moeda
+        tokens = set(self.analisador.tokens(f"{id_moeda} {nome or ''}"))
+        slug = "-".join(self.analisador.tokens(nome or "", consulta=True))
+        return bool(tokens & TOKENS_DERIVADOS), -market_cap, id_moeda != slug, len(id_moeda)
+    
+    def salvar_tabela_simbolos(self, arquivo: str = "data/simbolos.pkl"):
+        import pickle
+        
+        Path(arquivo).parent.mkdir(exist_ok=True)
+        
+        try:
+            with open(arquivo, "wb") as f:
+                pickle.dump(self.tabela_simbolos, f, protocol=pickle.HIGHEST_PROTOCOL)
+            print(f"Tabela de símbolos salva em: {arquivo}")
+            return True
+        except Exception as e:
+            print(f"Erro ao salvar tabela de símbolos: {e}")
+            return False
+    
+    def salvar_filtro_substrings(self, arquivo: str = "data/filtro_substrings.pkl"):
+        """Filtro de Bloom sobre os n-gramas das chaves: os motores rejeitam termos ausentes sem varrer o índice."""
+        import pickle
+        
+        # Documentos por n-grama contados aqui, uma vez, para o planejador não varrer as chaves em cada processo
+        filtro = FiltroSubstrings(self.indice, frequencias={termo: len(ids) for termo, ids in self.indice.items()})
+        Path(arquivo).parent.mkdir(exist_ok=True)
+        
+        try:
+            with open(arquivo, "wb") as f:
+                pickle.dump(filtro, f, protocol=pickle.HIGHEST_PROTOCOL)
+            print(f"Filtro de substrings ({filtro.quantidade_ngramas} n-gramas, {len(filtro.filtro.bits)} bytes) salvo em: {arquivo}")
+            return True
+        except Exception as e:
+            print(f"Erro ao salvar filtro de substrings: {e}")
+            return False
+    
+    def salvar_similaridade(self, arquivo: str = "data/similaridade.pkl"):
+        """Vetores de n-gramas e vizinhos das maiores moedas, para "moedas similares" nos motores."""
+        # NumPy/SciPy só na construção, não em todo import deste módulo
+        from similaridade import ModeloSimilaridade, carregar_moedas
+        
+        try:
+            modelo = ModeloSimilaridade.construir(carregar_moedas(self.db_path))
+        except sqlite3.Error as e:
+            print(f"Erro ao carregar dados: {e}")
+            return False
+        if modelo is None:
+            print("scipy não instalado: moedas similares indisponíveis.")
+            return False
+        
+        if modelo.salvar(arquivo):
+            print(f"Modelo de similaridade ({len(modelo.vocabulario)} n-gramas, vizinhos de "
+                  f"{len(modelo.vizinhos)} moedas) salvo em: {arquivo}")
+            return True
+        return False
+    
     def salvar_indice(self, arquivo: str = "data/indice_invertido.pkl"):
+        import pickle
+        
         Path(arquivo).parent.mkdir(exist_ok=True)
         
         try:
             with open(arquivo, "wb") as f:
-                pickle.dump(self.indice, f, protocol=pickle.HIGHEST_PROTOCOL)
-            print(f"Índice salvo em: {arquivo}")
+                pickle.dump(IndicePostings.de_listas(self.indice).para_arquivo(), f, protocol=pickle.HIGHEST_PROTOCOL)
+            print(f"Índice salvo em: {arquivo} (formato {VERSAO_INDICE})")
             return True
         except Exception as e:
             print(f"Erro ao salvar índice: {e}")
             return False
     
-    def executar(self):
+    def carregar_indice(self, arquivo: str = "data/indice_invertido.pkl") -> bool:
+        """Lê um índice já construído (para inspeção), medindo o tempo de carga."""
+        try:
+            inicio = time.perf_counter()
+            self.indice = carregar_postings(arquivo)
+            self.tempo_carga = time.perf_counter() - inicio
+            return True
+        except Exception as e:
+            print(f"Erro ao carregar índice: {e}")
+            return False
+    
+    def estatisticas(self, maiores: int = 10) -> dict:
+        """Termos, distribuição das postings, maiores termos, memória por estrutura e termos patológicos."""
+        tamanhos = sorted(len(ids) for ids in self.indice.values())
+        if isinstance(self.indice, IndicePostings):
+            documentos = len(self.indice.documentos)
+        else:
+            documentos = len({id_moeda for ids in self.indice.values() for id_moeda in ids})
+        
+        def percentil(fracao: float) -> int:
+            return tamanhos[min(len(tamanhos) - 1, int(fracao * len(tamanhos)))] if tamanhos else 0
+        
+        histograma = {}
+        for inicio, fim in zip(FAIXAS_POSTINGS, FAIXAS_POSTINGS[1:] + (None,)):
+            rotulo = f"{inicio}+" if fim is None else (str(inicio) if fim == inicio + 1 else f"{inicio}-{fim - 1}")
+            histograma[rotulo] = sum(1 for tamanho in tamanhos if tamanho >= inicio and (fim is None or tamanho < fim))
+        
+        # Termos de um caractere e termos presentes numa fração grande das moedas
+        # inflam as postings e as interseções sem ajudar a distinguir resultados
+        limite_frequente = max(2, int(documentos * FRACAO_TERMO_FREQUENTE))
+        curtos = sorted(
+            ((termo, len(ids)) for termo, ids in self.indice.items() if len(termo) == 1), key=lambda item: -item[1]
+        )
+        frequentes = heapq.nlargest(
+            maiores, ((termo, len(ids)) for termo, ids in self.indice.items() if len(ids) >= limite_frequente),
+            key=lambda item: item[1]
+        )
+        
+        return {
+            "termos": len(self.indice),
+            "documentos": documentos,
+            "postings": sum(tamanhos),
+            "postings_por_termo": {
+                "media": sum(tamanhos) / len(tamanhos) if tamanhos else 0.0,
+                "p50": percentil(0.5),
+                "p90": percentil(0.9),
+                "p99": percentil(0.99),
+                "max": tamanhos[-1] if tamanhos else 0,
+            },
+            "histograma": histograma,
+            "maiores_termos": heapq.nlargest(maiores, ((termo, len(ids)) for termo, ids in self.indice.items()),
+                                             key=lambda item: item[1]),
+            "memoria_bytes": memoria_indice(self.indice),
+            "tempo_carga_s": self.tempo_carga,
+            "patologicos": {
+                "um_caractere": curtos,
+                "postings_um_caractere": sum(tamanho for _, tamanho in curtos),
+                "frequentes": frequentes,
+                "limite_frequente": limite_frequente,
+            },
+        }
+    
+    def executar(self, paralelo: bool = False, processos: Optional[int] = None):
         print("Construindo índice invertido...")
         
-        if self.construir_indice():
+        indice = self.construir_indice_paralelo(processos) if paralelo else self.construir_indice()
+        
+        if indice:
+            if self.construir_tabela_simbolos():
+                self.salvar_tabela_simbolos()
+            
+            self.salvar_filtro_substrings()
+            self.salvar_similaridade()
+            
             if self.salvar_indice():
                 print("Processo concluído com sucesso.")
             else:
@@ -94,6 +515,88 @@ class ConstrutorIndiceInvertido:
         else:
             print("Erro ao construir o índice.")
 
+def imprimir_estatisticas(estatisticas: dict):
+    postings = estatisticas["postings_por_termo"]
+    memoria = estatisticas["memoria_bytes"]
+    patologicos = estatisticas["patologicos"]
+    
+    print(f"Termos: {estatisticas['termos']}  Moedas: {estatisticas['documentos']}  Postings: {estatisticas['postings']}")
+    print(f"Postings por termo: média {postings['media']:.2f}, p50 {postings['p50']}, p90 {postings['p90']}, "
+          f"p99 {postings['p99']}, máx {postings['max']}")
+    print("Histograma (moedas por termo: termos):")
+    for faixa, quantidade in estatisticas["histograma"].items():
+        print(f"  {faixa:>7}: {quantidade}")
+    print("Maiores termos:")
+    for termo, tamanho in estatisticas["maiores_termos"]:
+        print(f"  {termo:<20} {tamanho}")
+    print("Memória estimada (MiB): " + ", ".join(
+        f"{estrutura} {tamanho / 2**20:.2f}" for estrutura, tamanho in memoria.items()
+    ))
+    if estatisticas["tempo_carga_s"] is not None:
+        print(f"Tempo de carga: {estatisticas['tempo_carga_s'] * 1000:.0f} ms")
+    print(f"Termos de um caractere: {len(patologicos['um_caractere'])} "
+          f"({patologicos['postings_um_caractere']} postings): "
+          + ", ".join(f"{termo}={tamanho}" for termo, tamanho in patologicos["um_caractere"][:20]))
+    print(f"Termos em {patologicos['limite_frequente']}+ moedas: "
+          + ", ".join(f"{termo}={tamanho}" for termo, tamanho in patologicos["frequentes"]))
+
+def _construir_indice_parcial(db_path: str, analisador: Analisador, inicio: int, fim: int):
+    # Executado em um processo separado: índice parcial sobre docids inteiros (rowid)
+    construtor = ConstrutorIndiceInvertido(db_path, analisador)
+    conn = sqlite3.connect(db_path)
+    linhas = conn.execute(
+        "SELECT rowid, id, nome, simbolo FROM moedas WHERE rowid BETWEEN ? AND ?", (inicio, fim)
+    ).fetchall()
+    conn.close()
+    
+    parcial = {}
+    documentos = {}
+    for docid, id_moeda, nome, simbolo in linhas:
+        documentos[docid] = id_moeda
+        for termo in construtor.termos_documento(id_moeda, nome, simbolo):
+            parcial.setdefault(termo, set()).add(docid)
+    
+    postings = sorted((termo, sorted(docids)) for termo, docids in parcial.items())
+    return postings, documentos
+
+def _mesclar_parciais(parciais: List[List[Tuple[str, List[int]]]]) -> Iterator[Tuple[str, List[int]]]:
+    # Merge k-way: cada parcial está ordenado por termo e as faixas de rowid
+    # são disjuntas e crescentes, então concatenar mantém os docids ordenados.
+    termo_atual = None
+    docids_atuais = []
+    
+    for termo, docids in heapq.merge(*parciais, key=lambda item: item[0]):
+        if termo != termo_atual:
+            if termo_atual is not None:
+                yield termo_atual, docids_atuais
+            termo_atual = termo
+            docids_atuais = []
+        docids_atuais.extend(docids)
+    
+    if termo_atual is not None:
+        yield termo_atual, docids_atuais
+
 if __name__ == "__main__":
-    construtor = ConstrutorIndiceInvertido()
-    construtor.executar()
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Constrói o índice invertido das criptomoedas")
+    parser.add_argument("--paralelo", action="store_true", help="Constrói o índice em fatias por rowid num pool de processos")
+    parser.add_argument("--processos", type=int, help="Número de processos (padrão: núcleos disponíveis)")
+    parser.add_argument("--ngramas-borda", type=int, nargs=2, metavar=("MIN", "MAX"),
+                        help="Indexa também prefixos de MIN a MAX caracteres (busca por prefixo sem varredura)")
+    parser.add_argument("--snapshot", action="store_true", help="Lê as moedas do último snapshot colunar (data/snapshots)")
+    parser.add_argument("--estatisticas", nargs="?", const="data/indice_invertido.pkl", metavar="ARQUIVO",
+                        help="Só inspeciona um índice já construído (padrão: data/indice_invertido.pkl)")
+    parser.add_argument("--maiores", type=int, default=10, help="Quantos maiores termos listar nas estatísticas")
+    args = parser.parse_args()
+    
+    if args.estatisticas:
+        construtor = ConstrutorIndiceInvertido()
+        carregado = construtor.carregar_indice(args.estatisticas)
+        if carregado:
+            imprimir_estatisticas(construtor.estatisticas(args.maiores))
+        raise SystemExit(0 if carregado else 1)
+    
+    analisador = Analisador(ngramas_borda=tuple(args.ngramas_borda)) if args.ngramas_borda else None
+    construtor = ConstrutorIndiceInvertido(analisador=analisador, usar_snapshot=args.snapshot)
+    construtor.executar(paralelo=args.paralelo, processos=args.processos)
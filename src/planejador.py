@@ -0,0 +1,165 @@
+import logging
+import sqlite3
+from bisect import bisect_left
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+from analisador import ANALISADOR_PADRAO
+from filtros import interpretar_termo
+
+logger = logging.getLogger(__name__)
+
+# Custos em microssegundos, medidos no banco de ~15 mil moedas (SQLite 3.40, um núcleo)
+CUSTO_SEEK = 20.0             # descida numa B-tree (PRIMARY KEY ou índice de expressão)
+CUSTO_LINHA_BUSCADA = 5.5     # ler uma linha pelo id (WHERE id IN (...))
+CUSTO_LINHA_VARRIDA = 0.35    # percorrer uma linha na varredura completa
+CUSTO_LIKE = 0.35             # cada LIKE '%...%' avaliado por linha varrida
+CUSTO_POSTING = 0.05          # copiar/intersectar um id de posting em Python
+CUSTO_CHAVE_VARRIDA = 0.065   # testar uma chave do índice na busca por substring
+
+CAMPOS_VARREDURA = 3          # id, nome e símbolo na busca sem campo
+INDICES_SEEK = {"nome": "idx_moedas_nome_lower", "simbolo": "idx_moedas_simbolo_lower"}
+# Sem contagens de n-gramas no filtro (arquivo antigo ou ausente): fração das chaves que um infixo alcança
+SELETIVIDADE_SUBSTRING = 0.01
+
+def estatisticas_banco(db_path: str) -> Tuple[int, FrozenSet[str]]:
+    """Total de moedas e nomes dos índices existentes, para custear varredura e seek."""
+    try:
+        conn = sqlite3.connect(db_path)
+        try:
+            total = conn.execute("SELECT count(*) FROM moedas").fetchone()[0]
+            indices = frozenset(nome for (nome,) in conn.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'moedas'"
+            ))
+        finally:
+            conn.close()
+    except sqlite3.Error:
+        return 0, frozenset()
+    return total, indices
+
+class Planejador:
+    """Escolhe a estratégia mais barata por consulta a partir das estatísticas do índice.
+    
+    Estratégias: vazio (filtro de Bloom ou tabela de símbolos descarta), simbolo
+    (tabela de tickers), seek (PRIMARY KEY / índice lower()), postings (chaves
+    exatas), ngramas (prefixo/substring nas chaves) e varredura (LIKE na tabela
+    inteira). As alternativas de um plano devolvem sempre os mesmos ids; a
+    varredura só aparece quando não há índice, porque o LIKE não conhece
+    apelidos nem palavras compostas.
+    """
+    
+    def __init__(self, indice: Dict[str, list], filtro_substrings=None, tabela_simbolos: Optional[dict] = None,
+                 total_documentos: int = 0, indices_banco: FrozenSet[str] = frozenset()):
+        self.indice = indice
+        self.filtro_substrings = filtro_substrings
+        self.tabela_simbolos = tabela_simbolos or {}
+        self.total_documentos = total_documentos
+        self.indices_banco = indices_banco
+        self._chaves_ordenadas: Optional[List[str]] = None
+    
+    def frequencia(self, termo: str) -> int:
+        return len(self.indice.get(termo, ()))
+    
+    def estimar_substring(self, token: str) -> int:
+        """Documentos que podem conter o token: contagens do filtro, calculadas na construção do índice."""
+        estimativa = None
+        if self.filtro_substrings is not None:
+            estimativa = self.filtro_substrings.estimar_documentos(token)
+        if estimativa is None:
+            estimativa = max(1, round(len(self.indice) * SELETIVIDADE_SUBSTRING))
+        return min(estimativa, self.total_documentos or estimativa)
+    
+    def _estimar_prefixo(self, prefixo: str) -> int:
+        if self._chaves_ordenadas is None:
+            self._chaves_ordenadas = sorted(self.indice)
+        chaves = self._chaves_ordenadas
+        inicio = bisect_left(chaves, prefixo)
+        fim = bisect_left(chaves, prefixo[:-1] + chr(ord(prefixo[-1]) + 1)) if prefixo else len(chaves)
+        return max(1, fim - inicio)
+    
+    def _custo_varredura(self, colunas: int, tokens: int) -> float:
+        return self.total_documentos * (CUSTO_LINHA_VARRIDA + CUSTO_LIKE * colunas * max(1, tokens))
+    
+    def _candidatos_indice(self, modo: str, valor: str) -> Dict[str, Tuple[float, int]]:
+        """Alternativas (custo, linhas estimadas) pelo índice invertido, com a semântica de IndicePostings.consultar."""
+        inteiro = ANALISADOR_PADRAO.normalizar(valor)
+        tokens = ANALISADOR_PADRAO.tokens(valor, consulta=True)
+        
+        if modo == "exato":
+            if inteiro in self.indice:
+                linhas = self.frequencia(inteiro)
+            else:
+                linhas = min((self.frequencia(token) for token in tokens), default=0)
+            custo = (len(tokens) or 1) * linhas * CUSTO_POSTING + linhas * CUSTO_LINHA_BUSCADA
+            alternativas = {"postings": (custo, linhas)}
+            if not linhas:
+                alternativas["vazio"] = (0.0, 0)
+            return alternativas
+        
+        def possivel(agulha: str) -> bool:
+            return self.filtro_substrings is None or self.filtro_substrings.pode_conter(agulha)
+        
+        def estimar(agulha: str) -> int:
+            return self._estimar_prefixo(agulha) if modo == "prefixo" else self.estimar_substring(agulha)
+        
+        # Tokens intersectados, mais as chaves que contêm o termo inteiro
+        agulhas = []
+        linhas = 0
+        if tokens and all(possivel(token) for token in tokens):
+            agulhas.extend(tokens)
+            linhas = min(estimar(token) for token in tokens)
+        if inteiro and tokens != [inteiro] and possivel(inteiro):
+            agulhas.append(inteiro)
+            linhas += estimar(inteiro)
+        
+        # A varredura das chaves acontece mesmo quando o token também é chave exata
+        custo = len(set(agulhas)) * len(self.indice) * CUSTO_CHAVE_VARRIDA
+        custo += linhas * (CUSTO_POSTING * max(1, len(agulhas)) + CUSTO_LINHA_BUSCADA)
+        alternativas = {"ngramas": (custo, linhas)}
+        if not agulhas:
+            alternativas["vazio"] = (0.0, 0)
+        return alternativas
+    
+    def planejar(self, termo: str, campo: Optional[str] = None) -> dict:
+        """Plano da consulta; `campo` None é a busca geral (id, nome e símbolo ao mesmo tempo)."""
+        modo, valor = interpretar_termo(termo)
+        alternativas: Dict[str, Tuple[float, int]] = {}
+        
+        if campo is not None and modo != "infixo":
+            # Exato/prefixo têm semântica de campo; no exato de símbolo a tabela
+            # normalizada ("$nut" -> "nut") é a referência quando foi carregada
+            if modo == "exato" and campo == "simbolo" and self.tabela_simbolos:
+                entrada = self.tabela_simbolos.get(ANALISADOR_PADRAO.normalizar(valor))
+                linhas = len(entrada[0]) if entrada is not None else 0
+                alternativas["simbolo"] = (linhas * CUSTO_LINHA_BUSCADA, linhas)
+                if entrada is None:
+                    alternativas["vazio"] = (0.0, 0)
+            else:
+                linhas = self._estimar_prefixo(valor) if modo == "prefixo" else 1
+                # Seek e varredura são o mesmo SQL: o SQLite usa o índice se ele existir
+                if campo == "id" or INDICES_SEEK.get(campo) in self.indices_banco:
+                    alternativas["seek"] = (CUSTO_SEEK + linhas * CUSTO_LINHA_BUSCADA, linhas)
+                else:
+                    alternativas["varredura"] = (self._custo_varredura(1, 1), linhas)
+        elif self.indice:
+            alternativas.update(self._candidatos_indice(modo, valor))
+        else:
+            tokens = len(ANALISADOR_PADRAO.tokens(termo, consulta=True)) if campo is None else 1
+            colunas = CAMPOS_VARREDURA if campo is None else 1
+            alternativas["varredura"] = (self._custo_varredura(colunas, tokens), 0)
+        
+        # Empate de custo: o vazio dispensa até a consulta ao dict
+        estrategia = min(alternativas, key=lambda nome: (alternativas[nome][0], nome != "vazio"))
+        custo, linhas = alternativas[estrategia]
+        plano = {
+            "termo": termo,
+            "campo": campo,
+            "estrategia": estrategia,
+            "custo": custo,
+            "linhas_estimadas": linhas,
+            "alternativas": {nome: round(valores[0], 1) for nome, valores in alternativas.items()},
+        }
+        logger.info(
+            "plano %s para %r (campo=%s): custo≈%.0fµs, linhas≈%d, alternativas=%s",
+            estrategia, termo, campo or "*", custo, linhas, plano["alternativas"]
+        )
+        return plano
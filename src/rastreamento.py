@@ -0,0 +1,174 @@
+import json
+import logging
+import os
+import random
+import threading
+import time
+import uuid
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Dict, Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import cProfile
+
+logger = logging.getLogger(__name__)
+
+ARQUIVO_CONSULTAS_LENTAS = "data/consultas_lentas.jsonl"
+DIRETORIO_PERFIS = "data/perfis"
+# Perfis mais antigos são apagados além deste número
+MAXIMO_PERFIS = 50
+
+# Rastro da consulta em andamento nesta thread/tarefa; as etapas se penduram nele
+_rastro_atual: ContextVar[Optional["Rastro"]] = ContextVar("rastro_atual", default=None)
+_SEM_RASTRO = nullcontext()
+
+class Rastro:
+    """Uma consulta rastreada: id, atributos e milissegundos acumulados por etapa."""
+    
+    def __init__(self, operacao: str, atributos: dict):
+        self.id = uuid.uuid4().hex[:16]
+        self.operacao = operacao
+        self.atributos = atributos
+        self.etapas: Dict[str, float] = {}
+        self.inicio = time.perf_counter()
+        self.duracao_ms: Optional[float] = None
+        self.perfil: Optional[str] = None
+    
+    @contextmanager
+    def etapa(self, nome: str):
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            # Etapas repetidas (um lookup por token) somam no mesmo nome
+            self.etapas[nome] = self.etapas.get(nome, 0.0) + (time.perf_counter() - inicio) * 1000
+    
+    def registro(self) -> dict:
+        return {
+            "trace_id": self.id,
+            "operacao": self.operacao,
+            **self.atributos,
+            "duracao_ms": round(self.duracao_ms or 0.0, 3),
+            "etapas_ms": {nome: round(duracao, 3) for nome, duracao in self.etapas.items()},
+            **({"perfil": self.perfil} if self.perfil else {}),
+        }
+
+def etapa(nome: str):
+    """Mede uma etapa da consulta rastreada em andamento; sem rastro ativo não faz nada."""
+    rastro = _rastro_atual.get()
+    return _SEM_RASTRO if rastro is None else rastro.etapa(nome)
+
+class Rastreador:
+    """Rastreamento opt-in de consultas: amostragem, log de consultas lentas e cProfile sob demanda.
+    
+    Desligado (taxa 0, sem limite e sem perfil pendente), `consulta` devolve um
+    contexto nulo compartilhado e `etapa` custa uma leitura de ContextVar.
+    `depuracao` libera o pedido de perfis pela API web.
+    """
+    
+    def __init__(self, taxa_amostragem: float = 0.0, limite_lento_ms: Optional[float] = None,
+                 arquivo_lentas: str = ARQUIVO_CONSULTAS_LENTAS, diretorio_perfis: str = DIRETORIO_PERFIS,
+                 depuracao: bool = False, maximo_perfis: int = MAXIMO_PERFIS):
+        self.taxa_amostragem = taxa_amostragem
+        self.limite_lento_ms = limite_lento_ms
+        self.arquivo_lentas = arquivo_lentas
+        self.diretorio_perfis = diretorio_perfis
+        self.depuracao = depuracao
+        self.maximo_perfis = maximo_perfis
+        self._perfis_pendentes = 0
+        self._lock = threading.Lock()
+    
+    @classmethod
+    def do_ambiente(cls) -> "Rastreador":
+        """Configuração por variáveis de ambiente, para ligar o rastreamento sem mudar código."""
+        limite = os.environ.get("CRYPTOFINDER_SLOW_QUERY_MS")
+        return cls(
+            float(os.environ.get("CRYPTOFINDER_TRACE_SAMPLE") or 0.0),
+            float(limite) if limite else None,
+            os.environ.get("CRYPTOFINDER_SLOW_QUERY_LOG", ARQUIVO_CONSULTAS_LENTAS),
+            os.environ.get("CRYPTOFINDER_PROFILE_DIR", DIRETORIO_PERFIS),
+            os.environ.get("CRYPTOFINDER_DEBUG", "") not in ("", "0"),
+            int(os.environ.get("CRYPTOFINDER_MAX_PROFILES") or MAXIMO_PERFIS),
+        )
+    
+    @property
+    def ativo(self) -> bool:
+        return self.taxa_amostragem > 0 or self.limite_lento_ms is not None or self._perfis_pendentes > 0
+    
+    def perfilar_proxima(self, quantidade: int = 1) -> int:
+        """Captura um perfil cProfile das próximas `quantidade` consultas; devolve quantas estão pendentes."""
+        with self._lock:
+            # Nunca mais pendentes do que os arquivos mantidos em disco
+            self._perfis_pendentes = min(self._perfis_pendentes + quantidade, self.maximo_perfis)
+            return self._perfis_pendentes
+    
+    def _reservar_perfil(self) -> bool:
+        with self._lock:
+            if self._perfis_pendentes <= 0:
+                return False
+            self._perfis_pendentes -= 1
+            return True
+    
+    def consulta(self, operacao: str, **atributos):
+        """Contexto de uma consulta; dentro de outra já rastreada, as etapas vão para o rastro externo."""
+        if not self.ativo or _rastro_atual.get() is not None:
+            return _SEM_RASTRO
+        return self._rastrear(operacao, atributos)
+    
+    @contextmanager
+    def _rastrear(self, operacao: str, atributos: dict):
+        amostrado = self.taxa_amostragem > 0 and random.random() < self.taxa_amostragem
+        perfilar = self._perfis_pendentes > 0 and self._reservar_perfil()
+        if not (amostrado or perfilar or self.limite_lento_ms is not None):
+            yield None
+            return
+        
+        rastro = Rastro(operacao, atributos)
+        token = _rastro_atual.set(rastro)
+        perfilador = None
+        if perfilar:
+            import cProfile
+            
+            perfilador = cProfile.Profile()
+            perfilador.enable()
+        try:
+            yield rastro
+        finally:
+            if perfilador is not None:
+                perfilador.disable()
+            rastro.duracao_ms = (time.perf_counter() - rastro.inicio) * 1000
+            _rastro_atual.reset(token)
+            self._concluir(rastro, amostrado, perfilador)
+    
+    def _descartar_perfis_antigos(self):
+        with self._lock:
+            perfis = sorted(Path(self.diretorio_perfis).glob("*.prof"), key=lambda caminho: caminho.stat().st_mtime)
+            for caminho in perfis[:max(0, len(perfis) - self.maximo_perfis)]:
+                caminho.unlink(missing_ok=True)
+    
+    def _concluir(self, rastro: Rastro, amostrado: bool, perfilador: Optional["cProfile.Profile"]):
+        if perfilador is not None:
+            # Formato pstats: snakeviz/flameprof/gprof2dot geram o flamegraph a partir dele
+            caminho = Path(self.diretorio_perfis) / f"{rastro.id}.prof"
+            try:
+                caminho.parent.mkdir(parents=True, exist_ok=True)
+                perfilador.dump_stats(str(caminho))
+                rastro.perfil = str(caminho)
+                self._descartar_perfis_antigos()
+            except OSError as e:
+                logger.warning("perfil de %s não gravado: %s", rastro.id, e)
+        
+        registro = rastro.registro()
+        if amostrado or rastro.perfil:
+            logger.info("rastro %s", json.dumps(registro, ensure_ascii=False))
+        
+        if self.limite_lento_ms is not None and rastro.duracao_ms >= self.limite_lento_ms:
+            logger.warning("consulta lenta %s: %.1f ms", rastro.id, rastro.duracao_ms)
+            try:
+                Path(self.arquivo_lentas).parent.mkdir(parents=True, exist_ok=True)
+                with self._lock, open(self.arquivo_lentas, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(registro, ensure_ascii=False) + "\n")
+            except OSError as e:
+                logger.warning("log de consultas lentas indisponível: %s", e)
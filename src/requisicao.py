@@ -2,30 +2,160 @@ import requests
 import sqlite3
 from datetime import datetime
 import time
+import hashlib
 import os
+import re
 from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+from alertas import MotorAlertas, imprimir_disparo
+from sentimento import criar_tabelas_sentimento
+from snapshots import exportar_snapshot
+
+URL_MERCADOS = 'https://api.coingecko.com/api/v3/coins/markets'
+URL_MOEDA = 'https://api.coingecko.com/api/v3/coins/{id}'
+RETENCAO_ALTERACOES = 100000
+
+# Camadas de atualização por posição no ranking (páginas de 250 moedas):
+# (primeira página, última página ou None, intervalo mínimo em segundos)
+CAMADAS_ATUALIZACAO = (
+    (1, 4, 5 * 60),
+    (5, 20, 60 * 60),
+    (21, None, 24 * 60 * 60),
+)
+
+# Campos gravados de cada moeda; o hash deles decide se a linha precisa ser regravada
+CAMPOS_HASH = (
+    'id', 'name', 'symbol', 'current_price', 'price_change_percentage_24h', 'market_cap',
+    'market_cap_rank', 'circulating_supply', 'total_supply', 'max_supply', 'total_volume', 'ath', 'ath_date'
+)
 
 class ColetorDadosCripto:
-    def __init__(self, db_path: str = "data/criptomoedas.db"):
+    def __init__(self, db_path: str = "data/criptomoedas.db", moedas_fiat: Sequence[str] = ("usd",),
+                 intervalo_requisicoes: float = 3.0, formato_snapshot: Optional[str] = "arrow"):
         self.db_path = db_path
+        # Arquivo do formato antigo de progresso, importado uma única vez
         self.arquivo_progresso = "data/ultima_pagina.txt"
         self.conn = None
+        # USD sempre vem primeiro: alimenta as colunas quentes de `moedas`
+        # e é a única resposta de onde os campos estáticos são lidos.
+        self.moedas_fiat = ["usd"] + [m.lower() for m in moedas_fiat if m.lower() != "usd"]
+        self.intervalo_requisicoes = intervalo_requisicoes
+        # Snapshot colunar de `moedas` ao fim de cada ciclo completo (None desativa)
+        self.formato_snapshot = formato_snapshot
+        self._ultima_requisicao = 0.0
+        self.ouvintes: List[Callable[[List[tuple]], None]] = []
         
         Path(self.db_path).parent.mkdir(exist_ok=True)
     
+    def registrar_ouvinte(self, callback: Callable[[List[tuple]], None]):
+        # Chamado após cada commit com as linhas (id, preco_usd, variacao_24h,
+        # market_cap, ultima_atualizacao) gravadas naquele lote
+        self.ouvintes.append(callback)
+    
+    def ciclo_atual(self) -> int:
+        linha = self.conn.execute("SELECT valor FROM metadados_coleta WHERE chave = 'ciclo'").fetchone()
+        return int(linha[0]) if linha else 1
+    
+    def _importar_progresso_legado(self):
+        if not os.path.exists(self.arquivo_progresso):
+            return
+        
+        try:
+            with open(self.arquivo_progresso, 'r') as f:
+                proxima_pagina = int(f.read().strip())
+        except (ValueError, FileNotFoundError):
+            return
+        
+        ciclo = self.ciclo_atual()
+        agora = datetime.utcnow().isoformat()
+        with self.conn:
+            self.conn.executemany('''
+                INSERT OR IGNORE INTO estado_coleta (pagina, moeda_fiat, status, ciclo, atualizado_em)
+                VALUES (?, ?, 'concluida', ?, ?)
+            ''', [(pagina, moeda_fiat, ciclo, agora)
+                  for pagina in range(1, proxima_pagina) for moeda_fiat in self.moedas_fiat])
+        os.remove(self.arquivo_progresso)
+    
     def carregar_pagina_inicial(self) -> int:
-        if os.path.exists(self.arquivo_progresso):
-            try:
-                with open(self.arquivo_progresso, 'r') as f:
-                    return int(f.read().strip())
-            except (ValueError, FileNotFoundError):
-                pass
-        return 1
+        self._importar_progresso_legado()
+        
+        # Primeira página do ciclo atual que ainda não foi concluída em todas as moedas fiat
+        concluidas = {linha[0] for linha in self.conn.execute('''
+            SELECT pagina FROM estado_coleta
+            WHERE ciclo = ? AND status = 'concluida'
+            GROUP BY pagina HAVING COUNT(*) >= ?
+        ''', (self.ciclo_atual(), len(self.moedas_fiat)))}
+        
+        pagina = 1
+        while pagina in concluidas:
+            pagina += 1
+        return pagina
+    
+    def estado_pagina(self, pagina: int, moeda_fiat: str) -> Tuple[Optional[str], Optional[str]]:
+        linha = self.conn.execute(
+            "SELECT etag, hash_conteudo FROM estado_coleta WHERE pagina = ? AND moeda_fiat = ?",
+            (pagina, moeda_fiat)
+        ).fetchone()
+        return linha if linha else (None, None)
+    
+    def ultima_pagina(self) -> Optional[int]:
+        linha = self.conn.execute("SELECT valor FROM metadados_coleta WHERE chave = 'ultima_pagina'").fetchone()
+        return int(linha[0]) if linha else None
+    
+    def _gravar_ultima_pagina(self, ultima_pagina: int):
+        with self.conn:
+            self.conn.execute('''
+                INSERT INTO metadados_coleta (chave, valor) VALUES ('ultima_pagina', ?)
+                ON CONFLICT(chave) DO UPDATE SET valor = excluded.valor
+            ''', (str(ultima_pagina),))
+    
+    def intervalo_camada(self, pagina: int) -> int:
+        for primeira, ultima, intervalo in CAMADAS_ATUALIZACAO:
+            if pagina >= primeira and (ultima is None or pagina <= ultima):
+                return intervalo
+        return CAMADAS_ATUALIZACAO[-1][2]
+    
+    def _esperas_paginas(self, agora: datetime) -> Dict[int, float]:
+        """Segundos até cada página conhecida vencer; zero ou negativo é página vencida."""
+        ultima_pagina = self.ultima_pagina() or 0
+        
+        # Uma página só conta como atualizada quando todas as moedas fiat foram coletadas
+        atualizadas = dict(self.conn.execute('''
+            SELECT pagina, MIN(atualizado_em) FROM estado_coleta
+            WHERE moeda_fiat IN ({}) GROUP BY pagina HAVING COUNT(*) >= ?
+        '''.format(','.join('?' * len(self.moedas_fiat))), (*self.moedas_fiat, len(self.moedas_fiat))))
+        
+        esperas = {}
+        for pagina in range(1, ultima_pagina + 1):
+            atualizado_em = atualizadas.get(pagina)
+            if atualizado_em is None:
+                esperas[pagina] = 0.0
+            else:
+                idade = (agora - datetime.fromisoformat(atualizado_em)).total_seconds()
+                esperas[pagina] = self.intervalo_camada(pagina) - idade
+        return esperas
     
-    def salvar_progresso(self, pagina: int):
-        Path(self.arquivo_progresso).parent.mkdir(exist_ok=True)
-        with open(self.arquivo_progresso, 'w') as f:
-            f.write(str(pagina))
+    def paginas_vencidas(self, agora: Optional[datetime] = None) -> List[int]:
+        """Páginas conhecidas cujo intervalo da camada já passou, das camadas mais quentes para as mais frias."""
+        esperas = self._esperas_paginas(agora or datetime.utcnow())
+        vencidas = [pagina for pagina, espera in esperas.items() if espera <= 0]
+        return sorted(vencidas, key=lambda pagina: (self.intervalo_camada(pagina), pagina))
+    
+    def segundos_ate_proxima(self, agora: Optional[datetime] = None) -> float:
+        """Mesma regra de paginas_vencidas: zero quando alguma página já venceu."""
+        esperas = self._esperas_paginas(agora or datetime.utcnow())
+        return max(0.0, min(esperas.values())) if esperas else 0.0
+    
+    def finalizar_ciclo(self, ultima_pagina: int):
+        with self.conn:
+            self.conn.execute('''
+                INSERT INTO metadados_coleta (chave, valor) VALUES ('ciclo', ?)
+                ON CONFLICT(chave) DO UPDATE SET valor = excluded.valor
+            ''', (str(self.ciclo_atual() + 1),))
+            self.conn.execute('''
+                INSERT INTO metadados_coleta (chave, valor) VALUES ('ultima_pagina', ?)
+                ON CONFLICT(chave) DO UPDATE SET valor = excluded.valor
+            ''', (str(ultima_pagina),))
     
     def inicializar_banco(self):
         try:
@@ -43,6 +173,110 @@ class ColetorDadosCripto:
                     ultima_atualizacao TEXT
                 )
             ''')
+            
+            # Índices ordenados para filtros por faixa e ordenação nas buscas
+            for coluna in ("preco_usd", "variacao_24h", "market_cap"):
+                cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_moedas_{coluna} ON moedas ({coluna})")
+            
+            # Índices de expressão para buscas exatas e por prefixo sem diferenciar maiúsculas
+            # (o id já é a PRIMARY KEY e vem sempre em minúsculas da CoinGecko)
+            for coluna in ("nome", "simbolo"):
+                cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_moedas_{coluna}_lower ON moedas (lower({coluna}))")
+            
+            # Dados por moeda fiduciária e campos de mercado ficam fora de
+            # `moedas` para manter compactas as colunas lidas pela busca.
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS cotacoes (
+                    id TEXT NOT NULL,
+                    moeda_fiat TEXT NOT NULL,
+                    preco REAL,
+                    variacao_24h REAL,
+                    market_cap REAL,
+                    volume_24h REAL,
+                    maxima_historica REAL,
+                    data_maxima_historica TEXT,
+                    ultima_atualizacao TEXT,
+                    PRIMARY KEY (id, moeda_fiat)
+                ) WITHOUT ROWID
+            ''')
+            
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS dados_mercado (
+                    id TEXT PRIMARY KEY,
+                    rank_market_cap INTEGER,
+                    supply_circulante REAL,
+                    supply_total REAL,
+                    supply_maximo REAL,
+                    ultima_atualizacao TEXT
+                ) WITHOUT ROWID
+            ''')
+            
+            # Estado da coleta gravado na mesma transação dos dados de cada página
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS estado_coleta (
+                    pagina INTEGER NOT NULL,
+                    moeda_fiat TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    etag TEXT,
+                    hash_conteudo TEXT,
+                    ciclo INTEGER NOT NULL,
+                    atualizado_em TEXT,
+                    PRIMARY KEY (pagina, moeda_fiat)
+                ) WITHOUT ROWID
+            ''')
+            
+            # Feed de alterações lido pelo app para atualizar cards já abertos
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS alteracoes_moedas (
+                    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                    id TEXT NOT NULL,
+                    preco_usd REAL,
+                    variacao_24h REAL,
+                    market_cap REAL,
+                    ultima_atualizacao TEXT
+                )
+            ''')
+            
+            cursor.execute('''
+                CREATE TRIGGER IF NOT EXISTS moedas_alteracao_insert AFTER INSERT ON moedas
+                BEGIN
+                    INSERT INTO alteracoes_moedas (id, preco_usd, variacao_24h, market_cap, ultima_atualizacao)
+                    VALUES (new.id, new.preco_usd, new.variacao_24h, new.market_cap, new.ultima_atualizacao);
+                END
+            ''')
+            
+            # Recriado para bancos com a versão sem WHEN: só registra quando um valor muda de fato
+            cursor.execute("DROP TRIGGER IF EXISTS moedas_alteracao_update")
+            cursor.execute('''
+                CREATE TRIGGER moedas_alteracao_update
+                AFTER UPDATE OF preco_usd, variacao_24h, market_cap ON moedas
+                WHEN old.preco_usd IS NOT new.preco_usd
+                  OR old.variacao_24h IS NOT new.variacao_24h
+                  OR old.market_cap IS NOT new.market_cap
+                BEGIN
+                    INSERT INTO alteracoes_moedas (id, preco_usd, variacao_24h, market_cap, ultima_atualizacao)
+                    VALUES (new.id, new.preco_usd, new.variacao_24h, new.market_cap, new.ultima_atualizacao);
+                END
+            ''')
+            
+            # Hash do conteúdo de cada moeda por moeda fiat: linhas iguais não são regravadas
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS hashes_conteudo (
+                    id TEXT NOT NULL,
+                    moeda_fiat TEXT NOT NULL,
+                    hash INTEGER NOT NULL,
+                    PRIMARY KEY (id, moeda_fiat)
+                ) WITHOUT ROWID
+            ''')
+            
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS metadados_coleta (
+                    chave TEXT PRIMARY KEY,
+                    valor TEXT
+                ) WITHOUT ROWID
+            ''')
+            
+            criar_tabelas_sentimento(self.conn)
             self.conn.commit()
             return True
         except sqlite3.Error as e:
@@ -60,70 +294,226 @@ class ColetorDadosCripto:
             datetime.utcnow().isoformat()
         )
     
-    def coletar_dados(self):
-        if not self.inicializar_banco():
-            return
+    def processar_cotacao(self, moeda_data: dict, moeda_fiat: str, timestamp: str) -> tuple:
+        return (
+            moeda_data.get('id'),
+            moeda_fiat,
+            moeda_data.get('current_price'),
+            moeda_data.get('price_change_percentage_24h'),
+            moeda_data.get('market_cap'),
+            moeda_data.get('total_volume'),
+            moeda_data.get('ath'),
+            moeda_data.get('ath_date'),
+            timestamp
+        )
+    
+    def processar_dados_mercado(self, moeda_data: dict, timestamp: str) -> tuple:
+        return (
+            moeda_data.get('id'),
+            moeda_data.get('market_cap_rank'),
+            moeda_data.get('circulating_supply'),
+            moeda_data.get('total_supply'),
+            moeda_data.get('max_supply'),
+            timestamp
+        )
+    
+    def hash_moeda(self, moeda_data: dict) -> int:
+        conteudo = repr(tuple(moeda_data.get(campo) for campo in CAMPOS_HASH)).encode()
+        return int.from_bytes(hashlib.blake2b(conteudo, digest_size=8).digest(), "big", signed=True)
+    
+    def _moedas_alteradas(self, moedas: List[dict], moeda_fiat: str) -> List[Tuple[dict, int]]:
+        moedas = [moeda for moeda in moedas if moeda.get('id')]
+        if not moedas:
+            return []
         
-        pagina = self.carregar_pagina_inicial()
-        total_inseridas = 0
+        # A junção com cotacoes garante que uma linha apagada seja regravada mesmo com hash igual
+        anteriores = dict(self.conn.execute('''
+            SELECT h.id, h.hash FROM hashes_conteudo h
+            JOIN cotacoes c ON c.id = h.id AND c.moeda_fiat = h.moeda_fiat
+            WHERE h.moeda_fiat = ? AND h.id IN ({})
+        '''.format(','.join('?' * len(moedas))), (moeda_fiat, *(moeda['id'] for moeda in moedas))))
         
-        print("Iniciando coleta de dados da CoinGecko...")
-        print(f"Começando da página {pagina}")
+        alteradas = []
+        for moeda in moedas:
+            hash_atual = self.hash_moeda(moeda)
+            if anteriores.get(moeda['id']) != hash_atual:
+                alteradas.append((moeda, hash_atual))
+        return alteradas
+    
+    def _requisitar(self, params: dict, headers: Optional[dict] = None, url: str = URL_MERCADOS) -> requests.Response:
+        # Orçamento de requisições compartilhado entre todas as moedas fiat
+        espera = self.intervalo_requisicoes - (time.monotonic() - self._ultima_requisicao)
+        if espera > 0:
+            time.sleep(espera)
         
         while True:
-            url = 'https://api.coingecko.com/api/v3/coins/markets'
+            resposta = requests.get(url, params=params, headers=headers, timeout=30)
+            self._ultima_requisicao = time.monotonic()
+            
+            if resposta.status_code != 429:
+                return resposta
+            
+            print("Limite de requisições atingido. Aguardando...")
+            time.sleep(60)
+    
+    def coletar_pagina(self, pagina: int) -> Optional[Dict[str, dict]]:
+        respostas = {}
+        
+        for moeda_fiat in self.moedas_fiat:
             params = {
-                'vs_currency': 'usd',
+                'vs_currency': moeda_fiat,
                 'order': 'market_cap_desc',
                 'per_page': 250,
                 'page': pagina,
                 'sparkline': False
             }
             
+            etag, hash_anterior = self.estado_pagina(pagina, moeda_fiat)
+            resposta = self._requisitar(params, {'If-None-Match': etag} if etag else None)
+            
+            if resposta.status_code == 304:
+                respostas[moeda_fiat] = {'dados': None, 'etag': etag, 'hash': hash_anterior}
+                continue
+            
+            if resposta.status_code != 200:
+                print(f"Erro HTTP {resposta.status_code} ({moeda_fiat})")
+                return None
+            
+            dados = resposta.json()
+            hash_conteudo = hashlib.sha256(resposta.content).hexdigest()
+            
+            # `dados` None indica página inalterada desde a última coleta
+            respostas[moeda_fiat] = {
+                'dados': dados if hash_conteudo != hash_anterior else None,
+                'etag': resposta.headers.get('ETag'),
+                'hash': hash_conteudo
+            }
+            
+            if moeda_fiat == "usd" and not dados:
+                respostas[moeda_fiat]['dados'] = []
+                break
+        
+        return respostas
+    
+    def gravar_pagina(self, pagina: int, respostas: Dict[str, dict]) -> int:
+        cursor = self.conn.cursor()
+        timestamp = datetime.utcnow().isoformat()
+        inseridas_pagina = 0
+        alteradas = []
+        novas_por_fiat = {
+            moeda_fiat: self._moedas_alteradas(resposta['dados'] or [], moeda_fiat)
+            for moeda_fiat, resposta in respostas.items()
+        }
+        
+        for moeda, _ in novas_por_fiat["usd"]:
+            try:
+                dados_moeda = self.processar_moeda(moeda)
+                # Upsert em vez de REPLACE: nada é reescrito (nem disparam os triggers
+                # do feed de alterações) quando os valores são os mesmos
+                cursor.execute('''
+                    INSERT INTO moedas
+                    (id, nome, simbolo, preco_usd, variacao_24h, market_cap, ultima_atualizacao)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(id) DO UPDATE SET
+                        nome = excluded.nome, simbolo = excluded.simbolo, preco_usd = excluded.preco_usd,
+                        variacao_24h = excluded.variacao_24h, market_cap = excluded.market_cap,
+                        ultima_atualizacao = excluded.ultima_atualizacao
+                    WHERE (moedas.nome, moedas.simbolo, moedas.preco_usd, moedas.variacao_24h, moedas.market_cap)
+                        IS NOT (excluded.nome, excluded.simbolo, excluded.preco_usd, excluded.variacao_24h, excluded.market_cap)
+                ''', dados_moeda)
+                if cursor.rowcount:
+                    alteradas.append((dados_moeda[0],) + dados_moeda[3:])
+                cursor.execute('''
+                    INSERT OR REPLACE INTO dados_mercado
+                    (id, rank_market_cap, supply_circulante, supply_total, supply_maximo, ultima_atualizacao)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                ''', self.processar_dados_mercado(moeda, timestamp))
+                inseridas_pagina += 1
+            except Exception as e:
+                print(f"Erro ao processar moeda {moeda.get('id', 'unknown')}: {e}")
+        
+        for moeda_fiat, novas in novas_por_fiat.items():
+            try:
+                cursor.executemany('''
+                    INSERT OR REPLACE INTO cotacoes
+                    (id, moeda_fiat, preco, variacao_24h, market_cap, volume_24h,
+                     maxima_historica, data_maxima_historica, ultima_atualizacao)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ''', [self.processar_cotacao(moeda, moeda_fiat, timestamp) for moeda, _ in novas])
+                cursor.executemany('''
+                    INSERT INTO hashes_conteudo (id, moeda_fiat, hash) VALUES (?, ?, ?)
+                    ON CONFLICT(id, moeda_fiat) DO UPDATE SET hash = excluded.hash
+                ''', [(moeda['id'], moeda_fiat, hash_atual) for moeda, hash_atual in novas])
+            except Exception as e:
+                print(f"Erro ao gravar cotações em {moeda_fiat}: {e}")
+        
+        cursor.executemany('''
+            INSERT INTO estado_coleta (pagina, moeda_fiat, status, etag, hash_conteudo, ciclo, atualizado_em)
+            VALUES (?, ?, 'concluida', ?, ?, ?, ?)
+            ON CONFLICT(pagina, moeda_fiat) DO UPDATE SET
+                status = excluded.status, etag = excluded.etag, hash_conteudo = excluded.hash_conteudo,
+                ciclo = excluded.ciclo, atualizado_em = excluded.atualizado_em
+        ''', [(pagina, moeda_fiat, resposta['etag'], resposta['hash'], self.ciclo_atual(), timestamp)
+              for moeda_fiat, resposta in respostas.items()])
+        
+        cursor.execute(
+            "DELETE FROM alteracoes_moedas WHERE seq <= (SELECT MAX(seq) FROM alteracoes_moedas) - ?",
+            (RETENCAO_ALTERACOES,)
+        )
+        
+        # Dados e progresso da página são confirmados juntos
+        self.conn.commit()
+        
+        if alteradas:
+            for ouvinte in self.ouvintes:
+                try:
+                    ouvinte(alteradas)
+                except Exception as e:
+                    print(f"Erro ao notificar ouvinte: {e}")
+        
+        return inseridas_pagina
+    
+    def coletar_dados(self):
+        if not self.inicializar_banco():
+            return
+        
+        pagina = self.carregar_pagina_inicial()
+        total_inseridas = 0
+        
+        print("Iniciando coleta de dados da CoinGecko...")
+        print(f"Começando da página {pagina}")
+        
+        while True:
             print(f"Coletando página {pagina}...")
             
             try:
-                resposta = requests.get(url, params=params, timeout=30)
+                respostas = self.coletar_pagina(pagina)
                 
-                if resposta.status_code == 429:
-                    print("Limite de requisições atingido. Aguardando...")
-                    time.sleep(60)
-                    continue
-                
-                if resposta.status_code != 200:
-                    print(f"Erro HTTP {resposta.status_code}")
+                if respostas is None:
                     break
                 
-                dados = resposta.json()
-                
-                if not dados:
+                if respostas["usd"]['dados'] == []:
+                    ciclo = self.ciclo_atual()
+                    self.finalizar_ciclo(pagina - 1)
                     print("Coleta finalizada - sem mais dados.")
+                    if self.formato_snapshot:
+                        try:
+                            exportar_snapshot(self.db_path, formato=self.formato_snapshot, ciclo=ciclo)
+                        except Exception as e:
+                            print(f"Erro ao exportar snapshot: {e}")
                     break
                 
-                cursor = self.conn.cursor()
-                inseridas_pagina = 0
-                
-                for moeda in dados:
-                    try:
-                        dados_moeda = self.processar_moeda(moeda)
-                        cursor.execute('''
-                            INSERT OR REPLACE INTO moedas 
-                            (id, nome, simbolo, preco_usd, variacao_24h, market_cap, ultima_atualizacao)
-                            VALUES (?, ?, ?, ?, ?, ?, ?)
-                        ''', dados_moeda)
-                        inseridas_pagina += 1
-                    except Exception as e:
-                        print(f"Erro ao processar moeda {moeda.get('id', 'unknown')}: {e}")
-                
-                self.conn.commit()
+                inseridas_pagina = self.gravar_pagina(pagina, respostas)
                 total_inseridas += inseridas_pagina
                 
-                print(f"Página {pagina}: {inseridas_pagina} moedas processadas")
+                inalteradas = sum(1 for resposta in respostas.values() if resposta['dados'] is None)
+                if inalteradas:
+                    print(f"Página {pagina}: {inseridas_pagina} moedas alteradas ({inalteradas} resposta(s) sem alteração)")
+                else:
+                    print(f"Página {pagina}: {inseridas_pagina} moedas alteradas")
                 
                 pagina += 1
-                self.salvar_progresso(pagina)
-                time.sleep(3)  
-                
+            
             except requests.RequestException as e:
                 print(f"Erro na requisição: {e}")
                 break
@@ -135,7 +525,149 @@ class ColetorDadosCripto:
         
         if self.conn:
             self.conn.close()
+    
+    def coletar_descricoes(self, limite: int = 250, validade_dias: int = 30) -> int:
+        """Baixa as descrições das maiores moedas para `textos_moedas` (entrada do sentimento.py)."""
+        if not self.inicializar_banco():
+            return 0
+        
+        # Uma requisição por moeda: só as do topo sem descrição ou com descrição antiga
+        ids = [linha[0] for linha in self.conn.execute('''
+            SELECT m.id FROM moedas m LEFT JOIN textos_moedas t ON t.id = m.id
+            WHERE t.id IS NULL OR t.atualizado_em < datetime('now', ?)
+            ORDER BY m.market_cap DESC NULLS LAST LIMIT ?
+        ''', (f"-{validade_dias} days", limite))]
+        
+        gravadas = 0
+        try:
+            for id_moeda in ids:
+                params = {'localization': 'false', 'tickers': 'false', 'market_data': 'false',
+                          'community_data': 'false', 'developer_data': 'false', 'sparkline': 'false'}
+                try:
+                    resposta = self._requisitar(params, url=URL_MOEDA.format(id=id_moeda))
+                except requests.RequestException as e:
+                    print(f"Erro na requisição de {id_moeda}: {e}")
+                    break
+                
+                if resposta.status_code != 200:
+                    print(f"Erro HTTP {resposta.status_code} ({id_moeda})")
+                    continue
+                
+                texto = re.sub(r"<[^>]+>", " ", (resposta.json().get('description') or {}).get('en') or "").strip()
+                if not texto:
+                    continue
+                with self.conn:
+                    self.conn.execute('''
+                        INSERT INTO textos_moedas (id, texto, fonte, atualizado_em) VALUES (?, ?, 'coingecko', ?)
+                        ON CONFLICT(id) DO UPDATE SET texto = excluded.texto, fonte = excluded.fonte,
+                            atualizado_em = excluded.atualizado_em
+                    ''', (id_moeda, texto, datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")))
+                gravadas += 1
+        except KeyboardInterrupt:
+            print("\nColeta de descrições interrompida.")
+        finally:
+            self.conn.close()
+        
+        print(f"{gravadas} descrição(ões) gravada(s).")
+        return gravadas
+    
+    def atualizar_camadas(self, continuo: bool = False, limite_paginas: Optional[int] = None):
+        """Atualiza só as páginas vencidas em cada camada (CAMADAS_ATUALIZACAO), em vez de percorrer tudo."""
+        if not self.inicializar_banco():
+            return
+        
+        if self.ultima_pagina() is None:
+            # Sem um ciclo completo não se sabe onde a cauda termina
+            print("Nenhum ciclo completo registrado: fazendo a coleta completa.")
+            self.conn.close()
+            self.coletar_dados()
+            return
+        
+        try:
+            while True:
+                vencidas = self.paginas_vencidas()[:limite_paginas]
+                print(f"{len(vencidas)} página(s) vencida(s) de {self.ultima_pagina()}")
+                total_alteradas = self._atualizar_paginas(vencidas)
+                
+                if total_alteradas and self.formato_snapshot:
+                    try:
+                        exportar_snapshot(self.db_path, formato=self.formato_snapshot, ciclo=self.ciclo_atual())
+                    except Exception as e:
+                        print(f"Erro ao exportar snapshot: {e}")
+                
+                if not continuo:
+                    break
+                espera = max(self.segundos_ate_proxima(), self.intervalo_requisicoes)
+                print(f"Próxima atualização em {espera:.0f}s")
+                time.sleep(espera)
+        except KeyboardInterrupt:
+            print("\nAtualização interrompida.")
+        finally:
+            self.conn.close()
+    
+    def _atualizar_paginas(self, paginas: List[int]) -> int:
+        total_alteradas = 0
+        ultima_pagina = self.ultima_pagina()
+        # Quando a última página conhecida vence, as seguintes são sondadas atrás de moedas novas
+        fila = list(paginas)
+        
+        while fila:
+            pagina = fila.pop(0)
+            try:
+                respostas = self.coletar_pagina(pagina)
+            except requests.RequestException as e:
+                print(f"Erro na requisição: {e}")
+                break
+            
+            if respostas is None:
+                break
+            
+            if respostas["usd"]['dados'] == []:
+                if pagina <= ultima_pagina:
+                    ultima_pagina = pagina - 1
+                    self._gravar_ultima_pagina(ultima_pagina)
+                fila = [p for p in fila if p <= ultima_pagina]
+                continue
+            
+            alteradas = self.gravar_pagina(pagina, respostas)
+            total_alteradas += alteradas
+            print(f"Página {pagina} (camada {self.intervalo_camada(pagina)}s): {alteradas} moedas alteradas")
+            
+            if pagina >= ultima_pagina:
+                if pagina > ultima_pagina:
+                    ultima_pagina = pagina
+                    self._gravar_ultima_pagina(ultima_pagina)
+                fila.append(pagina + 1)
+        
+        return total_alteradas
 
 if __name__ == "__main__":
-    coletor = ColetorDadosCripto()
-    coletor.coletar_dados()
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Coleta dados de mercado da CoinGecko")
+    parser.add_argument("--moedas", nargs="+", default=["usd"], metavar="MOEDA",
+                        help="Moedas fiduciárias para cotação (ex.: usd eur brl)")
+    parser.add_argument("--snapshot", choices=("arrow", "parquet", "nenhum"), default="arrow",
+                        help="Formato do snapshot colunar exportado ao fim de cada ciclo")
+    parser.add_argument("--camadas", action="store_true",
+                        help="Atualiza só as páginas vencidas: topo do ranking com frequência, cauda raramente")
+    parser.add_argument("--continuo", action="store_true", help="Com --camadas, continua rodando até ser interrompido")
+    parser.add_argument("--limite-paginas", type=int, help="Com --camadas, máximo de páginas por rodada")
+    parser.add_argument("--descricoes", type=int, metavar="N",
+                        help="Baixa as descrições das N maiores moedas para a análise de sentimento")
+    parser.add_argument("--sem-alertas", action="store_true",
+                        help="Não avalia os alertas de preço (src/alertas.py) a cada página gravada")
+    args = parser.parse_args()
+    
+    coletor = ColetorDadosCripto(moedas_fiat=args.moedas,
+                                 formato_snapshot=None if args.snapshot == "nenhum" else args.snapshot)
+    if not args.sem_alertas:
+        motor_alertas = MotorAlertas(coletor.db_path)
+        motor_alertas.registrar_notificador(imprimir_disparo)
+        coletor.registrar_ouvinte(motor_alertas.avaliar)
+    if args.descricoes:
+        coletor.coletar_descricoes(args.descricoes)
+    elif args.camadas:
+        coletor.atualizar_camadas(continuo=args.continuo, limite_paginas=args.limite_paginas)
+    else:
+        coletor.coletar_dados()
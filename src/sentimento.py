@@ -0,0 +1,217 @@
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Léxico local (inglês, idioma das descrições da CoinGecko): peso por palavra
+LEXICO = {
+    # Positivas
+    "secure": 1.0, "security": 0.5, "innovative": 1.5, "innovation": 1.0, "leading": 1.0, "growth": 1.5,
+    "growing": 1.0, "trusted": 1.5, "reliable": 1.5, "efficient": 1.0, "scalable": 1.0, "fast": 0.5,
+    "successful": 2.0, "success": 1.5, "strong": 1.0, "stable": 0.5, "profit": 1.5, "profitable": 2.0,
+    "rewards": 1.0, "reward": 1.0, "adoption": 1.0, "partnership": 1.0, "partnerships": 1.0, "launch": 0.5,
+    "gain": 1.5, "gains": 1.5, "bullish": 2.0, "surge": 1.5, "rally": 1.5, "record": 1.0, "upgrade": 1.0,
+    "transparent": 1.0, "decentralized": 0.5, "empower": 1.0, "community": 0.5, "audited": 1.5,
+    "popular": 1.0, "largest": 0.5, "best": 1.5, "benefit": 1.0, "benefits": 1.0, "opportunity": 1.0,
+    # Negativas
+    "scam": -3.0, "fraud": -3.0, "hack": -2.5, "hacked": -2.5, "exploit": -2.5, "exploited": -2.5,
+    "rug": -3.0, "rugpull": -3.0, "ponzi": -3.0, "risk": -1.0, "risky": -1.5, "volatile": -1.0,
+    "volatility": -0.5, "loss": -1.5, "losses": -1.5, "lawsuit": -2.0, "sec": -0.5, "ban": -2.0,
+    "banned": -2.0, "crash": -2.5, "bearish": -2.0, "decline": -1.5, "dump": -2.0, "delisted": -2.5,
+    "delisting": -2.0, "vulnerability": -2.0, "stolen": -2.5, "theft": -2.5, "warning": -1.5,
+    "bankruptcy": -3.0, "bankrupt": -3.0, "insolvent": -3.0, "abandoned": -2.5, "deprecated": -1.5,
+    "inactive": -1.5, "speculative": -1.0, "meme": -0.5, "joke": -1.0, "unaudited": -1.5,
+}
+
+_PALAVRA = re.compile(r"[a-z]+")
+# Normalização do VADER: soma / sqrt(soma² + alfa) fica em (-1, 1)
+ALFA_NORMALIZACAO = 15.0
+TAMANHO_LOTE = 256
+
+def hash_texto(texto: str) -> int:
+    return int.from_bytes(hashlib.blake2b(texto.encode("utf-8"), digest_size=8).digest(), "big", signed=True)
+
+def pontuar_lote(textos: Sequence[str]) -> List[int]:
+    """Pontua um lote de textos de -100 a 100; os pesos do lote inteiro são somados de uma vez."""
+    # numpy só aqui: buscar/app importam este módulo apenas por rotulo_sentimento
+    import numpy as np
+    
+    tokens_por_texto = [_PALAVRA.findall(texto.lower()) for texto in textos]
+    tamanhos = np.fromiter((len(tokens) for tokens in tokens_por_texto), dtype=np.int64, count=len(textos))
+    pesos = np.fromiter(
+        (LEXICO.get(token, 0.0) for tokens in tokens_por_texto for token in tokens),
+        dtype=np.float64, count=int(tamanhos.sum())
+    )
+    
+    # Soma por texto com um único reduceat sobre os pesos concatenados
+    somas = np.zeros(len(textos))
+    com_tokens = tamanhos > 0
+    if com_tokens.any():
+        inicios = np.concatenate(([0], np.cumsum(tamanhos)[:-1]))
+        somas[com_tokens] = np.add.reduceat(pesos, inicios[com_tokens])
+    
+    pontuacoes = somas / np.sqrt(somas * somas + ALFA_NORMALIZACAO)
+    return np.rint(pontuacoes * 100).astype(int).tolist()
+
+def rotulo_sentimento(pontuacao: Optional[int]) -> str:
+    if pontuacao is None:
+        return "N/A"
+    if pontuacao >= 20:
+        return "positive"
+    if pontuacao <= -20:
+        return "negative"
+    return "neutral"
+
+def criar_tabelas_sentimento(conn: sqlite3.Connection):
+    # Textos de entrada (descrições, notícias) e pontuação compacta por moeda
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS textos_moedas (
+            id TEXT PRIMARY KEY,
+            texto TEXT NOT NULL,
+            fonte TEXT,
+            atualizado_em TEXT
+        ) WITHOUT ROWID
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS sentimento_moedas (
+            id TEXT PRIMARY KEY,
+            hash_texto INTEGER NOT NULL,
+            pontuacao INTEGER NOT NULL
+        ) WITHOUT ROWID
+    ''')
+
+class PipelineSentimento:
+    """Pontua `textos_moedas` em lotes num pool de processos, sem repontuar texto inalterado."""
+    
+    def __init__(self, db_path: str = "data/criptomoedas.db", processos: Optional[int] = None,
+                 tamanho_lote: int = TAMANHO_LOTE):
+        self.db_path = db_path
+        self.processos = processos or os.cpu_count() or 1
+        self.tamanho_lote = tamanho_lote
+    
+    def importar_textos(self, registros: Iterable[dict], fonte: str = "arquivo") -> int:
+        # Mesmo formato do datetime() do SQLite, usado para achar descrições antigas
+        agora = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
+        linhas = [(r["id"], r["texto"], r.get("fonte", fonte), agora) for r in registros if r.get("id") and r.get("texto")]
+        conn = sqlite3.connect(self.db_path)
+        try:
+            criar_tabelas_sentimento(conn)
+            with conn:
+                conn.executemany('''
+                    INSERT INTO textos_moedas (id, texto, fonte, atualizado_em) VALUES (?, ?, ?, ?)
+                    ON CONFLICT(id) DO UPDATE SET texto = excluded.texto, fonte = excluded.fonte,
+                        atualizado_em = excluded.atualizado_em
+                    WHERE textos_moedas.texto IS NOT excluded.texto
+                ''', linhas)
+        finally:
+            conn.close()
+        return len(linhas)
+    
+    def _pontuar(self, textos: List[str]) -> List[int]:
+        lotes = [textos[i:i + self.tamanho_lote] for i in range(0, len(textos), self.tamanho_lote)]
+        if self.processos == 1 or len(lotes) < 2:
+            return [pontuacao for lote in lotes for pontuacao in pontuar_lote(lote)]
+        
+        from concurrent.futures import ProcessPoolExecutor
+        
+        with ProcessPoolExecutor(max_workers=self.processos) as executor:
+            return [pontuacao for resultado in executor.map(pontuar_lote, lotes) for pontuacao in resultado]
+    
+    def executar(self) -> Tuple[int, int]:
+        """Devolve (textos pontuados agora, textos reaproveitados do cache)."""
+        conn = sqlite3.connect(self.db_path)
+        try:
+            criar_tabelas_sentimento(conn)
+            linhas = conn.execute('''
+                SELECT t.id, t.texto, s.hash_texto FROM textos_moedas t
+                LEFT JOIN sentimento_moedas s ON s.id = t.id
+            ''').fetchall()
+            
+            # Memoização por hash: texto igual ao já pontuado (desta moeda ou de outra) não é repontuado
+            conhecidos: Dict[int, int] = dict(conn.execute('''
+                SELECT s.hash_texto, s.pontuacao FROM sentimento_moedas s
+            ''').fetchall())
+            pendentes: Dict[int, str] = {}
+            atribuicoes: List[Tuple[str, int]] = []
+            for id_moeda, texto, hash_anterior in linhas:
+                hash_atual = hash_texto(texto)
+                if hash_atual == hash_anterior:
+                    continue
+                atribuicoes.append((id_moeda, hash_atual))
+                if hash_atual not in conhecidos:
+                    pendentes[hash_atual] = texto
+            
+            hashes = list(pendentes)
+            conhecidos.update(zip(hashes, self._pontuar([pendentes[h] for h in hashes])))
+            
+            with conn:
+                conn.executemany('''
+                    INSERT INTO sentimento_moedas (id, hash_texto, pontuacao) VALUES (?, ?, ?)
+                    ON CONFLICT(id) DO UPDATE SET hash_texto = excluded.hash_texto, pontuacao = excluded.pontuacao
+                ''', [(id_moeda, hash_atual, conhecidos[hash_atual]) for id_moeda, hash_atual in atribuicoes])
+                # Moedas cujo texto foi removido perdem a pontuação
+                conn.execute("DELETE FROM sentimento_moedas WHERE id NOT IN (SELECT id FROM textos_moedas)")
+        finally:
+            conn.close()
+        
+        return len(pendentes), len(linhas) - len(pendentes)
+
+class PontuacoesSentimento:
+    """Leitura das pontuações para a interface: um dict em memória, recarregado só quando o banco muda."""
+    
+    def __init__(self, db_path: str = "data/criptomoedas.db"):
+        self.db_path = db_path
+        self._geracao = None
+        self._pontuacoes: Dict[str, int] = {}
+        self._lock = threading.Lock()
+    
+    def _recarregar_se_mudou(self):
+        try:
+            estado = os.stat(self.db_path)
+        except OSError:
+            return
+        geracao = (estado.st_mtime_ns, estado.st_size)
+        if geracao == self._geracao:
+            return
+        
+        with self._lock:
+            try:
+                conn = sqlite3.connect(self.db_path)
+                try:
+                    self._pontuacoes = dict(conn.execute("SELECT id, pontuacao FROM sentimento_moedas"))
+                finally:
+                    conn.close()
+            except sqlite3.Error:
+                # Pipeline ainda não rodou neste banco
+                self._pontuacoes = {}
+            self._geracao = geracao
+    
+    def pontuacao(self, id_moeda: str) -> Optional[int]:
+        self._recarregar_se_mudou()
+        return self._pontuacoes.get(id_moeda)
+
+def main():
+    import argparse
+    import json
+    
+    parser = argparse.ArgumentParser(description="Pontua o sentimento dos textos das moedas (textos_moedas)")
+    parser.add_argument("--db", default="data/criptomoedas.db")
+    parser.add_argument("--importar", metavar="ARQUIVO", help='JSONL com {"id": ..., "texto": ...} por linha')
+    parser.add_argument("--processos", type=int, help="Processos do pool (padrão: núcleos disponíveis)")
+    parser.add_argument("--lote", type=int, default=TAMANHO_LOTE, help="Textos por lote")
+    args = parser.parse_args()
+    
+    pipeline = PipelineSentimento(args.db, args.processos, args.lote)
+    if args.importar:
+        with open(args.importar, encoding="utf-8") as f:
+            importados = pipeline.importar_textos(json.loads(linha) for linha in f if linha.strip())
+        print(f"{importados} texto(s) importado(s).")
+    
+    pontuados, reaproveitados = pipeline.executar()
+    print(f"{pontuados} texto(s) pontuado(s), {reaproveitados} sem alteração.")
+
+if __name__ == "__main__":
+    main()
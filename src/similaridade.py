@@ -0,0 +1,257 @@
+import pickle
+import sqlite3
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from analisador import ANALISADOR_PADRAO
+
+ARQUIVO_SIMILARIDADE = "data/similaridade.pkl"
+VERSAO_SIMILARIDADE = 1
+TAMANHO_NGRAMA = 3
+# Vizinhos pré-calculados na construção para as moedas de maior market cap
+MOEDAS_CACHE = 1000
+VIZINHOS_CACHE = 10
+# Linhas por produto em bloco: 256 × 15 mil moedas em float32 ≈ 15 MB de matriz densa
+LINHAS_POR_BLOCO = 256
+
+def _importar_scipy_sparse():
+    # scipy é opcional: só a construção e a consulta de moedas similares precisam dele
+    try:
+        import scipy.sparse
+    except ImportError:
+        return None
+    return scipy.sparse
+
+def ngramas_caracteres(texto: str, tamanho: int = TAMANHO_NGRAMA) -> List[str]:
+    """N-gramas de caracteres de cada palavra, com borda: "bitcoin" -> " bi", "bit", ..., "in "."""
+    ngramas = []
+    for token in ANALISADOR_PADRAO.tokens(texto, consulta=True):
+        palavra = f" {token} "
+        ngramas.extend(palavra[inicio:inicio + tamanho] for inicio in range(max(1, len(palavra) - tamanho + 1)))
+    return ngramas
+
+def texto_moeda(id_moeda: str, nome: Optional[str], simbolo: Optional[str]) -> str:
+    return f"{nome or ''} {simbolo or ''} {id_moeda}"
+
+def _inversas(normas: np.ndarray) -> np.ndarray:
+    # Vetor nulo (nome sem n-gramas conhecidos) tem similaridade 0 com tudo, não divisão por zero
+    return np.divide(1.0, normas, out=np.zeros_like(normas), where=normas > 0)
+
+class ModeloSimilaridade:
+    """Vetores TF-IDF de n-gramas de caracteres (nome, símbolo e id) e vizinhos mais próximos por cosseno.
+    
+    A matriz fica esparsa e sem normalizar; as normas das linhas são calculadas
+    uma vez e o cosseno sai do produto escalar dividido por elas.
+    """
+    
+    def __init__(self, ids: List[str], rotulos: List[Tuple[str, str]], vocabulario: Dict[str, int],
+                 idf: np.ndarray, matriz, normas: np.ndarray, vizinhos_por_moeda: int = VIZINHOS_CACHE):
+        self.ids = ids
+        self.rotulos = rotulos
+        self.vocabulario = vocabulario
+        self.idf = idf
+        self.matriz = matriz
+        self.normas = normas
+        self.vizinhos_por_moeda = vizinhos_por_moeda
+        # id -> [(posição do vizinho, similaridade)], das moedas do topo
+        self.vizinhos: Dict[str, List[Tuple[int, float]]] = {}
+        self._posicoes: Optional[Dict[str, int]] = None
+        self._transposta = None
+        self._inversas_normas = None
+    
+    @classmethod
+    def construir(cls, moedas: Sequence[Tuple[str, str, str, Optional[float]]], moedas_cache: int = MOEDAS_CACHE,
+                  vizinhos_por_moeda: int = VIZINHOS_CACHE) -> Optional["ModeloSimilaridade"]:
+        """Modelo a partir de linhas (id, nome, simbolo, market_cap); None sem scipy ou sem moedas."""
+        sparse = _importar_scipy_sparse()
+        if sparse is None or not moedas:
+            return None
+        
+        vocabulario: Dict[str, int] = {}
+        colunas: List[int] = []
+        frequencias: List[int] = []
+        tamanhos = np.zeros(len(moedas) + 1, dtype=np.int64)
+        for linha, (id_moeda, nome, simbolo, _) in enumerate(moedas):
+            contagem = Counter(ngramas_caracteres(texto_moeda(id_moeda, nome, simbolo)))
+            for ngrama, frequencia in contagem.items():
+                colunas.append(vocabulario.setdefault(ngrama, len(vocabulario)))
+                frequencias.append(frequencia)
+            tamanhos[linha + 1] = len(contagem)
+        
+        colunas_np = np.array(colunas, dtype=np.int32)
+        # TF sublinear e IDF suavizado: n-gramas de "token"/"coin" pesam pouco, os raros decidem
+        tf = 1.0 + np.log(np.array(frequencias, dtype=np.float32))
+        documentos = np.bincount(colunas_np, minlength=len(vocabulario))
+        idf = (np.log((1 + len(moedas)) / (1 + documentos)) + 1.0).astype(np.float32)
+        matriz = sparse.csr_matrix(
+            (tf * idf[colunas_np], colunas_np, np.cumsum(tamanhos)),
+            shape=(len(moedas), len(vocabulario)), dtype=np.float32
+        )
+        normas = np.sqrt(np.asarray(matriz.multiply(matriz).sum(axis=1)).ravel())
+        
+        modelo = cls(
+            [id_moeda for id_moeda, _, _, _ in moedas],
+            [(nome or "", simbolo or "") for _, nome, simbolo, _ in moedas],
+            vocabulario, idf, matriz, normas, vizinhos_por_moeda
+        )
+        market_caps = np.array([market_cap or 0.0 for _, _, _, market_cap in moedas], dtype=float)
+        topo = np.argsort(-market_caps, kind="stable")[:moedas_cache]
+        modelo.vizinhos = dict(zip(
+            (modelo.ids[posicao] for posicao in topo),
+            modelo._vizinhos_em_blocos(modelo.matriz[topo], normas[topo], vizinhos_por_moeda, topo)
+        ))
+        return modelo
+    
+    @property
+    def posicoes(self) -> Dict[str, int]:
+        if self._posicoes is None:
+            self._posicoes = {id_moeda: posicao for posicao, id_moeda in enumerate(self.ids)}
+        return self._posicoes
+    
+    def _vizinhos_em_blocos(self, consultas, normas_consultas: np.ndarray, k: int,
+                            excluir: Optional[Sequence[int]] = None) -> List[List[Tuple[int, float]]]:
+        """Top-k por cosseno para cada linha de `consultas`, em produtos de LINHAS_POR_BLOCO linhas."""
+        if self._transposta is None:
+            # Transposta convertida uma vez: o produto CSR @ CSR não reconverte a matriz a cada bloco
+            self._transposta = self.matriz.T.tocsr()
+            self._inversas_normas = _inversas(self.normas)
+        
+        resultados = []
+        for inicio in range(0, consultas.shape[0], LINHAS_POR_BLOCO):
+            fim = min(inicio + LINHAS_POR_BLOCO, consultas.shape[0])
+            similaridades = (consultas[inicio:fim] @ self._transposta).toarray()
+            similaridades *= self._inversas_normas
+            similaridades *= _inversas(normas_consultas[inicio:fim])[:, None]
+            if excluir is not None:
+                # A própria moeda não é vizinha dela mesma
+                similaridades[np.arange(fim - inicio), excluir[inicio:fim]] = 0.0
+            
+            quantidade = min(k, similaridades.shape[1])
+            candidatos = np.argpartition(-similaridades, quantidade - 1, axis=1)[:, :quantidade]
+            for linha, colunas in enumerate(candidatos):
+                valores = similaridades[linha, colunas]
+                ordem = np.argsort(-valores, kind="stable")
+                resultados.append([
+                    (int(colunas[i]), float(valores[i])) for i in ordem if valores[i] > 0
+                ])
+        return resultados
+    
+    def _linhas(self, vizinhos: Iterable[Tuple[int, float]]) -> List[dict]:
+        return [
+            {"id": self.ids[posicao], "nome": self.rotulos[posicao][0], "simbolo": self.rotulos[posicao][1],
+             "similaridade": round(similaridade, 4)}
+            for posicao, similaridade in vizinhos
+        ]
+    
+    def similares(self, id_moeda: str, k: int = VIZINHOS_CACHE) -> List[dict]:
+        """Moedas mais parecidas com `id_moeda`; as do topo saem do cache, as demais de um produto de uma linha."""
+        if k <= self.vizinhos_por_moeda and id_moeda in self.vizinhos:
+            return self._linhas(self.vizinhos[id_moeda][:k])
+        
+        posicao = self.posicoes.get(id_moeda)
+        if posicao is None:
+            return []
+        return self._linhas(self._vizinhos_em_blocos(
+            self.matriz[[posicao]], self.normas[[posicao]], k, [posicao]
+        )[0])
+    
+    def similares_texto(self, texto: str, k: int = VIZINHOS_CACHE) -> List[dict]:
+        """Moedas parecidas com um nome qualquer (ex.: checar se um token novo imita outro)."""
+        sparse = _importar_scipy_sparse()
+        contagem = Counter(
+            self.vocabulario[ngrama] for ngrama in ngramas_caracteres(texto) if ngrama in self.vocabulario
+        )
+        if sparse is None or not contagem:
+            return []
+        
+        colunas = np.fromiter(contagem.keys(), dtype=np.int32, count=len(contagem))
+        pesos = (1.0 + np.log(np.fromiter(contagem.values(), dtype=np.float32, count=len(contagem)))) * self.idf[colunas]
+        consulta = sparse.csr_matrix(
+            (pesos, colunas, [0, len(colunas)]), shape=(1, len(self.vocabulario)), dtype=np.float32
+        )
+        return self._linhas(self._vizinhos_em_blocos(consulta, np.array([np.sqrt(pesos @ pesos)]), k)[0])
+    
+    def salvar(self, arquivo: str = ARQUIVO_SIMILARIDADE) -> bool:
+        Path(arquivo).parent.mkdir(exist_ok=True)
+        
+        dados = {
+            "versao": VERSAO_SIMILARIDADE,
+            "ids": self.ids,
+            "rotulos": self.rotulos,
+            "vocabulario": self.vocabulario,
+            "idf": self.idf,
+            "matriz": self.matriz,
+            "normas": self.normas,
+            "vizinhos_por_moeda": self.vizinhos_por_moeda,
+            "vizinhos": self.vizinhos,
+        }
+        try:
+            with open(arquivo, "wb") as f:
+                pickle.dump(dados, f, protocol=pickle.HIGHEST_PROTOCOL)
+            return True
+        except Exception as e:
+            print(f"Erro ao salvar modelo de similaridade: {e}")
+            return False
+
+def carregar_modelo(arquivo: str = ARQUIVO_SIMILARIDADE) -> Optional[ModeloSimilaridade]:
+    """Modelo salvo pela construção do índice; None se ausente, de outra versão ou sem scipy para ler a matriz."""
+    try:
+        with open(arquivo, "rb") as f:
+            dados = pickle.load(f)
+    except Exception:
+        return None
+    if not isinstance(dados, dict) or dados.get("versao") != VERSAO_SIMILARIDADE:
+        return None
+    
+    modelo = ModeloSimilaridade(
+        dados["ids"], dados["rotulos"], dados["vocabulario"], dados["idf"], dados["matriz"],
+        dados["normas"], dados["vizinhos_por_moeda"]
+    )
+    modelo.vizinhos = dados["vizinhos"]
+    return modelo
+
+def carregar_moedas(db_path: str) -> List[Tuple[str, str, str, Optional[float]]]:
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute("SELECT id, nome, simbolo, market_cap FROM moedas").fetchall()
+    finally:
+        conn.close()
+
+def main():
+    import argparse
+    import time
+    
+    parser = argparse.ArgumentParser(description="Moedas parecidas por n-gramas de caracteres (nome, símbolo e id)")
+    parser.add_argument("moedas", nargs="*", help="Ids de moeda ou nomes quaisquer a comparar")
+    parser.add_argument("--db", default="data/criptomoedas.db")
+    parser.add_argument("--arquivo", default=ARQUIVO_SIMILARIDADE)
+    parser.add_argument("--construir", action="store_true", help="Reconstrói o modelo a partir do banco")
+    parser.add_argument("-k", type=int, default=VIZINHOS_CACHE, help="Vizinhos por consulta")
+    args = parser.parse_args()
+    
+    if args.construir:
+        inicio = time.perf_counter()
+        modelo = ModeloSimilaridade.construir(carregar_moedas(args.db))
+        if modelo is None:
+            print("scipy não instalado ou banco vazio: modelo de similaridade não construído.")
+            raise SystemExit(1)
+        modelo.salvar(args.arquivo)
+        print(f"Modelo com {len(modelo.ids)} moedas, {len(modelo.vocabulario)} n-gramas e vizinhos de "
+              f"{len(modelo.vizinhos)} moedas em {time.perf_counter() - inicio:.1f}s: {args.arquivo}")
+    else:
+        modelo = carregar_modelo(args.arquivo)
+        if modelo is None:
+            print(f"Modelo indisponível em {args.arquivo}; rode com --construir (requer scipy).")
+            raise SystemExit(1)
+    
+    for consulta in args.moedas:
+        similares = modelo.similares(consulta, args.k) if consulta in modelo.posicoes else modelo.similares_texto(consulta, args.k)
+        print(f"\n{consulta}:")
+        for moeda in similares:
+            print(f"  {moeda['similaridade']:.3f}  {moeda['nome']} ({moeda['simbolo'].upper()})  [{moeda['id']}]")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+import os
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+DIRETORIO_SNAPSHOTS = "data/snapshots"
+ARQUIVO_ULTIMO = "LATEST"
+FORMATOS = ("arrow", "parquet")
+COLUNAS_SNAPSHOT = ("id", "nome", "simbolo", "preco_usd", "variacao_24h", "market_cap", "ultima_atualizacao")
+# Colunas com muitos valores repetidos, gravadas com codificação por dicionário
+COLUNAS_DICIONARIO = ("simbolo", "ultima_atualizacao")
+
+def _importar_pyarrow():
+    # pyarrow é opcional: só quem exporta ou lê snapshots precisa dele
+    try:
+        import pyarrow
+        import pyarrow.ipc
+        import pyarrow.parquet
+    except ImportError:
+        return None
+    return pyarrow
+
+def _escrever_atomico(caminho: Path, escrever):
+    temporario = caminho.with_name(f".{caminho.name}.tmp")
+    escrever(temporario)
+    os.replace(temporario, caminho)
+
+def exportar_snapshot(db_path: str = "data/criptomoedas.db", diretorio: str = DIRETORIO_SNAPSHOTS,
+                      formato: str = "arrow", ciclo: Optional[int] = None, manter: int = 5) -> Optional[Path]:
+    """Grava `moedas` como snapshot colunar versionado e aponta LATEST para ele."""
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato de snapshot inválido: {formato}")
+    
+    pa = _importar_pyarrow()
+    if pa is None:
+        print("pyarrow não instalado: snapshot colunar não exportado.")
+        return None
+    
+    conn = sqlite3.connect(db_path)
+    try:
+        linhas = conn.execute(f"SELECT {', '.join(COLUNAS_SNAPSHOT)} FROM moedas ORDER BY rowid").fetchall()
+    finally:
+        conn.close()
+    
+    colunas = list(zip(*linhas)) if linhas else [()] * len(COLUNAS_SNAPSHOT)
+    tipos = (pa.string(), pa.string(), pa.string(), pa.float64(), pa.float64(), pa.float64(), pa.string())
+    arrays = []
+    for nome, valores, tipo in zip(COLUNAS_SNAPSHOT, colunas, tipos):
+        array = pa.array(valores, type=tipo)
+        arrays.append(array.dictionary_encode() if nome in COLUNAS_DICIONARIO else array)
+    tabela = pa.Table.from_arrays(arrays, names=list(COLUNAS_SNAPSHOT))
+    
+    pasta = Path(diretorio)
+    pasta.mkdir(parents=True, exist_ok=True)
+    versao = datetime.utcnow().strftime("%Y%m%dT%H%M%S")
+    prefixo = f"moedas-ciclo{ciclo:06d}-" if ciclo is not None else "moedas-"
+    caminho = pasta / f"{prefixo}{versao}.{formato}"
+    
+    def escrever(destino: Path):
+        if formato == "parquet":
+            pa.parquet.write_table(tabela, destino, use_dictionary=list(COLUNAS_DICIONARIO))
+        else:
+            with pa.OSFile(str(destino), "wb") as arquivo, pa.ipc.new_file(arquivo, tabela.schema) as escritor:
+                escritor.write_table(tabela)
+    
+    _escrever_atomico(caminho, escrever)
+    # O ponteiro só muda depois que o snapshot está completo no disco
+    _escrever_atomico(pasta / ARQUIVO_ULTIMO, lambda destino: destino.write_text(caminho.name, encoding="utf-8"))
+    
+    antigos = sorted(
+        (arquivo for arquivo in pasta.glob("moedas-*") if arquivo.suffix.lstrip(".") in FORMATOS),
+        key=lambda arquivo: arquivo.stat().st_mtime
+    )
+    for arquivo in antigos[:-manter] if manter > 0 else []:
+        if arquivo != caminho:
+            arquivo.unlink(missing_ok=True)
+    
+    print(f"Snapshot de {tabela.num_rows} moedas salvo em: {caminho}")
+    return caminho
+
+def caminho_ultimo_snapshot(diretorio: str = DIRETORIO_SNAPSHOTS) -> Optional[Path]:
+    try:
+        nome = (Path(diretorio) / ARQUIVO_ULTIMO).read_text(encoding="utf-8").strip()
+    except OSError:
+        return None
+    caminho = Path(diretorio) / nome
+    return caminho if caminho.is_file() else None
+
+def abrir_snapshot(diretorio: str = DIRETORIO_SNAPSHOTS, colunas: Optional[list] = None):
+    """Último snapshot como pyarrow.Table mapeada em memória (sem cópia no Arrow IPC); None se indisponível."""
+    pa = _importar_pyarrow()
+    caminho = caminho_ultimo_snapshot(diretorio)
+    if pa is None or caminho is None:
+        return None
+    
+    if caminho.suffix == ".parquet":
+        return pa.parquet.read_table(caminho, columns=colunas, memory_map=True)
+    
+    tabela = pa.ipc.open_file(pa.memory_map(str(caminho), "r")).read_all()
+    return tabela.select(colunas) if colunas else tabela
+
+if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Exporta um snapshot colunar de data/criptomoedas.db")
+    parser.add_argument("--db", default="data/criptomoedas.db")
+    parser.add_argument("--diretorio", default=DIRETORIO_SNAPSHOTS)
+    parser.add_argument("--formato", choices=FORMATOS, default="arrow")
+    parser.add_argument("--manter", type=int, default=5, help="Quantos snapshots antigos manter")
+    args = parser.parse_args()
+    
+    exportar_snapshot(args.db, args.diretorio, args.formato, manter=args.manter)